@@ -1,7 +1,16 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 
-from .models import Appointment, Patient, Recommendation, Screening
+from . import ai_cache
+from .models import (
+    AICachedResult,
+    AIEnrichmentJob,
+    Appointment,
+    DailyScreeningRollup,
+    Patient,
+    Recommendation,
+    Screening,
+)
 
 User = get_user_model()
 
@@ -15,15 +24,30 @@ class UserAdmin(admin.ModelAdmin):
 
 @admin.register(Patient)
 class PatientAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'age', 'gender', 'village', 'health_worker', 'created_at']
-    list_filter = ['gender', 'village']
+    list_display = [
+        'full_name',
+        'age',
+        'gender',
+        'village',
+        'health_worker',
+        'latest_risk_level',
+        'screening_count',
+        'created_at',
+    ]
+    list_filter = ['gender', 'village', 'latest_risk_level']
     search_fields = ['full_name', 'village', 'phone']
+    readonly_fields = [
+        'latest_screening',
+        'latest_risk_level',
+        'latest_screened_at',
+        'screening_count',
+    ]
 
 
 @admin.register(Screening)
 class ScreeningAdmin(admin.ModelAdmin):
-    list_display = ['patient', 'risk_level', 'risk_score', 'created_at']
-    list_filter = ['risk_level', 'created_at']
+    list_display = ['patient', 'risk_level', 'risk_score', 'ai_status', 'created_at']
+    list_filter = ['risk_level', 'ai_status', 'created_at']
     search_fields = ['patient__full_name']
 
 
@@ -39,3 +63,43 @@ class RecommendationAdmin(admin.ModelAdmin):
     list_display = ['patient', 'title', 'category', 'priority', 'is_completed', 'created_at']
     list_filter = ['category', 'priority', 'is_completed']
     search_fields = ['patient__full_name', 'title']
+
+
+@admin.register(DailyScreeningRollup)
+class DailyScreeningRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'health_worker', 'village', 'risk_level', 'screening_count']
+    list_filter = ['risk_level', 'date']
+    search_fields = ['village']
+
+
+@admin.register(AIEnrichmentJob)
+class AIEnrichmentJobAdmin(admin.ModelAdmin):
+    list_display = ['screening', 'status', 'attempts', 'run_after', 'updated_at']
+    list_filter = ['status']
+    readonly_fields = ['screening', 'locked_at', 'last_error', 'created_at', 'updated_at']
+
+
+@admin.register(AICachedResult)
+class AICachedResultAdmin(admin.ModelAdmin):
+    list_display = ['key', 'kind', 'model_name', 'hit_count', 'created_at', 'last_used_at']
+    list_filter = ['kind', 'model_name']
+    readonly_fields = [
+        'key',
+        'kind',
+        'model_name',
+        'result',
+        'hit_count',
+        'created_at',
+        'last_used_at',
+    ]
+
+    def changelist_view(self, request, extra_context=None):
+        # Shown above the list by templates/admin/api/aicachedresult/change_list.html.
+        extra_context = {
+            **(extra_context or {}),
+            'hit_rates': [
+                (dict(AICachedResult.KIND_CHOICES)[kind], totals)
+                for kind, totals in ai_cache.hit_rates().items()
+            ],
+        }
+        return super().changelist_view(request, extra_context=extra_context)
@@ -0,0 +1,280 @@
+"""
+Content-addressed cache for Gemini results.
+
+A Gemini call is keyed by ``make_key(model_name, *parts)``, a SHA-256 over the
+model name and the exact request parts (for analysis, the prompt rendered from
+normalized inputs; for lab-report extraction, the prompt and the SHA-256 of the
+document). Identical requests therefore share an entry however they arrive: a
+client retry, a re-analysis through ``/api/ai/analyze``, a sync replay or the
+same report photographed once and uploaded for several family members.
+
+Lookups try an in-process LRU first, then the ``AICachedResult`` table shared
+by every worker. Settings:
+
+* ``AI_CACHE_TTL``: seconds an analysis is served; ``0`` disables caching them.
+* ``AI_EXTRACTION_CACHE_TTL``: the same for lab-report extractions.
+* ``AI_CACHE_MAX_ENTRIES``: rows kept in the table; the least recently used
+  are evicted on write.
+* ``AI_CACHE_MEMORY_ENTRIES``: entries kept in each process's LRU.
+
+Only successful results should be stored: a failure must be retried, not
+replayed. The cache is an optimisation, so database errors are logged and
+treated as misses rather than failing the request.
+
+Each row counts the lookups it answered. Hits served from a process's LRU are
+added to it in batches, at most ``HIT_FLUSH_SECONDS`` late, so ``hit_rates``
+(shown on the admin's cached-results page) covers every worker.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import AICachedResult
+
+logger = logging.getLogger(__name__)
+
+# Kinds of cached result, and the setting holding each one's TTL.
+ANALYSIS = 'analysis'
+EXTRACTION = 'extraction'
+TTL_SETTINGS = {
+    ANALYSIS: 'AI_CACHE_TTL',
+    EXTRACTION: 'AI_EXTRACTION_CACHE_TTL',
+}
+
+# Longest an LRU hit waits before it is added to its row's hit_count.
+HIT_FLUSH_SECONDS = 30
+
+_lock = threading.Lock()
+_memory = OrderedDict()  # key -> (expires_at monotonic, result)
+_counters = Counter()
+_pending_hits = Counter()  # key -> LRU hits not yet in the table
+_last_flush = time.monotonic()
+
+
+def _count(name: str) -> None:
+    with _lock:
+        _counters[name] += 1
+
+
+def ttl(kind: str = ANALYSIS) -> int:
+    return getattr(settings, TTL_SETTINGS[kind], 0)
+
+
+def enabled(kind: str = ANALYSIS) -> bool:
+    return ttl(kind) > 0
+
+
+def make_key(model_name: str, *parts: str) -> str:
+    """Hash ``model_name`` and the request ``parts`` into a cache key."""
+    digest = hashlib.sha256(model_name.encode())
+    for part in parts:
+        # Length-prefixed so ('ab', 'c') and ('a', 'bc') cannot collide.
+        encoded = part.encode() if isinstance(part, str) else part
+        digest.update(f'\0{len(encoded)}:'.encode())
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+def _remember(key, result, kind: str, lifetime=None) -> None:
+    """
+    Put ``result`` in this process's LRU, evicting the oldest entry if full.
+
+    It is served for ``lifetime`` seconds, by default the full TTL of ``kind``.
+    """
+    limit = getattr(settings, 'AI_CACHE_MEMORY_ENTRIES', 256)
+    if limit < 1:
+        return
+    if lifetime is None:
+        lifetime = ttl(kind)
+    with _lock:
+        _memory[key] = (time.monotonic() + lifetime, result)
+        _memory.move_to_end(key)
+        while len(_memory) > limit:
+            _memory.popitem(last=False)
+
+
+def _recall(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return result
+
+
+def _flush_hits(force: bool = False) -> None:
+    """Add this process's pending LRU hits to their rows, if ``HIT_FLUSH_SECONDS`` have passed."""
+    global _last_flush
+    with _lock:
+        if not _pending_hits or not (force or time.monotonic() - _last_flush >= HIT_FLUSH_SECONDS):
+            return
+        pending = dict(_pending_hits)
+        _pending_hits.clear()
+        _last_flush = time.monotonic()
+
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            for key, hits in pending.items():
+                AICachedResult.objects.filter(key=key).update(
+                    hit_count=F('hit_count') + hits, last_used_at=now
+                )
+    except DatabaseError:
+        logger.warning('Could not record AI cache hits', exc_info=True)
+
+
+def get(key, kind: str = ANALYSIS):
+    """
+    Return the cached ``kind`` result for ``key``, or None on a miss.
+
+    Returns a copy, so callers may mutate what they get back.
+    """
+    if not enabled(kind):
+        return None
+
+    result = _recall(key)
+    if result is not None:
+        _count('memory_hits')
+        with _lock:
+            _pending_hits[key] += 1
+        _flush_hits()
+        return copy.deepcopy(result)
+
+    now = timezone.now()
+    try:
+        # A savepoint, so a failure cannot poison a caller's transaction.
+        with transaction.atomic():
+            row = (
+                AICachedResult.objects.filter(
+                    key=key, created_at__gte=now - timedelta(seconds=ttl(kind))
+                )
+                .only('result', 'created_at')
+                .first()
+            )
+            if row is not None:
+                AICachedResult.objects.filter(pk=row.pk).update(
+                    hit_count=F('hit_count') + 1, last_used_at=now
+                )
+    except DatabaseError:
+        logger.warning('AI cache lookup failed; treating it as a miss', exc_info=True)
+        row = None
+
+    if row is None:
+        _count('misses')
+        return None
+
+    _count('db_hits')
+    # Kept no longer than the row itself, not a fresh TTL from now.
+    remaining = ttl(kind) - (now - row.created_at).total_seconds()
+    _remember(key, row.result, kind, remaining)
+    return copy.deepcopy(row.result)
+
+
+def put(key, model_name: str, result, kind: str = ANALYSIS) -> None:
+    """Store a successful ``kind`` result under ``key`` and evict beyond the size bound."""
+    if not enabled(kind):
+        return
+
+    _remember(key, copy.deepcopy(result), kind)
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            AICachedResult.objects.update_or_create(
+                key=key,
+                defaults={
+                    'kind': kind,
+                    'model_name': model_name,
+                    'result': result,
+                    'created_at': now,
+                    'last_used_at': now,
+                },
+            )
+            prune(now)
+    except DatabaseError:
+        logger.warning('AI cache write failed', exc_info=True)
+    _flush_hits()
+
+
+def prune(now=None) -> int:
+    """
+    Delete expired rows, then the least recently used beyond ``AI_CACHE_MAX_ENTRIES``.
+
+    Returns:
+        The number of rows deleted.
+    """
+    now = now or timezone.now()
+    deleted = 0
+    for kind in TTL_SETTINGS:
+        deleted += AICachedResult.objects.filter(
+            kind=kind, created_at__lt=now - timedelta(seconds=ttl(kind))
+        ).delete()[0]
+
+    excess = AICachedResult.objects.count() - getattr(settings, 'AI_CACHE_MAX_ENTRIES', 10000)
+    if excess > 0:
+        oldest = AICachedResult.objects.order_by('last_used_at', 'pk').values_list('pk', flat=True)
+        deleted += AICachedResult.objects.filter(pk__in=list(oldest[:excess])).delete()[0]
+    return deleted
+
+
+def stats() -> dict:
+    """This process's hit and miss counts, and the size of its LRU."""
+    with _lock:
+        return {
+            'memory_hits': _counters['memory_hits'],
+            'db_hits': _counters['db_hits'],
+            'misses': _counters['misses'],
+            'memory_entries': len(_memory),
+        }
+
+
+def hit_rates() -> dict:
+    """
+    Hits and hit rate per kind, over the rows in the table.
+
+    Every row was written after a miss, so a kind's rate is its hits over its
+    hits plus its rows. Rows already pruned, and the misses behind failed
+    calls that were never stored, are not counted.
+    """
+    _flush_hits(force=True)
+    totals = {
+        row['kind']: row
+        for row in AICachedResult.objects.values('kind').annotate(
+            entries=Count('pk'), hits=Sum('hit_count')
+        )
+    }
+    rates = {}
+    for kind in TTL_SETTINGS:
+        entries = totals.get(kind, {}).get('entries', 0)
+        hits = totals.get(kind, {}).get('hits') or 0
+        lookups = hits + entries
+        rates[kind] = {
+            'entries': entries,
+            'hits': hits,
+            'hit_rate': round(hits / lookups, 3) if lookups else None,
+        }
+    return rates
+
+
+def clear(database: bool = False) -> None:
+    """Empty this process's LRU and counters, and the table too if ``database``."""
+    _flush_hits(force=True)
+    with _lock:
+        _memory.clear()
+        _counters.clear()
+        _pending_hits.clear()
+    if database:
+        AICachedResult.objects.all().delete()
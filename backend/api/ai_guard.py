@@ -0,0 +1,304 @@
+"""
+Deadlines, a bulkhead and a circuit breaker around Gemini calls.
+
+A slow Gemini used to hold every worker that called it for as long as it took,
+leaving none for login or the dashboards. ``call`` now wraps each request:
+
+* Deadline: the request gets ``AI_TIMEOUT_SECONDS`` in total, passed on as the
+  SDK's per-request timeout. Steps with no timeout of their own, such as file
+  uploads, go through ``Deadline.run``, which rejects a step rather than
+  queue it while ``STEP_THREADS`` earlier ones are still unfinished.
+* Bulkhead: at most ``AI_MAX_CONCURRENCY`` calls per process are in flight;
+  one more is rejected at once rather than queued. It only binds where one
+  process runs several calls at once: the async views, and the threads
+  extracting a PDF's pages. A sync gunicorn worker serves one request at a
+  time, so there the worker count is what bounds calls across the deployment.
+* Circuit breaker: over the last ``WINDOW`` calls, an error rate of
+  ``AI_BREAKER_ERROR_RATE`` or a p95 latency of ``AI_BREAKER_P95_SECONDS``
+  opens the circuit. Calls are then rejected for
+  ``AI_BREAKER_COOLDOWN_SECONDS``, after which a single trial call decides
+  whether it closes again.
+
+``call_async`` applies the same protection to the async views' coroutines.
+Rejected calls raise ``Rejected`` carrying a ``retry_after`` hint, which
+``ai_service`` turns into its usual "unavailable" result. State is per process;
+``snapshot`` reports it for the health check.
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Outcomes the breaker judges, and how many it needs before it may trip.
+WINDOW = 20
+MIN_CALLS = 10
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class Rejected(RuntimeError):
+    """Raised instead of calling Gemini while the circuit is open or the bulkhead is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call has used up its ``AI_TIMEOUT_SECONDS``."""
+
+
+class Deadline:
+    """The time left for one call; steps of a call share it."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, raising ``DeadlineExceeded`` once there are none."""
+        left = self.expires_at - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceeded('The Gemini request ran out of time')
+        return left
+
+    def request_options(self) -> dict:
+        """SDK ``request_options`` that bound the next request by the time left."""
+        return {'timeout': self.remaining()}
+
+    def run(self, step, *args, **kwargs):
+        """
+        Run ``step``, which takes no timeout of its own, within the time left.
+
+        The step runs on a helper thread so the caller can stop waiting once
+        the deadline passes. It cannot be interrupted, so it finishes in the
+        background.
+
+        Raises:
+            DeadlineExceeded: No time was left, or ``step`` did not finish in it.
+            Rejected: ``STEP_THREADS`` steps are still running; ``step`` was not started.
+        """
+        left = self.remaining()
+        if not _step_slots.acquire(blocking=False):
+            raise Rejected('Too many Gemini uploads in progress; retrying shortly', 1)
+        try:
+            future = _steps.submit(step, *args, **kwargs)
+        except BaseException:
+            _step_slots.release()
+            raise
+        future.add_done_callback(lambda _: _step_slots.release())
+        try:
+            return future.result(timeout=left)
+        except TimeoutError as exc:
+            if future.done():
+                raise
+            raise DeadlineExceeded('The Gemini request ran out of time') from exc
+
+
+# Threads for Deadline.run. A step abandoned at its deadline holds its thread
+# until it finishes; the slots keep such steps from queueing up behind each
+# other and delaying new calls, which are rejected instead.
+STEP_THREADS = 8
+_steps = ThreadPoolExecutor(max_workers=STEP_THREADS, thread_name_prefix='ai-deadline')
+_step_slots = threading.BoundedSemaphore(STEP_THREADS)
+
+
+def timeout_seconds() -> float:
+    return getattr(settings, 'AI_TIMEOUT_SECONDS', 30)
+
+
+def cooldown_seconds() -> float:
+    return getattr(settings, 'AI_BREAKER_COOLDOWN_SECONDS', 30)
+
+
+class CircuitBreaker:
+    """Trips on the error rate or p95 latency of recent calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.opened_at = None
+            self.trial_in_flight = False
+            self.outcomes = deque(maxlen=WINDOW)  # (succeeded, seconds)
+
+    def before_call(self) -> None:
+        """Admit a call, or raise ``Rejected`` while the circuit is open."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                left = self.opened_at + cooldown_seconds() - time.monotonic()
+                if left > 0:
+                    raise Rejected('Gemini is unavailable; retrying shortly', _ceil(left))
+                self.state = HALF_OPEN
+            if self.trial_in_flight:
+                raise Rejected('Gemini is recovering; retrying shortly', _ceil(cooldown_seconds()))
+            self.trial_in_flight = True
+
+    def record(self, succeeded: bool, seconds: float) -> None:
+        """Judge a finished call, opening or closing the circuit as needed."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.trial_in_flight = False
+                if succeeded:
+                    logger.info('Gemini circuit closed after a successful trial call')
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                else:
+                    self._open('the trial call failed')
+                return
+
+            self.outcomes.append((succeeded, seconds))
+            if self.state != CLOSED or len(self.outcomes) < MIN_CALLS:
+                return
+            error_rate = self._error_rate()
+            p95 = self._p95()
+            if error_rate >= getattr(settings, 'AI_BREAKER_ERROR_RATE', 0.5):
+                self._open(f'error rate {error_rate:.0%}')
+            elif p95 >= getattr(settings, 'AI_BREAKER_P95_SECONDS', 20):
+                self._open(f'p95 latency {p95:.1f}s')
+
+    def abandon(self) -> None:
+        """Forget a call cancelled before Gemini answered; it says nothing about Gemini."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.trial_in_flight = False
+
+    def _open(self, reason: str) -> None:
+        logger.warning(
+            'Gemini circuit opened (%s); rejecting calls for %ss', reason, cooldown_seconds()
+        )
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def _error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(not succeeded for succeeded, _ in self.outcomes) / len(self.outcomes)
+
+    def _p95(self) -> float:
+        latencies = [seconds for _, seconds in self.outcomes]
+        if len(latencies) < 2:
+            return latencies[0] if latencies else 0.0
+        return statistics.quantiles(latencies, n=20)[-1]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'calls': len(self.outcomes),
+                'error_rate': round(self._error_rate(), 3),
+                'p95_seconds': round(self._p95(), 3),
+            }
+
+
+def _ceil(seconds: float) -> int:
+    return max(1, int(seconds + 0.999))
+
+
+breaker = CircuitBreaker()
+
+_bulkhead_lock = threading.Lock()
+_in_flight = 0
+
+
+def _enter_bulkhead() -> None:
+    global _in_flight
+    with _bulkhead_lock:
+        if _in_flight >= getattr(settings, 'AI_MAX_CONCURRENCY', 4):
+            raise Rejected('Too many Gemini requests in progress; retrying shortly', 1)
+        _in_flight += 1
+
+
+def _leave_bulkhead() -> None:
+    global _in_flight
+    with _bulkhead_lock:
+        _in_flight -= 1
+
+
+def call(request):
+    """
+    Run ``request(deadline)`` under the deadline, bulkhead and breaker.
+
+    ``request`` should pass ``deadline.request_options()`` to each SDK call it
+    makes. Its exceptions propagate after being counted against the breaker.
+
+    Raises:
+        Rejected: The circuit is open or the bulkhead is full; Gemini was not called.
+    """
+    _enter_bulkhead()
+    try:
+        breaker.before_call()
+        start = time.monotonic()
+        try:
+            result = request(Deadline(timeout_seconds()))
+        except Rejected:
+            # A step shed before reaching Gemini says nothing about it.
+            breaker.abandon()
+            raise
+        except BaseException:
+            breaker.record(False, time.monotonic() - start)
+            raise
+        breaker.record(True, time.monotonic() - start)
+        return result
+    finally:
+        _leave_bulkhead()
+
+
+async def call_async(request):
+    """
+    Await ``request(deadline)`` under the deadline, bulkhead and breaker.
+
+    As ``call``, but the deadline also bounds the whole coroutine, including
+    steps such as uploads that take no timeout of their own.
+
+    Raises:
+        Rejected: The circuit is open or the bulkhead is full; Gemini was not called.
+        DeadlineExceeded: ``request`` did not finish within ``AI_TIMEOUT_SECONDS``.
+    """
+    _enter_bulkhead()
+    try:
+        breaker.before_call()
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                request(Deadline(timeout_seconds())), timeout=timeout_seconds()
+            )
+        except asyncio.CancelledError:
+            # The client went away; that is no evidence against Gemini.
+            breaker.abandon()
+            raise
+        except TimeoutError as exc:
+            breaker.record(False, time.monotonic() - start)
+            raise DeadlineExceeded('The Gemini request ran out of time') from exc
+        except BaseException:
+            breaker.record(False, time.monotonic() - start)
+            raise
+        breaker.record(True, time.monotonic() - start)
+        return result
+    finally:
+        _leave_bulkhead()
+
+
+def snapshot() -> dict:
+    """The breaker's state and this process's in-flight calls, for the health check."""
+    with _bulkhead_lock:
+        in_flight = _in_flight
+    return {
+        **breaker.snapshot(),
+        'in_flight': in_flight,
+        'max_concurrency': getattr(settings, 'AI_MAX_CONCURRENCY', 4),
+    }
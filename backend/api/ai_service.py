@@ -5,14 +5,34 @@ The Gemini client is configured lazily so the project can be imported, migrated
 and tested without a GEMINI_API_KEY present. Every public function degrades to a
 ``{'success': False, 'error': ...}`` result when the key is missing rather than
 raising at import time.
+
+Model instances are kept in a per-process registry, so every call after the
+first reuses the same ``GenerativeModel`` and its client. ``warm_up`` fills the
+registry ahead of the first request; gunicorn and ``run_ai_worker`` call it at
+boot when ``AI_WARMUP`` is set.
+
+The ``*_async`` functions mirror the endpoints' sync functions on the SDK's
+async client, for the ASGI views in api/views/ai_async.py.
 """
 
+import asyncio
+import hashlib
+import io
 import json
 import logging
+import math
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import google.generativeai as genai
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from google.generativeai import client as genai_client
+
+from . import ai_cache, ai_guard, dictation, images, lab_text, pdf_pages
+from . import analysis_prompt as analysis_prompt_builder
 
 logger = logging.getLogger(__name__)
 
@@ -21,11 +41,29 @@ DEFAULT_MODEL = 'gemini-2.5-flash'
 # Guard so genai.configure() only runs once per process.
 _configured = False
 
+# GenerativeModel instances by model name, shared by every thread of the
+# process that built them. A forked child starts over: the parent's gRPC
+# channels must not be used from another process.
+_models = {}
+_models_lock = threading.Lock()
+_models_pid = os.getpid()
+
+# Seconds the warm-up ping may take before the worker boots without it.
+WARMUP_TIMEOUT_SECONDS = 5
+
 
 class AIServiceUnavailable(RuntimeError):
     """Raised when the Gemini API key is not configured."""
 
 
+class AIServiceDegraded(AIServiceUnavailable):
+    """Raised when a Gemini call is shed to protect the process (see api/ai_guard.py)."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 def is_configured() -> bool:
     """Return True when a Gemini API key is available in the environment."""
     return bool(os.environ.get('GEMINI_API_KEY'))
@@ -44,17 +82,130 @@ def _configure() -> None:
         _configured = True
 
 
+def _reset_after_fork() -> None:
+    """Drop the state a forked child inherited, so it configures its own client."""
+    global _configured, _models_lock, _models_pid
+    # The parent's lock may have been held mid-fork; the child needs a fresh one.
+    _models_lock = threading.Lock()
+    _models.clear()
+    _configured = False
+    _models_pid = os.getpid()
+
+
 def get_model(model_name: str = DEFAULT_MODEL):
-    """Return a configured Gemini model instance."""
-    _configure()
-    return genai.GenerativeModel(model_name)
+    """
+    Return this process's configured Gemini model instance for ``model_name``.
 
+    The first call per model name builds it; later calls return the same
+    instance, so its lazily created client is set up only once.
+    """
+    if _models_pid != os.getpid():
+        _reset_after_fork()
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            _configure()
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+    return model
+
+
+def clear_models() -> None:
+    """Forget the cached model instances; the next ``get_model`` rebuilds them."""
+    global _configured
+    with _models_lock:
+        _models.clear()
+        _configured = False
+
+
+def warm_up(model_names=(DEFAULT_MODEL,), ping: bool = True) -> bool:
+    """
+    Build the model instances and client a request would otherwise set up.
+
+    With ``ping``, a ``count_tokens`` call also opens the connection to the
+    API; it costs no quota. Never raises: a worker must boot even when Gemini
+    is unreachable.
+
+    Returns:
+        True when every model was warmed.
+    """
+    if not is_configured():
+        logger.info('Skipping Gemini warm-up: GEMINI_API_KEY is not set')
+        return False
+
+    warmed = True
+    for model_name in model_names:
+        try:
+            model = get_model(model_name)
+            # Creates the shared API client every model instance picks up.
+            genai_client.get_default_generative_client()
+            if ping:
+                model.count_tokens('ping', request_options={'timeout': WARMUP_TIMEOUT_SECONDS})
+        except Exception:  # noqa: BLE001 - warm-up is best effort
+            logger.warning('Gemini warm-up failed for model %s', model_name, exc_info=True)
+            warmed = False
+    return warmed
+
+
+def warm_up_if_enabled() -> bool:
+    """Run ``warm_up`` when the ``AI_WARMUP`` setting asks for it."""
+    if not getattr(settings, 'AI_WARMUP', False):
+        return False
+    return warm_up()
+
+
+def call_gemini(request):
+    """
+    Run ``request(deadline)`` under the AI deadline, bulkhead and circuit breaker.
+
+    Raises:
+        AIServiceDegraded: The call was shed without reaching Gemini.
+    """
+    try:
+        return ai_guard.call(request)
+    except ai_guard.Rejected as exc:
+        raise AIServiceDegraded(str(exc), exc.retry_after) from exc
+
+
+async def call_gemini_async(request):
+    """Await ``request(deadline)`` under the same protection as ``call_gemini``."""
+    try:
+        return await ai_guard.call_async(request)
+    except ai_guard.Rejected as exc:
+        raise AIServiceDegraded(str(exc), exc.retry_after) from exc
+
+
+def unavailable_result(exc: AIServiceUnavailable) -> dict:
+    """The failure result for a missing key or a shed call, with any retry hint."""
+    result = {'success': False, 'error': str(exc)}
+    if isinstance(exc, AIServiceDegraded):
+        result['retry_after'] = exc.retry_after
+    return result
+
+
+def try_generate_content(prompt, model_name: str = DEFAULT_MODEL, follow_up=None, **options):
+    """
+    Generate content with the default Gemini model; ``options`` go to ``generate_content``.
+
+    ``follow_up(response)`` may return a second prompt to ask in place of the
+    first answer. Both requests share one deadline and one bulkhead slot.
+    """
+    model = get_model(model_name)
+
+    def request(deadline):
+        response = model.generate_content(
+            prompt, request_options=deadline.request_options(), **options
+        )
+        second = follow_up(response) if follow_up else None
+        if second is None:
+            return response
+        return model.generate_content(second, request_options=deadline.request_options(), **options)
 
-def try_generate_content(prompt, model_name: str = DEFAULT_MODEL):
-    """Generate content with the default Gemini model."""
     try:
         logger.debug('Requesting AI generation with model %s', model_name)
-        return get_model(model_name).generate_content(prompt)
+        return call_gemini(request)
     except AIServiceUnavailable:
         raise
     except Exception:
@@ -89,68 +240,179 @@ def parse_json_payload(text: str, expect: str = 'object'):
             return None
 
 
-def analyze_health_data(screening_data: dict) -> dict:
+# Inputs the analysis prompt reads. Only these feed the prompt, and through it
+# the cache key, so unrelated keys in a request cannot defeat the cache.
+ANALYSIS_FIELDS = (
+    'age',
+    'gender',
+    'systolic_bp',
+    'diastolic_bp',
+    'heart_rate',
+    'height_cm',
+    'weight_kg',
+    'glucose_level',
+    'cholesterol_level',
+    'hemoglobin',
+    'wbc_count',
+    'platelet_count',
+    'blood_urea_nitrogen',
+    'creatinine',
+    'sodium',
+    'potassium',
+    'alt_sgpt',
+    'ast_sgot',
+    'albumin',
+    'total_bilirubin',
+    'smoking_status',
+    'physical_activity',
+    'risk_level',
+    'risk_score',
+)
+
+
+def normalize_input(value):
+    """
+    Canonicalise one prompt input so equal readings render identically.
+
+    ``120``, ``120.0`` and ``"120"`` all become ``120``; blanks become None.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if not math.isfinite(number):
+            return value
+        value = number
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+        if number.is_integer():
+            return int(number)
+        return round(number, 6)
+    return value
+
+
+def output_budget() -> int:
+    """Output tokens an analysis may use, ``AI_ANALYSIS_MAX_OUTPUT_TOKENS``."""
+    return getattr(settings, 'AI_ANALYSIS_MAX_OUTPUT_TOKENS', 2048)
+
+
+def analysis_prompt(data: dict, limit=None) -> str:
+    """The analysis prompt for already-normalized ``data`` (see api/analysis_prompt.py)."""
+    return analysis_prompt_builder.build(data, output_budget(), limit)
+
+
+def retry_analysis_prompt(data: dict) -> str:
+    """The prompt asked again, for shorter lists, after an answer hit the token cap."""
+    return analysis_prompt(data, analysis_prompt_builder.retry_limit(output_budget()))
+
+
+def analysis_generation_config() -> dict:
+    """Caps the analysis at ``output_budget`` tokens and asks for bare JSON."""
+    return {'max_output_tokens': output_budget(), 'response_mime_type': 'application/json'}
+
+
+def hit_token_cap(response) -> bool:
+    """Whether Gemini stopped at ``max_output_tokens``, leaving its JSON unfinished."""
+    candidates = getattr(response, 'candidates', None) or []
+    if not candidates:
+        return False
+    return getattr(candidates[0].finish_reason, 'name', None) == 'MAX_TOKENS'
+
+
+def retry_on_token_cap(data: dict):
+    """A ``follow_up`` asking again with shorter lists when the answer hit the token cap."""
+
+    def follow_up(response):
+        if not hit_token_cap(response):
+            return None
+        # Hindi costs the most tokens; one retry with shorter lists usually fits.
+        logger.warning('AI analysis hit the output token cap; retrying with shorter lists')
+        return retry_analysis_prompt(data)
+
+    return follow_up
+
+
+def analysis_request(screening_data: dict) -> tuple:
+    """The analysis prompt for ``screening_data``, its cache key and the normalized data."""
+    data = {field: normalize_input(screening_data.get(field)) for field in ANALYSIS_FIELDS}
+    prompt = analysis_prompt(data)
+    logger.debug(
+        'Analysis prompt of about %d tokens, output budget %d',
+        analysis_prompt_builder.estimate_tokens(prompt),
+        output_budget(),
+    )
+    return prompt, ai_cache.make_key(DEFAULT_MODEL, prompt), data
+
+
+def analysis_result(response_text: str, cache_key: str, risk_level=None) -> dict:
+    """Parse an analysis response, caching it under ``cache_key`` when usable."""
+    ai_analysis = parse_json_payload(response_text)
+    if ai_analysis is None:
+        logger.warning('AI analysis returned unparseable JSON: %s', response_text)
+        return {
+            'success': False,
+            'error': 'Failed to parse AI response',
+            'analysis': None,
+        }
+
+    ai_analysis = analysis_prompt_builder.trim(ai_analysis, output_budget())
+    # The markdown blocks the UI renders are built here rather than written by Gemini.
+    for key, language in (('formatted_insights', 'en'), ('formatted_insights_hi', 'hi')):
+        if key not in ai_analysis:
+            markdown = analysis_prompt_builder.insights(ai_analysis, risk_level, language)
+            if markdown is not None:
+                ai_analysis[key] = markdown
+    if 'formatted_insights' not in ai_analysis:
+        ai_analysis['formatted_insights'] = '**AI Health Assessment**\n\nAnalysis completed.'
+
+    ai_cache.put(cache_key, DEFAULT_MODEL, ai_analysis)
+    return {'success': True, 'analysis': ai_analysis}
+
+
+def analyze_health_data(screening_data: dict, use_cache: bool = True) -> dict:
     """
     Use Gemini AI to analyze patient health data and provide insights.
 
+    Results are cached by the model name and the prompt rendered from the
+    normalized inputs (see api/ai_cache.py), so a repeated analysis costs no
+    quota. A cached result carries ``'cached': True``. An answer cut off at
+    ``AI_ANALYSIS_MAX_OUTPUT_TOKENS`` is asked for once more, with shorter lists,
+    within the same ``AI_TIMEOUT_SECONDS``.
+
     Args:
         screening_data: Dictionary containing patient vitals, lifestyle, and lab data
+        use_cache: False skips the cache lookup; the fresh result is still stored.
 
     Returns:
         Dictionary with AI-generated analysis including risk assessment,
         recommendations, and health insights
     """
-    prompt = f"""
-        You are an expert medical AI assistant for rural health workers.
-        Analyze this patient's screening data and provide a clinical assessment.
-
-        Patient Data:
-        - Age: {screening_data.get('age')} | Gender: {screening_data.get('gender')}
-        - Vitals: BP {screening_data.get('systolic_bp')}/{screening_data.get('diastolic_bp')}, HR {screening_data.get('heart_rate')}
-        - BMI Data: Height {screening_data.get('height_cm')}cm, Weight {screening_data.get('weight_kg')}kg
-        - Lab: Glucose {screening_data.get('glucose_level')} mg/dL, Chol {screening_data.get('cholesterol_level')} mg/dL
-        - Hematology: Hb {screening_data.get('hemoglobin')}, WBC {screening_data.get('wbc_count')}, Plt {screening_data.get('platelet_count')}
-        - Metabolic: BUN {screening_data.get('blood_urea_nitrogen')}, Cr {screening_data.get('creatinine')}, Na {screening_data.get('sodium')}, K {screening_data.get('potassium')}
-        - Liver: ALT {screening_data.get('alt_sgpt')}, AST {screening_data.get('ast_sgot')}, Alb {screening_data.get('albumin')}, Bilirubin {screening_data.get('total_bilirubin')}
-        - Lifestyle: Smoking: {screening_data.get('smoking_status')}, Activity: {screening_data.get('physical_activity')}
-        - Computed Risk: {screening_data.get('risk_level')} (Score: {screening_data.get('risk_score')})
-
-        Output valid JSON with these fields:
-        1. "summary": A professional clinical summary focusing on any abnormalities.
-        2. "summary_hi": Same as summary but in Hindi.
-        3. "concerns": List of strings for key health risks.
-        4. "concerns_hi": Same as concerns but in Hindi.
-        5. "recommendations": List of strings for actionable advice.
-        6. "recommendations_hi": Same as recommendations but in Hindi.
-        7. "formatted_insights": A markdown string exactly matching this structure:
-           "**Medical Diagnostic Overview**\\n\\nThe screening reveals a **[Risk Level]** clinical status. Significant findings include [Findings].\\n\\n**Diagnostic Details:**\\n- [Detail 1]\\n- [Detail 2]\\n\\n**Clinical Guidance:**\\n1. [Guidance 1]\\n2. [Guidance 2]"
-        8. "formatted_insights_hi": Same formatted insights but in Hindi.
-        """
+    prompt, cache_key, data = analysis_request(screening_data)
+
+    if use_cache:
+        cached = ai_cache.get(cache_key)
+        if cached is not None:
+            return {'success': True, 'analysis': cached, 'cached': True}
 
     try:
-        response_text = try_generate_content(prompt).text
+        response = try_generate_content(
+            prompt,
+            follow_up=retry_on_token_cap(data),
+            generation_config=analysis_generation_config(),
+        )
+        response_text = response.text
     except AIServiceUnavailable as exc:
         logger.info('Skipping AI analysis: %s', exc)
-        return {'success': False, 'error': str(exc), 'analysis': None}
+        return {**unavailable_result(exc), 'analysis': None}
     except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
         logger.exception('AI analysis request failed')
         return {'success': False, 'error': str(exc), 'analysis': None}
 
-    ai_analysis = parse_json_payload(response_text)
-    if ai_analysis is None:
-        logger.warning('AI analysis returned unparseable JSON: %s', response_text)
-        return {
-            'success': False,
-            'error': 'Failed to parse AI response',
-            'analysis': None,
-        }
-
-    # Some responses omit the markdown block the UI renders; synthesise one.
-    if 'formatted_insights' not in ai_analysis:
-        summary = ai_analysis.get('summary', 'Analysis completed.')
-        ai_analysis['formatted_insights'] = f"**AI Health Assessment**\n\n{summary}"
-
-    return {'success': True, 'analysis': ai_analysis}
+    return analysis_result(response_text, cache_key, data['risk_level'])
 
 
 def generate_health_recommendations(patient_data: dict, screening_results: dict) -> list:
@@ -212,17 +474,8 @@ def generate_health_recommendations(patient_data: dict, screening_results: dict)
     return recommendations if recommendations is not None else fallback
 
 
-def extract_screening_data_from_file(file_path: str) -> dict:
-    """
-    Extract screening results (demographics, vitals, labs) from an image or PDF.
-
-    Args:
-        file_path: Path to the laboratory report or health document
-
-    Returns:
-        Dictionary containing extracted values
-    """
-    prompt = """
+# Prompts sent alongside an uploaded report and an uploaded dictation.
+DOCUMENT_PROMPT = """
         Analyze this health document (image or PDF) and extract all relevant patient, vitals, and medical data.
         Return a JSON object with the following fields (use null if not found):
 
@@ -246,41 +499,7 @@ def extract_screening_data_from_file(file_path: str) -> dict:
         }
         """
 
-    if not os.path.exists(file_path):
-        return {'success': False, 'error': f'File not found: {file_path}'}
-
-    try:
-        model = get_model()
-        uploaded_file = genai.upload_file(path=file_path)
-        response_text = model.generate_content([prompt, uploaded_file]).text
-    except AIServiceUnavailable as exc:
-        logger.info('Skipping document extraction: %s', exc)
-        return {'success': False, 'error': str(exc)}
-    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
-        logger.exception('Document extraction failed for %s', file_path)
-        return {'success': False, 'error': str(exc)}
-
-    data = parse_json_payload(response_text)
-    if data is None:
-        return {
-            'success': False,
-            'error': 'Failed to parse AI response',
-            'raw_response': response_text,
-        }
-    return {'success': True, 'data': data}
-
-
-def extract_vitals_from_audio(audio_file_path: str) -> dict:
-    """
-    Extract vitals from an audio recording of a health worker dictating vitals.
-
-    Args:
-        audio_file_path: Path to the temporary audio file
-
-    Returns:
-        Dictionary containing extracted vitals
-    """
-    prompt = """
+AUDIO_PROMPT = """
         Listen to this audio recording of a health worker dictating patient vitals.
         Extract the following information and return it as a JSON object:
         - height_cm (number)
@@ -301,38 +520,320 @@ def extract_vitals_from_audio(audio_file_path: str) -> dict:
         }
         """
 
-    try:
-        model = get_model()
-        audio_file = genai.upload_file(path=audio_file_path)
-        response_text = model.generate_content([prompt, audio_file]).text
-    except AIServiceUnavailable as exc:
-        logger.info('Skipping audio extraction: %s', exc)
-        return {'success': False, 'error': str(exc)}
-    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
-        logger.exception('Voice extraction failed for %s', audio_file_path)
-        return {'success': False, 'error': str(exc)}
 
-    vitals = parse_json_payload(response_text)
-    if vitals is None:
+def extraction_result(response_text: str) -> dict:
+    """Parse an extraction response into a ``{'success': True, 'data': ...}`` result."""
+    data = parse_json_payload(response_text)
+    if data is None:
         return {
             'success': False,
             'error': 'Failed to parse AI response',
             'raw_response': response_text,
         }
-    return {'success': True, 'data': vitals}
+    return {'success': True, 'data': data}
 
 
-def extract_vitals_from_text(text: str) -> dict:
+def content_sha256(source) -> str:
+    """The SHA-256 hex digest of a document given as a path or an open binary file."""
+    digest = hashlib.sha256()
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    position = source.tell()
+    for chunk in iter(lambda: source.read(1024 * 1024), b''):
+        digest.update(chunk)
+    source.seek(position)
+    return digest.hexdigest()
+
+
+def document_cache_key(sha256: str) -> str:
+    """The cache key for extracting screening data from the document with ``sha256``."""
+    return ai_cache.make_key(DEFAULT_MODEL, DOCUMENT_PROMPT, sha256)
+
+
+def store_document_result(result: dict, cache_key) -> dict:
     """
-    Extract vitals from transcribed speech.
+    Cache a successful extraction under ``cache_key``, if there is one, and return it.
+
+    A result missing pages that failed is not cached, so the next upload of
+    the document retries them.
+    """
+    if cache_key and result.get('success') and not result.get('failed_pages'):
+        ai_cache.put(cache_key, DEFAULT_MODEL, result['data'], kind=ai_cache.EXTRACTION)
+    return result
+
+
+# Characters of report text sent with the text-only prompt.
+MAX_LAB_TEXT_CHARS = 20000
+
+
+def is_pdf(file_path, mime_type: str = None) -> bool:
+    if mime_type is None and isinstance(file_path, (str, os.PathLike)):
+        return os.fspath(file_path).lower().endswith('.pdf')
+    return mime_type == 'application/pdf'
+
+
+def read_text_layer(file_path, mime_type: str = None):
+    """
+    Read what can be read locally from a digitally generated PDF report.
+
+    Returns:
+        ``(text, data, unresolved)`` as ``lab_text.parse`` gives them, or None
+        when the document is not a PDF with a text layer that names any lab
+        analyte, so Gemini has to read the file itself.
+    """
+    if not getattr(settings, 'AI_PDF_TEXT_LAYER', True) or not is_pdf(file_path, mime_type):
+        return None
+
+    text = lab_text.pdf_text(file_path)
+    if text is None:
+        return None
+    data, unresolved = lab_text.parse(text)
+    if not any(field in lab_text.LAB_BOUNDS for field in [*data, *unresolved]):
+        return None
+    return text, data, unresolved
+
+
+def lab_text_prompt(text: str, fields) -> str:
+    """The text-only prompt asking for the ``fields`` the local parser could not read."""
+    wanted = '\n'.join(
+        f'        - {field}'
+        + (f' ({lab_text.FORM_UNITS[field]})' if field in lab_text.FORM_UNITS else '')
+        for field in fields
+    )
+    return f"""
+        The text below was extracted from a patient's laboratory report.
+        Return a JSON object with only these fields, as numbers in the units
+        shown, converting if the report uses others. Use null for any field
+        the report does not give.
+{wanted}
+
+        Report text:
+        \"\"\"
+        {text[:MAX_LAB_TEXT_CHARS]}
+        \"\"\"
+        """
+
+
+def text_layer_result(data: dict, unresolved, response_text) -> dict:
+    """An extraction result from local values, plus Gemini's answer for the rest if any."""
+    if response_text is not None:
+        answer = parse_json_payload(response_text) or {}
+        data = {**data, **lab_text.validated(answer, unresolved)}
+    return {'success': True, 'data': lab_text.complete(data), 'source': 'text_layer'}
+
+
+def extract_from_text_layer(text: str, data: dict, unresolved):
+    """
+    Complete a text-layer extraction, asking Gemini only about ``unresolved``.
+
+    Returns:
+        The extraction result, or None when nothing was read locally and the
+        text-only prompt failed, so the file should be uploaded after all.
+    """
+    response_text = None
+    if unresolved:
+        try:
+            response_text = try_generate_content(lab_text_prompt(text, unresolved)).text
+        except Exception:  # noqa: BLE001 - the local values still stand
+            logger.warning('Text-only lab prompt failed for %s', unresolved, exc_info=True)
+            if not data:
+                return None
+    logger.info(
+        'Read %d fields from a PDF text layer; asked Gemini for %d', len(data), len(unresolved)
+    )
+    return text_layer_result(data, unresolved, response_text)
+
+
+def page_workers() -> int:
+    """Pages of one report extracted at once; never more than the bulkhead admits."""
+    workers = getattr(settings, 'AI_PDF_PAGE_WORKERS', 0)
+    return min(workers, getattr(settings, 'AI_MAX_CONCURRENCY', 4))
+
+
+def read_pages(file_path, mime_type: str = None):
+    """The pages of a multi-page PDF to extract one by one, or None to send it whole."""
+    if page_workers() < 1 or not is_pdf(file_path, mime_type):
+        return None
+    return pdf_pages.split(file_path)
+
+
+def cached_pages(pages) -> tuple:
+    """
+    Look up each page in the extraction cache.
+
+    Returns:
+        ``(keys, results)``: each page's cache key (None with the cache off)
+        and its cached result, or None where Gemini must read it.
+    """
+    if not ai_cache.enabled(ai_cache.EXTRACTION):
+        return [None] * len(pages), [None] * len(pages)
+    keys = [document_cache_key(hashlib.sha256(page).hexdigest()) for page in pages]
+    results = []
+    for key in keys:
+        cached = ai_cache.get(key, kind=ai_cache.EXTRACTION)
+        results.append(None if cached is None else {'success': True, 'data': cached})
+    return keys, results
+
+
+def pages_result(results) -> dict:
+    """
+    Merge per-page extraction results into the result for the whole document.
+
+    Pages that failed are listed in ``failed_pages`` (numbered from 1) and
+    left out; if every page failed, the first page's failure is returned.
+    """
+    failed = [number for number, result in enumerate(results, 1) if not result['success']]
+    if len(failed) == len(results):
+        return results[0]
+
+    data, conflicts = pdf_pages.merge([result['data'] for result in results if result['success']])
+    result = {'success': True, 'data': data, 'pages': len(results)}
+    if conflicts:
+        logger.info('Pages disagreed on %s', sorted(conflicts))
+        result['conflicts'] = conflicts
+    if failed:
+        logger.warning('Extraction failed for pages %s of %d', failed, len(results))
+        result['failed_pages'] = failed
+    return result
+
+
+def extract_pages(pages) -> dict:
+    """
+    Extract each page of a report concurrently and merge the results.
+
+    Pages already in the cache are not sent again, so a report re-uploaded
+    with a page added costs one Gemini call.
+    """
+    keys, results = cached_pages(pages)
+    pending = [index for index, result in enumerate(results) if result is None]
+
+    def extract(index):
+        return extract_from_upload(
+            io.BytesIO(pages[index]), DOCUMENT_PROMPT, 'page extraction', 'application/pdf'
+        )
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(page_workers(), len(pending))) as pool:
+            for index, result in zip(pending, pool.map(extract, pending), strict=True):
+                results[index] = store_document_result(result, keys[index])
+    return pages_result(results)
+
+
+def extract_from_upload(path, prompt: str, what: str, mime_type=None) -> dict:
+    """Upload ``path`` (or a binary file) and run ``prompt`` over it."""
+    try:
+        model = get_model()
+
+        def request(deadline):
+            # upload_file takes no timeout; the deadline bounds the wait for it.
+            uploaded = deadline.run(genai.upload_file, path=path, mime_type=mime_type)
+            return model.generate_content(
+                [prompt, uploaded], request_options=deadline.request_options()
+            )
+
+        response_text = call_gemini(request).text
+    except AIServiceUnavailable as exc:
+        logger.info('Skipping %s: %s', what, exc)
+        return unavailable_result(exc)
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
+        logger.exception('%s failed for %s', what.capitalize(), path)
+        return {'success': False, 'error': str(exc)}
+
+    return extraction_result(response_text)
+
+
+def extract_screening_data_from_file(file_path, mime_type: str = None, sha256: str = None) -> dict:
+    """
+    Extract screening results (demographics, vitals, labs) from an image or PDF.
+
+    Results are cached by the document's content hash (see api/ai_cache.py),
+    so the same report uploaded again costs no quota. A cached result carries
+    ``'cached': True``.
+
+    A PDF with a text layer is read locally first (see api/lab_text.py);
+    Gemini then gets a short text-only prompt for any field that could not be
+    read, and the file itself only when the text names no lab analyte. Other
+    multi-page PDFs are extracted page by page, in parallel (see
+    api/pdf_pages.py). Photos are shrunk before upload (see api/images.py).
 
     Args:
-        text: Transcribed text from voice input
+        file_path: Path to the laboratory report or health document, or the
+            document as an open binary file
+        mime_type: The document's MIME type; required for a file object,
+            guessed from the extension of a path otherwise
+        sha256: The document's SHA-256 hex digest, when already known (as for
+            uploads parsed by ``AIUploadHandler``); computed otherwise
+
+    Returns:
+        Dictionary containing extracted values
+    """
+    if isinstance(file_path, (str, os.PathLike)) and not os.path.exists(file_path):
+        return {'success': False, 'error': f'File not found: {file_path}'}
+
+    cache_key = None
+    if ai_cache.enabled(ai_cache.EXTRACTION):
+        cache_key = document_cache_key(sha256 or content_sha256(file_path))
+        cached = ai_cache.get(cache_key, kind=ai_cache.EXTRACTION)
+        if cached is not None:
+            return {'success': True, 'data': cached, 'cached': True}
+
+    layer = read_text_layer(file_path, mime_type)
+    if layer is not None:
+        result = extract_from_text_layer(*layer)
+        if result is not None:
+            return store_document_result(result, cache_key)
+
+    pages = read_pages(file_path, mime_type)
+    if pages is not None:
+        return store_document_result(extract_pages(pages), cache_key)
+
+    # Outside the deadline: shrinking a photo is our time, not Gemini's.
+    source, mime_type = images.prepare(file_path, mime_type)
+    result = extract_from_upload(source, DOCUMENT_PROMPT, 'document extraction', mime_type)
+    return store_document_result(result, cache_key)
+
+
+def extract_vitals_from_audio(audio_file_path, mime_type: str = None) -> dict:
+    """
+    Extract vitals from an audio recording of a health worker dictating vitals.
+
+    Args:
+        audio_file_path: Path to the temporary audio file, or the recording as
+            an open binary file
+        mime_type: The recording's MIME type; required for a file object
 
     Returns:
         Dictionary containing extracted vitals
     """
-    prompt = f"""
+
+    try:
+        model = get_model()
+
+        def request(deadline):
+            # upload_file takes no timeout; the deadline bounds the wait for it.
+            audio_file = deadline.run(genai.upload_file, path=audio_file_path, mime_type=mime_type)
+            return model.generate_content(
+                [AUDIO_PROMPT, audio_file], request_options=deadline.request_options()
+            )
+
+        response_text = call_gemini(request).text
+    except AIServiceUnavailable as exc:
+        logger.info('Skipping audio extraction: %s', exc)
+        return unavailable_result(exc)
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
+        logger.exception('Voice extraction failed for %s', audio_file_path)
+        return {'success': False, 'error': str(exc)}
+
+    return extraction_result(response_text)
+
+
+def text_vitals_prompt(text: str) -> str:
+    """The prompt that extracts screening fields from transcribed speech."""
+    return f"""
         Extract patient health data from the following transcribed speech:
         "{text}"
 
@@ -388,20 +889,209 @@ def extract_vitals_from_text(text: str) -> dict:
         }}
         """
 
+
+def dictated_result(text: str):
+    """The result for a transcript the local parser reads in full, or None to ask Gemini."""
+    if not getattr(settings, 'AI_DICTATION_PARSER', True):
+        return None
+    data = dictation.parse(text)
+    if data is None:
+        return None
+    logger.info('Read %d fields from a transcript without Gemini', len(data))
+    return {'success': True, 'data': lab_text.complete(data), 'source': 'local'}
+
+
+def extract_vitals_from_text(text: str) -> dict:
+    """
+    Extract vitals from transcribed speech.
+
+    Plain dictations are read by the rules in api/dictation.py; Gemini gets
+    only the transcripts they cannot fully account for.
+
+    Args:
+        text: Transcribed text from voice input
+
+    Returns:
+        Dictionary containing extracted vitals
+    """
+    result = dictated_result(text)
+    if result is not None:
+        return result
+
+    prompt = text_vitals_prompt(text)
+
     try:
         response_text = try_generate_content(prompt).text
     except AIServiceUnavailable as exc:
         logger.info('Skipping text extraction: %s', exc)
+        return unavailable_result(exc)
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
+        logger.exception('Text extraction failed')
+        return {'success': False, 'error': str(exc)}
+
+    return extraction_result(response_text)
+
+
+async def try_generate_content_async(
+    prompt, model_name: str = DEFAULT_MODEL, follow_up=None, **options
+):
+    """Generate content with the default Gemini model's async client; see ``try_generate_content``."""
+    model = get_model(model_name)
+
+    async def request(deadline):
+        response = await model.generate_content_async(
+            prompt, request_options=deadline.request_options(), **options
+        )
+        second = follow_up(response) if follow_up else None
+        if second is None:
+            return response
+        return await model.generate_content_async(
+            second, request_options=deadline.request_options(), **options
+        )
+
+    try:
+        logger.debug('Requesting async AI generation with model %s', model_name)
+        return await call_gemini_async(request)
+    except AIServiceUnavailable:
+        raise
+    except Exception:
+        logger.exception('Model %s failed to generate content', model_name)
+        raise
+
+
+async def analyze_health_data_async(screening_data: dict, use_cache: bool = True) -> dict:
+    """``analyze_health_data`` on the async client; the cache is shared."""
+    prompt, cache_key, data = analysis_request(screening_data)
+
+    if use_cache:
+        cached = await sync_to_async(ai_cache.get)(cache_key)
+        if cached is not None:
+            return {'success': True, 'analysis': cached, 'cached': True}
+
+    try:
+        response = await try_generate_content_async(
+            prompt,
+            follow_up=retry_on_token_cap(data),
+            generation_config=analysis_generation_config(),
+        )
+        response_text = response.text
+    except AIServiceUnavailable as exc:
+        logger.info('Skipping AI analysis: %s', exc)
+        return {**unavailable_result(exc), 'analysis': None}
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
+        logger.exception('AI analysis request failed')
+        return {'success': False, 'error': str(exc), 'analysis': None}
+
+    return await sync_to_async(analysis_result)(response_text, cache_key, data['risk_level'])
+
+
+async def extract_from_upload_async(path, prompt: str, what: str, mime_type=None) -> dict:
+    """Upload ``path`` (or a binary file) and run ``prompt`` over it on the async client."""
+    try:
+        model = get_model()
+
+        async def request(deadline):
+            # The SDK's upload is sync only; keep it off the event loop.
+            uploaded = await asyncio.to_thread(genai.upload_file, path=path, mime_type=mime_type)
+            return await model.generate_content_async(
+                [prompt, uploaded], request_options=deadline.request_options()
+            )
+
+        response_text = (await call_gemini_async(request)).text
+    except AIServiceUnavailable as exc:
+        logger.info('Skipping %s: %s', what, exc)
+        return unavailable_result(exc)
+    except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
+        logger.exception('%s failed for %s', what.capitalize(), path)
         return {'success': False, 'error': str(exc)}
+
+    return extraction_result(response_text)
+
+
+async def extract_from_text_layer_async(text: str, data: dict, unresolved):
+    """``extract_from_text_layer`` on the async client."""
+    response_text = None
+    if unresolved:
+        try:
+            prompt = lab_text_prompt(text, unresolved)
+            response_text = (await try_generate_content_async(prompt)).text
+        except Exception:  # noqa: BLE001 - the local values still stand
+            logger.warning('Text-only lab prompt failed for %s', unresolved, exc_info=True)
+            if not data:
+                return None
+    return text_layer_result(data, unresolved, response_text)
+
+
+async def extract_pages_async(pages) -> dict:
+    """``extract_pages`` on the async client, with the same bound on pages in flight."""
+    keys, results = await sync_to_async(cached_pages)(pages)
+    slots = asyncio.Semaphore(page_workers())
+
+    async def extract(index):
+        async with slots:
+            result = await extract_from_upload_async(
+                io.BytesIO(pages[index]), DOCUMENT_PROMPT, 'page extraction', 'application/pdf'
+            )
+        results[index] = await sync_to_async(store_document_result)(result, keys[index])
+
+    await asyncio.gather(
+        *(extract(index) for index, result in enumerate(results) if result is None)
+    )
+    return pages_result(results)
+
+
+async def extract_screening_data_from_file_async(
+    file_path, mime_type: str = None, sha256: str = None
+) -> dict:
+    """``extract_screening_data_from_file`` on the async client; the cache is shared."""
+    if isinstance(file_path, (str, os.PathLike)) and not os.path.exists(file_path):
+        return {'success': False, 'error': f'File not found: {file_path}'}
+
+    cache_key = None
+    if ai_cache.enabled(ai_cache.EXTRACTION):
+        cache_key = document_cache_key(sha256 or await asyncio.to_thread(content_sha256, file_path))
+        cached = await sync_to_async(ai_cache.get)(cache_key, kind=ai_cache.EXTRACTION)
+        if cached is not None:
+            return {'success': True, 'data': cached, 'cached': True}
+
+    layer = await asyncio.to_thread(read_text_layer, file_path, mime_type)
+    if layer is not None:
+        result = await extract_from_text_layer_async(*layer)
+        if result is not None:
+            return await sync_to_async(store_document_result)(result, cache_key)
+
+    pages = await asyncio.to_thread(read_pages, file_path, mime_type)
+    if pages is not None:
+        result = await extract_pages_async(pages)
+        return await sync_to_async(store_document_result)(result, cache_key)
+
+    source, mime_type = await images.prepare_async(file_path, mime_type)
+    result = await extract_from_upload_async(
+        source, DOCUMENT_PROMPT, 'document extraction', mime_type
+    )
+    return await sync_to_async(store_document_result)(result, cache_key)
+
+
+async def extract_vitals_from_audio_async(audio_file_path, mime_type: str = None) -> dict:
+    """``extract_vitals_from_audio`` on the async client."""
+    return await extract_from_upload_async(
+        audio_file_path, AUDIO_PROMPT, 'audio extraction', mime_type
+    )
+
+
+async def extract_vitals_from_text_async(text: str) -> dict:
+    """``extract_vitals_from_text`` on the async client."""
+    result = dictated_result(text)
+    if result is not None:
+        return result
+
+    try:
+        response_text = (await try_generate_content_async(text_vitals_prompt(text))).text
+    except AIServiceUnavailable as exc:
+        logger.info('Skipping text extraction: %s', exc)
+        return unavailable_result(exc)
     except Exception as exc:  # noqa: BLE001 - surfaced to the caller as a result
         logger.exception('Text extraction failed')
         return {'success': False, 'error': str(exc)}
 
-    data = parse_json_payload(response_text)
-    if data is None:
-        return {
-            'success': False,
-            'error': 'Failed to parse AI response',
-            'raw_response': response_text,
-        }
-    return {'success': True, 'data': data}
+    return extraction_result(response_text)
@@ -0,0 +1,196 @@
+"""
+The health-analysis prompt, built from the fields a screening actually has.
+
+The prompt used to list every vital and lab field, printing ``None`` for the
+twenty or so that are usually missing. It also asked Gemini to write the
+assessment four times over, in English and Hindi, two of them as full
+markdown documents. ``build`` now:
+
+* leaves out missing fields, and the panels left with none;
+* asks for the summary, concerns and recommendations in both languages,
+  with at most ``list_limit`` items per list so the answer fits the output
+  budget; and
+* leaves the two markdown documents to ``insights``, which renders them
+  from that answer without spending output tokens.
+
+``estimate_tokens`` gives a rough token count for logging and the
+benchmarks. It is not the tokenizer's exact count.
+"""
+
+import math
+import textwrap
+
+# Each panel lists (field, label, unit) in the order the prompt shows them.
+PANELS = [
+    ('Patient', [('age', 'Age', ''), ('gender', 'Gender', '')]),
+    ('Vitals', [('blood_pressure', 'BP', ''), ('heart_rate', 'HR', '')]),
+    ('BMI Data', [('height_cm', 'Height', 'cm'), ('weight_kg', 'Weight', 'kg')]),
+    ('Lab', [('glucose_level', 'Glucose', ' mg/dL'), ('cholesterol_level', 'Chol', ' mg/dL')]),
+    (
+        'Hematology',
+        [('hemoglobin', 'Hb', ''), ('wbc_count', 'WBC', ''), ('platelet_count', 'Plt', '')],
+    ),
+    (
+        'Metabolic',
+        [
+            ('blood_urea_nitrogen', 'BUN', ''),
+            ('creatinine', 'Cr', ''),
+            ('sodium', 'Na', ''),
+            ('potassium', 'K', ''),
+        ],
+    ),
+    (
+        'Liver',
+        [
+            ('alt_sgpt', 'ALT', ''),
+            ('ast_sgot', 'AST', ''),
+            ('albumin', 'Alb', ''),
+            ('total_bilirubin', 'Bilirubin', ''),
+        ],
+    ),
+    ('Lifestyle', [('smoking_status', 'Smoking:', ''), ('physical_activity', 'Activity:', '')]),
+]
+
+# Output tokens for the two summaries and the JSON around them, and for one
+# list item in both languages; Hindi takes about twice the tokens of English.
+SUMMARY_TOKENS = 250
+ITEM_TOKENS = 75
+
+# Items per list however large the budget; more only repeats itself.
+MAX_ITEMS = 5
+
+HEADINGS = {
+    'en': ('Medical Diagnostic Overview', 'Diagnostic Details:', 'Clinical Guidance:'),
+    'hi': ('चिकित्सा निदान अवलोकन', 'निदान विवरण:', 'नैदानिक मार्गदर्शन:'),
+}
+
+RISK_STATUS = {
+    'en': 'The screening reveals a **{}** clinical status.',
+    'hi': 'जांच में **{}** नैदानिक स्थिति पाई गई है।',
+}
+
+RISK_LEVELS_HI = {'low': 'कम', 'moderate': 'मध्यम', 'medium': 'मध्यम', 'high': 'उच्च'}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly how many tokens Gemini counts for ``text``.
+
+    About four characters of English make a token. Devanagari takes roughly
+    one token for every two characters.
+    """
+    latin = sum(1 for character in text if character.isascii())
+    return math.ceil(latin / 4 + (len(text) - latin) / 2)
+
+
+def list_limit(budget: int) -> int:
+    """The items each of the four lists may have to fit an answer in ``budget`` tokens."""
+    return max(1, min(MAX_ITEMS, (budget - SUMMARY_TOKENS) // (2 * ITEM_TOKENS)))
+
+
+def retry_limit(budget: int) -> int:
+    """The shorter lists asked for after an answer overran ``budget``."""
+    return max(1, list_limit(budget) // 2)
+
+
+def _panel_line(name, fields, data):
+    parts = []
+    for field, label, unit in fields:
+        if field == 'blood_pressure':
+            systolic, diastolic = data.get('systolic_bp'), data.get('diastolic_bp')
+            if systolic is not None or diastolic is not None:
+                parts.append(f'BP {_text(systolic)}/{_text(diastolic)}')
+        elif data.get(field) is not None:
+            parts.append(f'{label} {data[field]}{unit}')
+    if not parts:
+        return None
+    separator = ' | ' if name == 'Patient' else ', '
+    return f'- {name}: {separator.join(parts)}'
+
+
+def _text(value):
+    return '?' if value is None else value
+
+
+def patient_lines(data: dict) -> list:
+    """One line per panel with any value in ``data``, and the computed risk."""
+    lines = [_panel_line(name, fields, data) for name, fields in PANELS]
+    lines = [line for line in lines if line]
+    if data.get('risk_level') is not None or data.get('risk_score') is not None:
+        risk = data.get('risk_level') or 'Unknown'
+        score = f' (Score: {data["risk_score"]})' if data.get('risk_score') is not None else ''
+        lines.append(f'- Computed Risk: {risk}{score}')
+    return lines or ['- Nothing was measured.']
+
+
+def build(data: dict, budget: int, limit=None) -> str:
+    """
+    The analysis prompt for already-normalized ``data``, sized for ``budget`` output tokens.
+
+    ``limit`` overrides the items per list that ``list_limit`` picks.
+    """
+    limit = limit or list_limit(budget)
+    lines = '\n'.join(patient_lines(data))
+    prompt = textwrap.dedent(
+        f"""
+        You are an expert medical AI assistant for rural health workers.
+        Analyze this patient's screening data and provide a clinical assessment.
+        Only the measurements listed were taken.
+
+        Patient Data:
+        {{lines}}
+
+        Output valid JSON with these fields:
+        1. "summary": A professional clinical summary focusing on any abnormalities, in at most three sentences.
+        2. "summary_hi": Same as summary but in Hindi.
+        3. "concerns": List of at most {limit} short strings for key health risks.
+        4. "concerns_hi": Same as concerns but in Hindi.
+        5. "recommendations": List of at most {limit} short strings for actionable advice.
+        6. "recommendations_hi": Same as recommendations but in Hindi.
+        """
+    ).strip()
+    # Substituted after dedent, which a multi-line value would defeat.
+    return prompt.replace('{lines}', lines)
+
+
+def trim(analysis: dict, budget: int) -> dict:
+    """``analysis`` with each list cut to the ``list_limit`` the prompt asked for."""
+    limit = list_limit(budget)
+    for key in ('concerns', 'concerns_hi', 'recommendations', 'recommendations_hi'):
+        if isinstance(analysis.get(key), list):
+            analysis[key] = analysis[key][:limit]
+    return analysis
+
+
+def insights(analysis: dict, risk_level=None, language: str = 'en'):
+    """
+    The markdown assessment the UI renders, from the answer's own fields.
+
+    Returns:
+        The document in ``language`` (``'en'`` or ``'hi'``), or None when the
+        answer has no summary in that language.
+    """
+    suffix = '' if language == 'en' else f'_{language}'
+    summary = analysis.get(f'summary{suffix}')
+    if not summary:
+        return None
+    overview, details, guidance = HEADINGS[language]
+
+    opening = summary
+    if risk_level:
+        level = str(risk_level)
+        if language == 'hi':
+            level = RISK_LEVELS_HI.get(level.lower(), level)
+        opening = f'{RISK_STATUS[language].format(level)} {summary}'
+    sections = [f'**{overview}**', opening]
+
+    concerns = analysis.get(f'concerns{suffix}') or []
+    if concerns:
+        sections.append(f'**{details}**\n' + '\n'.join(f'- {item}' for item in concerns))
+    recommendations = analysis.get(f'recommendations{suffix}') or []
+    if recommendations:
+        sections.append(
+            f'**{guidance}**\n'
+            + '\n'.join(f'{number}. {item}' for number, item in enumerate(recommendations, 1))
+        )
+    return '\n\n'.join(sections)
@@ -0,0 +1,160 @@
+"""
+Scope-aware caching for the dashboard and analytics responses.
+
+Cached payloads are keyed by scope (one per health worker, plus ``global`` for
+every other role), by endpoint and by query string. Each scope carries a
+version counter; writes to patients, screenings and appointments bump the
+counters they affect (see ``api.signals``), which orphans every stale entry at
+once without having to enumerate keys. The bump waits for the write's
+transaction to commit; made earlier, a request in between would recompute
+from the pre-commit rows and cache them under the new version.
+
+A miss is single-flighted: one caller per key computes the payload while the
+others wait for it, first on an in-process lock and then on a short-lived
+lock entry in the shared cache, so a burst of requests after a deploy or a
+write triggers one recomputation rather than one per request.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from functools import partial
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_SCOPE = 'global'
+
+KEY_PREFIX = 'dashboard'
+
+# How long a computing caller may hold the cross-process lock, and how long
+# the others wait for its result before computing it themselves.
+LOCK_TIMEOUT_SECONDS = 30
+WAIT_TIMEOUT_SECONDS = 10
+POLL_INTERVAL_SECONDS = 0.05
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def worker_scope(worker_id) -> str:
+    """The cache scope holding one health worker's caseload."""
+    return f'worker:{worker_id}'
+
+
+def _version_key(scope: str) -> str:
+    return f'{KEY_PREFIX}:version:{scope}'
+
+
+def current_version(scope: str) -> int:
+    """
+    Return the scope's version counter, creating it on first use.
+
+    A fresh counter starts from the clock rather than 1, so a counter that has
+    been evicted never comes back at a value older entries were written under.
+    """
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*scopes) -> None:
+    """Bump the version of each scope, orphaning everything cached under it."""
+    for scope in set(scopes):
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # No counter yet: nothing can have been cached under this scope.
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate_workers(*worker_ids) -> None:
+    """Invalidate the given workers' scopes and the global scope they roll up into."""
+    invalidate(GLOBAL_SCOPE, *(worker_scope(worker_id) for worker_id in worker_ids if worker_id))
+
+
+def invalidate_workers_on_commit(*worker_ids) -> None:
+    """``invalidate_workers`` once the current transaction commits, or now outside one."""
+    transaction.on_commit(partial(invalidate_workers, *worker_ids))
+
+
+def cache_key(scope: str, name: str, params) -> str:
+    """Build the entry key for one endpoint, scope version and query string."""
+    # Trend windows end today, so yesterday's entries must not be served.
+    query = urlencode(sorted((key, value) for key, value in params.items()))
+    digest = hashlib.sha256(f'{timezone.localdate()}?{query}'.encode()).hexdigest()[:32]
+    return f'{KEY_PREFIX}:{name}:{scope}:v{current_version(scope)}:{digest}'
+
+
+def _local_lock(key: str) -> threading.Lock:
+    with _local_locks_guard:
+        return _local_locks.setdefault(key, threading.Lock())
+
+
+def _release_local_lock(key: str) -> None:
+    with _local_locks_guard:
+        _local_locks.pop(key, None)
+
+
+def _wait_for(key: str, lock_key: str):
+    """Poll for another caller's result until it lands, its lock lapses, or we give up."""
+    deadline = time.monotonic() + WAIT_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return None
+
+
+def get_or_compute(scope: str, name: str, params, compute):
+    """
+    Return the cached payload for ``name`` in ``scope``, computing it on a miss.
+
+    Args:
+        scope: ``GLOBAL_SCOPE`` or a :func:`worker_scope` value.
+        name: A stable identifier for the endpoint.
+        params: The request's query parameters; part of the key.
+        compute: Zero-argument callable building the payload.
+    """
+    timeout = settings.DASHBOARD_CACHE_TIMEOUT
+    if not timeout:
+        return compute()
+
+    key = cache_key(scope, name, params)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock = _local_lock(key)
+    with lock:
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        lock_key = f'{key}:lock'
+        if not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT_SECONDS):
+            value = _wait_for(key, lock_key)
+            if value is not None:
+                return value
+            logger.info('Dashboard cache wait timed out for %s; computing locally', key)
+
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+            _release_local_lock(key)
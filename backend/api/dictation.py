@@ -0,0 +1,441 @@
+"""
+Read vitals from a dictated transcript without asking Gemini.
+
+Most voice entries are short dictations such as "BP 130 over 85, pulse 72,
+weight 64 kilo", and sending each one to Gemini cost a second or more and
+quota. ``parse`` reads them with rules:
+
+* English number words, including the spoken "one thirty" for 130 and
+  "point" for decimals, and Devanagari digits;
+* "over", "by", "/" and "बटा" between the two blood-pressure readings;
+* English and Hindi (Devanagari or romanised) keywords for each vital and
+  common lab value, before or after the number; and
+* units, converting pounds, feet and inches, and metres to the form's units.
+
+Hindi numbers are expected as digits, which is how speech recognition for
+``hi-IN`` writes them.
+
+A value is kept only inside the serializers' bounds. The result is trusted
+only when every word of the transcript was accounted for, as a keyword, a
+value, a unit or filler. Anything else, such as a name, a village or
+"smokes daily", leaves the transcript to Gemini.
+"""
+
+import re
+
+from . import lab_text
+
+# Unicode letters of the Devanagari block, which ``\\w`` misses for vowel signs.
+LETTER = r'\wऀ-ॿ'
+START = rf'(?<![{LETTER}])'
+END = rf'(?![{LETTER}])'
+
+NUMBER = r'(\d+(?:\.\d+)?)'
+
+ONES = {
+    'zero': 0,
+    'oh': 0,
+    'one': 1,
+    'two': 2,
+    'three': 3,
+    'four': 4,
+    'five': 5,
+    'six': 6,
+    'seven': 7,
+    'eight': 8,
+    'nine': 9,
+}
+TEENS = {
+    'ten': 10,
+    'eleven': 11,
+    'twelve': 12,
+    'thirteen': 13,
+    'fourteen': 14,
+    'fifteen': 15,
+    'sixteen': 16,
+    'seventeen': 17,
+    'eighteen': 18,
+    'nineteen': 19,
+}
+TENS = {
+    'twenty': 20,
+    'thirty': 30,
+    'forty': 40,
+    'fourty': 40,
+    'fifty': 50,
+    'sixty': 60,
+    'seventy': 70,
+    'eighty': 80,
+    'ninety': 90,
+}
+NUMBER_WORDS = {*ONES, *TEENS, *TENS, 'hundred', 'point'}
+
+DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+
+# Keywords for each field, English first, then Hindi in both scripts.
+KEYWORDS = {
+    'blood_pressure': [
+        'blood pressure',
+        'bp',
+        'b p',
+        'pressure',
+        'बीपी',
+        'बी पी',
+        'ब्लड प्रेशर',
+        'रक्तचाप',
+        'रक्त चाप',
+        'raktchap',
+    ],
+    'heart_rate': [
+        'heart rate',
+        'pulse rate',
+        'pulse',
+        'hr',
+        'heartbeat',
+        'नाड़ी',
+        'नाडी',
+        'नब्ज़',
+        'नब्ज',
+        'पल्स',
+        'धड़कन',
+        'धडकन',
+        'हृदय गति',
+        'nadi',
+        'nabz',
+        'dhadkan',
+    ],
+    'weight_kg': ['body weight', 'weight', 'wt', 'वजन', 'वज़न', 'भार', 'vajan', 'wajan', 'vazan'],
+    'height_cm': ['height', 'ht', 'लंबाई', 'लम्बाई', 'ऊंचाई', 'ऊँचाई', 'कद', 'lambai', 'kad'],
+    'age': ['age', 'aged', 'उम्र', 'आयु', 'umar', 'umr', 'umra'],
+    'glucose_level': [
+        'random blood sugar',
+        'fasting blood sugar',
+        'fasting sugar',
+        'blood sugar',
+        'sugar level',
+        'sugar',
+        'glucose',
+        'rbs',
+        'fbs',
+        'शुगर',
+        'शर्करा',
+        'ग्लूकोज',
+        'ग्लूकोज़',
+    ],
+    'cholesterol_level': ['cholesterol', 'कोलेस्ट्रॉल', 'कोलेस्ट्रोल'],
+    'hemoglobin': ['haemoglobin', 'hemoglobin', 'hb', 'हीमोग्लोबिन'],
+    'rbc_count': ['rbc count', 'rbc'],
+    'wbc_count': ['wbc count', 'wbc', 'white cell count'],
+    'platelet_count': ['platelet count', 'platelets', 'platelet'],
+    'blood_urea_nitrogen': ['blood urea nitrogen', 'bun'],
+    'creatinine': ['serum creatinine', 'creatinine'],
+    'sodium': ['sodium'],
+    'potassium': ['potassium'],
+    'chloride': ['chloride'],
+    'calcium': ['calcium'],
+    'alt_sgpt': ['sgpt', 'alt'],
+    'ast_sgot': ['sgot', 'ast'],
+    'albumin': ['albumin'],
+    'total_bilirubin': ['total bilirubin', 'bilirubin'],
+}
+
+GENDERS = {
+    'Male': ['male', 'man', 'boy', 'पुरुष', 'आदमी', 'लड़का', 'purush', 'mard'],
+    'Female': ['female', 'woman', 'girl', 'lady', 'महिला', 'स्त्री', 'औरत', 'लड़की', 'mahila'],
+}
+
+# Units, with the factor to the form's unit, and the field a unit alone implies.
+UNITS = {
+    'kg': ('weight_kg', 1.0),
+    'kgs': ('weight_kg', 1.0),
+    'kilo': ('weight_kg', 1.0),
+    'kilos': ('weight_kg', 1.0),
+    'kilogram': ('weight_kg', 1.0),
+    'kilograms': ('weight_kg', 1.0),
+    'किलो': ('weight_kg', 1.0),
+    'किलोग्राम': ('weight_kg', 1.0),
+    'lb': ('weight_kg', 0.4536),
+    'lbs': ('weight_kg', 0.4536),
+    'pounds': ('weight_kg', 0.4536),
+    'cm': ('height_cm', 1.0),
+    'cms': ('height_cm', 1.0),
+    'centimeter': ('height_cm', 1.0),
+    'centimeters': ('height_cm', 1.0),
+    'centimetre': ('height_cm', 1.0),
+    'centimetres': ('height_cm', 1.0),
+    'सेंटीमीटर': ('height_cm', 1.0),
+    'meter': ('height_cm', 100.0),
+    'meters': ('height_cm', 100.0),
+    'metre': ('height_cm', 100.0),
+    'metres': ('height_cm', 100.0),
+    'मीटर': ('height_cm', 100.0),
+    'inch': ('height_cm', 2.54),
+    'inches': ('height_cm', 2.54),
+    'इंच': ('height_cm', 2.54),
+    'bpm': ('heart_rate', 1.0),
+    'beats per minute': ('heart_rate', 1.0),
+    'beats a minute': ('heart_rate', 1.0),
+    'per minute': ('heart_rate', 1.0),
+    'प्रति मिनट': ('heart_rate', 1.0),
+    'years old': ('age', 1.0),
+    'year old': ('age', 1.0),
+    'years': ('age', 1.0),
+    'year': ('age', 1.0),
+    'yrs': ('age', 1.0),
+    'साल': ('age', 1.0),
+    'वर्ष': ('age', 1.0),
+    'saal': ('age', 1.0),
+    'mg/dl': (None, 1.0),
+    'mg per dl': (None, 1.0),
+    'milligrams': (None, 1.0),
+    'g/dl': (None, 1.0),
+    'grams': (None, 1.0),
+    'gram': (None, 1.0),
+    'mmol': (None, 1.0),
+    'mmhg': (None, 1.0),
+}
+
+# Words that carry nothing the form needs.
+FILLER = {
+    *'a an and the is are was were of at to with his her its their this that it'.split(),
+    *'patient patients patient\'s reading readings level value measured today now'.split(),
+    *'about around approximately roughly okay ok so then also next and comma please'.split(),
+    *'old rate count normal note noted record recorded'.split(),
+    *'है हैं था थी का की के और तो जी मरीज़ मरीज उसका उसकी'.split(),
+    *'hai hain tha thi ka ki ke aur toh to ji mareez marij'.split(),
+}
+
+# "over" between the two readings; "by" and "upon" are heard as well.
+BLOOD_PRESSURE = re.compile(
+    rf'(\d{{2,3}})\s*(?:/|{START}(?:over|by|upon|बटा|bata){END})\s*(\d{{2,3}})'
+)
+
+FEET_INCHES = re.compile(
+    rf'{START}(\d)(?:\s*(?:feet|foot|ft|फुट|फ़ीट|fut)|\')\s*(?:(\d{{1,2}}(?:\.\d+)?)'
+    rf'(?:\s*(?:inches|inch|in|इंच)|")?)?{END}'
+)
+
+
+def _alternation(words) -> str:
+    # Longest first, so "blood pressure" wins over "pressure".
+    return '|'.join(
+        re.escape(word).replace(r'\ ', r'\s+') for word in sorted(words, key=len, reverse=True)
+    )
+
+
+KEYWORD_FIELDS = {word: field for field, words in KEYWORDS.items() for word in words}
+KEYWORD = re.compile(rf'{START}({_alternation(KEYWORD_FIELDS)}){END}')
+UNIT = re.compile(rf'\s*({_alternation(UNITS)}){END}')
+GENDER_FIELDS = {word: gender for gender, words in GENDERS.items() for word in words}
+GENDER = re.compile(rf'{START}({_alternation(GENDER_FIELDS)}){END}')
+
+# Filler a keyword may be separated from its value by: "weight is 64", "वजन है 64".
+SEPARATOR = rf'(?:\s*[:=\-]\s*|\s+)(?:(?:{_alternation(FILLER)})\s+)*'
+
+
+def _number_run(words, start):
+    """
+    Read one number from the number words at ``words[start:]``.
+
+    Returns:
+        ``(value, end)``, or None when ``words[start]`` does not begin one.
+    """
+    index = start
+
+    def take(table):
+        nonlocal index
+        if index < len(words) and words[index] in table:
+            index += 1
+            return table[words[index - 1]]
+        return None
+
+    def below_hundred():
+        tens = take(TENS)
+        if tens is not None:
+            ones = take(ONES)
+            return tens + (ones or 0)
+        teen = take(TEENS)
+        return teen if teen is not None else take(ONES)
+
+    value = below_hundred()
+    if index < len(words) and words[index] == 'hundred':
+        index += 1
+        value = (value or 1) * 100
+        if index < len(words) and words[index] == 'and':
+            index += 1
+        value += below_hundred() or 0
+    elif value is not None and value < 10:
+        # "one thirty", "one twenty five": the hundreds are spoken as a digit.
+        mark = index
+        rest = below_hundred()
+        if rest is not None and rest >= 10:
+            value = value * 100 + rest
+        else:
+            index = mark
+    if value is None:
+        return None
+
+    if index + 1 < len(words) and words[index] == 'point' and words[index + 1] in ONES:
+        index += 1
+        digits = ''
+        while index < len(words) and words[index] in ONES:
+            digits += str(ONES[words[index]])
+            index += 1
+        value = float(f'{value}.{digits}')
+    return value, index
+
+
+def normalize(text: str) -> str:
+    """Lower-case ``text`` and write its numbers as digits."""
+    text = text.lower().translate(DEVANAGARI_DIGITS).replace('’', "'")
+    text = re.sub(r'(?<=\d),(?=\d{3})', '', text)
+    words = re.split(r'(\s+|-)', text)
+    # Words alternate with their separators; read the words alone.
+    tokens = words[::2]
+    output = []
+    index = 0
+    while index < len(tokens):
+        word = tokens[index].strip('.,;!?')
+        run = _number_run([token.strip('.,;!?') for token in tokens], index)
+        if word in NUMBER_WORDS and word != 'point' and run is not None:
+            value, end = run
+            # Keep the punctuation after the last word: "seventy two," is "72,".
+            trailing = tokens[end - 1][len(tokens[end - 1].rstrip('.,;!?')) :]
+            output.append((f'{value:g}' if isinstance(value, float) else str(value)) + trailing)
+            index = end
+            continue
+        output.append(tokens[index])
+        index += 1
+    return ' '.join(output)
+
+
+def _unit(unit):
+    """``(field, factor)`` for a unit as written, or ``(None, 1.0)`` for none."""
+    return UNITS[re.sub(r'\s+', ' ', unit)] if unit else (None, 1.0)
+
+
+def _fits(field, unit) -> bool:
+    return _unit(unit)[0] in (None, field)
+
+
+class Reading:
+    """The fields read from one transcript, and the spans of it they account for."""
+
+    def __init__(self, text):
+        self.text = text
+        self.data = {}
+        self.taken = []
+        self.named = set()
+        self.rejected = False
+
+    def free(self, start, end) -> bool:
+        return all(
+            end <= taken_start or start >= taken_end for taken_start, taken_end in self.taken
+        )
+
+    def take(self, start, end):
+        self.taken.append((start, end))
+
+    def set(self, field, value) -> None:
+        """Keep ``value`` if plausible and not contradicted; otherwise give up on the transcript."""
+        if value is None or not lab_text.in_bounds(field, value):
+            self.rejected = True
+            return
+        value = lab_text.coerce(field, value)
+        if self.data.get(field, value) != value:
+            self.rejected = True
+        self.data[field] = value
+
+    def leftover(self):
+        """The words no rule accounted for."""
+        text = list(self.text)
+        for start, end in self.taken:
+            text[start:end] = ' ' * (end - start)
+        words = re.findall(rf'[{LETTER}\'/]+|\d+(?:\.\d+)?', ''.join(text))
+        return [word for word in words if word not in FILLER]
+
+
+def _read_blood_pressure(reading):
+    for match in BLOOD_PRESSURE.finditer(reading.text):
+        reading.take(*match.span())
+        reading.set('systolic_bp', float(match.group(1)))
+        reading.set('diastolic_bp', float(match.group(2)))
+
+
+def _read_height(reading):
+    for match in FEET_INCHES.finditer(reading.text):
+        if not reading.free(*match.span()):
+            continue
+        reading.take(*match.span())
+        inches = int(match.group(1)) * 12 + float(match.group(2) or 0)
+        reading.set('height_cm', inches * 2.54)
+
+
+VALUE_AFTER = re.compile(SEPARATOR + NUMBER + rf'(?:{UNIT.pattern})?')
+VALUE_BEFORE = re.compile(NUMBER + rf'(?:{UNIT.pattern})?' + SEPARATOR + '$')
+
+
+def _read_keywords(reading):
+    """Give each keyword the number after it or, failing that, the one just before it."""
+    for keyword in KEYWORD.finditer(reading.text):
+        if not reading.free(*keyword.span()):
+            continue
+        reading.take(*keyword.span())
+        field = KEYWORD_FIELDS[re.sub(r'\s+', ' ', keyword.group(1))]
+        if field == 'blood_pressure':
+            continue
+        reading.named.add(field)
+
+        after = VALUE_AFTER.match(reading.text, keyword.end())
+        before = VALUE_BEFORE.search(reading.text, 0, keyword.start())
+        for match in (after, before):
+            # The value ends with its unit; the separator on either side stays free.
+            span = (
+                (match.start(1), match.end(2) if match.group(2) else match.end(1))
+                if match
+                else None
+            )
+            if match and reading.free(*span) and _fits(field, match.group(2)):
+                reading.take(*span)
+                reading.set(field, float(match.group(1)) * _unit(match.group(2))[1])
+                break
+
+
+def _read_units(reading):
+    """A number with a unit only one field uses: "64 kilo", "45 years old"."""
+    for match in re.finditer(NUMBER + UNIT.pattern, reading.text):
+        field, factor = _unit(match.group(2))
+        if field is not None and reading.free(*match.span()):
+            reading.take(*match.span())
+            reading.set(field, float(match.group(1)) * factor)
+
+
+def _read_gender(reading):
+    for match in GENDER.finditer(reading.text):
+        if reading.free(*match.span()):
+            reading.take(*match.span())
+            gender = GENDER_FIELDS[re.sub(r'\s+', ' ', match.group(1))]
+            if reading.data.get('gender', gender) != gender:
+                reading.rejected = True
+            reading.data['gender'] = gender
+
+
+def parse(text: str):
+    """
+    Read screening fields from a dictated transcript.
+
+    Returns:
+        The fields read, in the form's units, or None when the transcript
+        holds anything the rules could not account for, a value outside the
+        bounds, or contradicting values, so Gemini should read it instead.
+    """
+    reading = Reading(normalize(text))
+    for step in (_read_blood_pressure, _read_height, _read_keywords, _read_units, _read_gender):
+        step(reading)
+
+    if reading.rejected or not reading.data or reading.leftover():
+        return None
+    if not reading.named <= reading.data.keys():
+        # A field was named but no value for it was found.
+        return None
+    return reading.data
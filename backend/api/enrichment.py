@@ -0,0 +1,259 @@
+"""
+Background Gemini enrichment of screenings.
+
+Writing a screening used to block the request on a Gemini round trip. Now
+``record_screenings`` only calls ``enqueue_many``, which inserts an
+``AIEnrichmentJob`` per screening in the same transaction, and the response
+goes out with ``ai_status='pending'``. ``manage.py run_ai_worker`` drains the
+queue:
+
+1. ``claim`` marks a batch of due jobs ``running`` under
+   ``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers never share a job.
+2. ``renew`` restarts a job's lease just before the worker reaches it, so the
+   jobs at the end of a batch are not given up while the first ones run.
+3. ``process`` calls Gemini outside any transaction and stores the insight, or
+   reschedules the job with exponential backoff until ``MAX_ATTEMPTS``. Every
+   write is conditional on the lease, so a worker whose lease lapsed and whose
+   job went to another worker writes nothing.
+4. ``release_expired`` hands jobs held by a crashed worker back to the queue
+   once their lease runs out.
+
+Clients poll ``GET /api/screening/screenings/<id>`` until ``ai_status`` leaves
+``pending``. With ``AI_ENRICHMENT_EAGER`` set, the job instead runs in-process
+right after the transaction commits, for single-process development setups.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import ai_service
+from .models import AIEnrichmentJob, Screening
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+# Retry delays double from the base up to the cap: 30s, 1m, 2m, 4m, ...
+RETRY_BASE_SECONDS = 30
+RETRY_CAP_SECONDS = 3600
+
+# A running job untouched for this long is assumed abandoned by its worker.
+# The lease is renewed per job, so it only has to cover one analysis, which
+# ai_guard bounds by AI_TIMEOUT_SECONDS.
+LEASE_SECONDS = 300
+
+
+def enqueue_many(screenings) -> list:
+    """
+    Queue AI enrichment for new screenings with one insert.
+
+    Call inside the transaction that creates the screenings so the jobs commit,
+    or roll back, with them.
+    """
+    now = timezone.now()
+    jobs = AIEnrichmentJob.objects.bulk_create(
+        AIEnrichmentJob(screening=screening, run_after=now) for screening in screenings
+    )
+    if jobs and getattr(settings, 'AI_ENRICHMENT_EAGER', False):
+        ids = [job.pk for job in jobs]
+        transaction.on_commit(lambda: run_pending(limit=len(ids), job_ids=ids))
+    return jobs
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next try of a job that has failed ``attempts`` times."""
+    return timedelta(seconds=min(RETRY_CAP_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1)))
+
+
+def release_expired(now=None) -> int:
+    """Return jobs whose worker lease has lapsed to the queue; returns how many."""
+    now = now or timezone.now()
+    return AIEnrichmentJob.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=LEASE_SECONDS)
+    ).update(status='pending', run_after=now)
+
+
+def claim(limit: int, job_ids=None, now=None) -> list:
+    """
+    Lock and mark up to ``limit`` due jobs as running for this worker.
+
+    Rows another worker has locked are skipped rather than waited on. The
+    claim time doubles as a token: only rows stamped with it are returned,
+    which keeps backends without row locks (SQLite) from double-claiming.
+
+    Args:
+        limit: Maximum number of jobs to claim.
+        job_ids: Restrict the claim to these jobs.
+        now: The claim time; defaults to the current time.
+
+    Returns:
+        The claimed jobs, with their screening and patient loaded.
+    """
+    now = now or timezone.now()
+    due = AIEnrichmentJob.objects.filter(status='pending', run_after__lte=now)
+    if job_ids is not None:
+        due = due.filter(pk__in=job_ids)
+
+    with transaction.atomic():
+        ids = list(
+            due.select_for_update(skip_locked=True)
+            .order_by('run_after', 'id')
+            .values_list('pk', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        AIEnrichmentJob.objects.filter(pk__in=ids, status='pending').update(
+            status='running', locked_at=now, attempts=F('attempts') + 1
+        )
+
+    return list(
+        AIEnrichmentJob.objects.filter(pk__in=ids, status='running', locked_at=now)
+        .select_related('screening__patient')
+        .order_by('run_after', 'id')
+    )
+
+
+def leased(job):
+    """``job``'s row, as long as this worker's lease on it still holds."""
+    return AIEnrichmentJob.objects.filter(pk=job.pk, status='running', locked_at=job.locked_at)
+
+
+def renew(job, now=None) -> bool:
+    """
+    Restart the lease on a claimed ``job`` before working on it.
+
+    Returns:
+        False when the lease had already lapsed and the job was released,
+        and perhaps claimed by another worker; the job must then be skipped.
+    """
+    now = now or timezone.now()
+    if not leased(job).update(locked_at=now):
+        return False
+    job.locked_at = now
+    return True
+
+
+def analysis_input(screening) -> dict:
+    """The ``analyze_health_data`` payload for a stored screening."""
+    from .views.screenings import SCREENING_FIELDS
+
+    patient = screening.patient
+    data = {field: getattr(screening, field) for field in SCREENING_FIELDS}
+    data.update(
+        {
+            'age': patient.age,
+            'gender': patient.gender,
+            'risk_level': screening.risk_level,
+            'risk_score': screening.risk_score,
+        }
+    )
+    return data
+
+
+def process(job) -> None:
+    """
+    Run one claimed job to completion, retry or final failure.
+
+    A missing API key is not worth retrying: the screening is marked
+    ``unavailable`` at once. A call shed by ``ai_guard`` is retried when it
+    suggests, without using up an attempt. Any other failure is retried with
+    backoff and the screening is marked ``failed`` after ``MAX_ATTEMPTS``.
+    """
+    screening = job.screening
+
+    if not ai_service.is_configured():
+        finish(job, screening, 'unavailable', error='GEMINI_API_KEY is not set')
+        return
+
+    try:
+        result = ai_service.analyze_health_data(analysis_input(screening))
+    except Exception as exc:  # noqa: BLE001 - recorded on the job and retried
+        logger.exception('AI enrichment raised for screening %s', screening.pk)
+        result = {'success': False, 'error': str(exc)}
+
+    if result.get('success'):
+        screening.ai_insights = result['analysis'].get('formatted_insights')
+        finish(job, screening, 'complete')
+        return
+
+    error = result.get('error') or 'AI analysis failed'
+    if 'retry_after' in result:
+        # Shed by the circuit breaker or bulkhead: Gemini was never asked, so
+        # wait out the hint without spending one of the job's attempts.
+        leased(job).update(
+            status='pending',
+            run_after=timezone.now() + timedelta(seconds=result['retry_after']),
+            locked_at=None,
+            attempts=F('attempts') - 1,
+            last_error=error,
+        )
+        return
+
+    if job.attempts >= MAX_ATTEMPTS:
+        logger.warning(
+            'Giving up on AI enrichment for screening %s after %s attempts: %s',
+            screening.pk,
+            job.attempts,
+            error,
+        )
+        finish(job, screening, 'failed', error=error)
+        return
+
+    run_after = timezone.now() + retry_delay(job.attempts)
+    leased(job).update(status='pending', run_after=run_after, locked_at=None, last_error=error)
+    logger.info(
+        'AI enrichment for screening %s failed (attempt %s), retrying at %s: %s',
+        screening.pk,
+        job.attempts,
+        run_after,
+        error,
+    )
+
+
+def finish(job, screening, ai_status: str, error: str = '') -> None:
+    """Close ``job`` and record the outcome on its screening, unless its lease was lost."""
+    with transaction.atomic():
+        if not Screening.objects.select_for_update().filter(pk=screening.pk).exists():
+            # Deleted while Gemini was working; the cascade took the job too.
+            logger.info('Screening %s was deleted before enrichment finished', screening.pk)
+            return
+        if not leased(job).select_for_update().exists():
+            logger.warning(
+                'Lease on the AI enrichment of screening %s lapsed; leaving it to its new worker',
+                screening.pk,
+            )
+            return
+        screening.ai_status = ai_status
+        # save() rather than update() so the dashboard caches are invalidated.
+        screening.save(update_fields=['ai_insights', 'ai_status'])
+        job.status = 'failed' if ai_status == 'failed' else 'done'
+        job.locked_at = None
+        job.last_error = error
+        job.save(update_fields=['status', 'locked_at', 'last_error', 'updated_at'])
+
+
+def run_pending(limit: int = 10, job_ids=None) -> int:
+    """
+    Claim and process one batch of due jobs.
+
+    Args:
+        limit: Maximum number of jobs to process.
+        job_ids: Restrict the batch to these jobs.
+
+    Returns:
+        The number of jobs processed.
+    """
+    release_expired()
+    processed = 0
+    for job in claim(limit, job_ids=job_ids):
+        if not renew(job):
+            logger.warning('Lease on AI enrichment job %s lapsed before it was reached', job.pk)
+            continue
+        process(job)
+        processed += 1
+    return processed
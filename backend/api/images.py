@@ -0,0 +1,181 @@
+"""
+Shrink lab-report photos before they are uploaded to Gemini.
+
+Phone photos of a report are often 8-12 MB, and sending them over a rural
+backhaul took longer than Gemini took to read them. ``prepare`` re-encodes an
+image at a size that keeps its text legible:
+
+* rotated upright from its EXIF orientation;
+* converted to grayscale;
+* scaled so its longer side is at most ``AI_IMAGE_MAX_SIDE`` pixels; and
+* saved as a JPEG of quality ``AI_IMAGE_QUALITY``.
+
+The work runs in a pool of ``AI_IMAGE_WORKERS`` processes, so decoding a
+large photo neither holds the GIL nor blocks the request threads. The
+original is used whenever the result would not be smaller, the image cannot
+be decoded (HEIC, without a Pillow plugin for it) or the pool fails.
+``AI_IMAGE_MAX_SIDE=0`` turns the step off.
+"""
+
+import asyncio
+import io
+import logging
+import mimetypes
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Types Pillow decodes without plugins; anything else is sent as it is.
+IMAGE_TYPES = {'image/jpeg', 'image/png', 'image/webp'}
+
+# Seconds to wait for the pool before sending the original instead.
+PREPARE_TIMEOUT_SECONDS = 15
+
+_pool = None
+_pool_lock = threading.Lock()
+_pool_pid = os.getpid()
+
+
+def downscale(source, max_side: int, quality: int):
+    """
+    Re-encode the image at ``source``, a path or its bytes, for text extraction.
+
+    Runs in the pool's processes, so it takes no settings of its own.
+
+    Returns:
+        The grayscale JPEG bytes, or None when they would be no smaller than
+        the original or the image cannot be decoded.
+    """
+    original_size = os.path.getsize(source) if isinstance(source, str) else len(source)
+    try:
+        with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+            # Lets a JPEG decode straight to grayscale at a reduced scale.
+            image.draft('L', (max_side, max_side))
+            image = ImageOps.exif_transpose(image).convert('L')
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            output = io.BytesIO()
+            image.save(output, format='JPEG', quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+    result = output.getvalue()
+    return result if len(result) < original_size else None
+
+
+def enabled() -> bool:
+    return getattr(settings, 'AI_IMAGE_MAX_SIDE', 0) > 0
+
+
+def get_pool():
+    """This process's worker pool, or None when ``AI_IMAGE_WORKERS`` is 0."""
+    global _pool, _pool_pid
+    workers = getattr(settings, 'AI_IMAGE_WORKERS', 0)
+    if workers < 1:
+        return None
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            # A forked gunicorn worker must not share its parent's pool.
+            _pool, _pool_pid = None, os.getpid()
+        if _pool is None:
+            # Spawned, not forked: forking a threaded web worker is unsafe.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _job(source, mime_type):
+    """
+    The arguments for ``downscale``, or None when ``source`` is not to be shrunk.
+
+    A path is passed to the worker as it is; an open file is read, then
+    rewound for whoever uses it next.
+    """
+    if not enabled():
+        return None
+    if mime_type is None and isinstance(source, (str, os.PathLike)):
+        mime_type = mimetypes.guess_type(os.fspath(source))[0]
+    if mime_type not in IMAGE_TYPES:
+        return None
+
+    if isinstance(source, (str, os.PathLike)):
+        data = os.fspath(source)
+    else:
+        position = source.tell()
+        data = source.read()
+        source.seek(position)
+    return data, settings.AI_IMAGE_MAX_SIDE, getattr(settings, 'AI_IMAGE_QUALITY', 75)
+
+
+def _result(source, mime_type, prepared):
+    if prepared is None:
+        return source, mime_type
+    return io.BytesIO(prepared), 'image/jpeg'
+
+
+def prepare(source, mime_type=None):
+    """
+    Return ``(source, mime_type)`` to upload in place of the given ones.
+
+    ``source`` is a path or an open binary file, as ``genai.upload_file``
+    takes. Anything that is not a supported image, or does not shrink, comes
+    back unchanged.
+    """
+    job = _job(source, mime_type)
+    if job is None:
+        return source, mime_type
+
+    try:
+        pool = get_pool()
+        if pool is None:
+            prepared = downscale(*job)
+        else:
+            prepared = pool.submit(downscale, *job).result(timeout=PREPARE_TIMEOUT_SECONDS)
+    except BrokenProcessPool:
+        logger.warning('Image worker pool died; uploading the original', exc_info=True)
+        shutdown_pool()
+        prepared = None
+    except Exception:  # noqa: BLE001 - the original is still usable
+        logger.warning('Image preprocessing failed; uploading the original', exc_info=True)
+        prepared = None
+    return _result(source, mime_type, prepared)
+
+
+async def prepare_async(source, mime_type=None):
+    """``prepare`` for the async views, awaiting the pool instead of blocking on it."""
+    job = await asyncio.to_thread(_job, source, mime_type)
+    if job is None:
+        return source, mime_type
+
+    try:
+        pool = get_pool()
+        if pool is None:
+            prepared = await asyncio.to_thread(downscale, *job)
+        else:
+            prepared = await asyncio.wait_for(
+                asyncio.wrap_future(pool.submit(downscale, *job)),
+                timeout=PREPARE_TIMEOUT_SECONDS,
+            )
+    except BrokenProcessPool:
+        logger.warning('Image worker pool died; uploading the original', exc_info=True)
+        shutdown_pool()
+        prepared = None
+    except Exception:  # noqa: BLE001 - the original is still usable
+        logger.warning('Image preprocessing failed; uploading the original', exc_info=True)
+        prepared = None
+    return _result(source, mime_type, prepared)
@@ -0,0 +1,419 @@
+"""
+Read lab values from the text layer of a digitally generated PDF report.
+
+Most reports from hospital and chain labs are PDFs with a full text layer.
+Reading them locally is instant and free, where uploading them to Gemini for
+vision extraction took seconds and quota. ``pdf_text`` extracts the text and
+``parse`` matches it, line by line, against known names for each
+``LAB_BOUNDS`` analyte, a few vitals and the patient's demographics.
+
+Values are converted to the units the screening form uses (mg/dL, g/dL,
+10^3/uL and so on) and kept only if they fall inside the serializers'
+bounds. A field the text mentions but ``parse`` cannot read, whether the
+value is missing, the unit is unknown or the value is out of bounds, is
+reported as unresolved, so the caller can ask Gemini for just that field.
+"""
+
+import logging
+import os
+import re
+
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+from .serializers import LAB_BOUNDS, VITALS_BOUNDS
+
+logger = logging.getLogger(__name__)
+
+# Pages read for the text layer; reports longer than this go to Gemini.
+MAX_PAGES = 10
+
+# Fewer non-space characters than this means a scanned PDF, not a text layer.
+MIN_TEXT_CHARS = 80
+
+# Every field the document prompt asks for, so results have the same keys.
+DOCUMENT_FIELDS = (
+    'full_name',
+    'age',
+    'gender',
+    'village',
+    'phone',
+    'height_cm',
+    'weight_kg',
+    'systolic_bp',
+    'diastolic_bp',
+    'heart_rate',
+    *LAB_BOUNDS,
+    'smoking_status',
+    'alcohol_usage',
+    'physical_activity',
+)
+
+BOUNDS = {**VITALS_BOUNDS, **LAB_BOUNDS, 'age': (0, 120)}
+
+# The units the screening form stores each measured field in.
+FORM_UNITS = {
+    'height_cm': 'cm',
+    'weight_kg': 'kg',
+    'systolic_bp': 'mmHg',
+    'diastolic_bp': 'mmHg',
+    'heart_rate': 'beats/min',
+    'glucose_level': 'mg/dL',
+    'cholesterol_level': 'mg/dL',
+    'hemoglobin': 'g/dL',
+    'rbc_count': 'million/uL',
+    'wbc_count': 'thousand/uL',
+    'platelet_count': 'thousand/uL',
+    'blood_urea_nitrogen': 'mg/dL',
+    'creatinine': 'mg/dL',
+    'sodium': 'mmol/L',
+    'potassium': 'mmol/L',
+    'chloride': 'mmol/L',
+    'calcium': 'mg/dL',
+    'alt_sgpt': 'U/L',
+    'ast_sgot': 'U/L',
+    'albumin': 'g/dL',
+    'total_bilirubin': 'mg/dL',
+}
+
+INTEGER_FIELDS = {'age', 'systolic_bp', 'diastolic_bp', 'heart_rate'}
+
+
+def _unit(factor=1.0, *names):
+    return dict.fromkeys(names, factor)
+
+
+MG_DL = ('mg/dl', 'mg%')
+G_DL = ('g/dl', 'gm/dl', 'gms/dl', 'g%', 'gm%')
+G_L = ('g/l', 'gm/l')
+MMOL_L = ('mmol/l', 'meq/l')
+UMOL_L = ('umol/l',)
+U_L = ('u/l', 'iu/l', 'units/l')
+PER_UL = ('/cumm', 'cells/cumm', '/ul', 'cells/ul', '/mm3', 'cells/mm3')
+THOUSAND_PER_UL = ('10^3/ul', 'x10^3/ul', 'thou/ul', 'k/ul', '10^9/l', 'x10^9/l', 'thou/cumm')
+MILLION_PER_UL = (
+    'million/cumm',
+    'millions/cumm',
+    'mill/cumm',
+    'million/ul',
+    '10^6/ul',
+    'x10^6/ul',
+    '10^12/l',
+    'x10^12/l',
+)
+
+# (field, name pattern, pattern that disqualifies the line, {unit: factor to
+# the form's unit}). A value with no unit is taken to be in the form's unit.
+ANALYTES = [
+    (
+        'hemoglobin',
+        r'ha?emoglobin|\bhb\b|\bhgb\b',
+        r'a1c|glycated|glycosylated|mch\b|mchc',
+        {**_unit(1.0, *G_DL), **_unit(0.1, *G_L)},
+    ),
+    (
+        'rbc_count',
+        r'\brbc\b|red blood cell|erythrocyte count',
+        r'distribution|rdw|morpholog',
+        _unit(1.0, *MILLION_PER_UL),
+    ),
+    (
+        'wbc_count',
+        r'\bwbc\b|\btlc\b|total leu[ck]ocyte|white blood cell|leu[ck]ocyte count',
+        r'differential|\bdlc\b',
+        {**_unit(1.0, *THOUSAND_PER_UL), **_unit(0.001, *PER_UL)},
+    ),
+    (
+        'platelet_count',
+        r'platelet|\bplt\b',
+        r'\bmpv\b|volume|distribution|pdw',
+        {
+            **_unit(1.0, *THOUSAND_PER_UL),
+            **_unit(0.001, *PER_UL),
+            **_unit(100.0, 'lakh/cumm', 'lakhs/cumm', 'lakh/ul', 'lakhs/ul', 'lakhs', 'lakh'),
+        },
+    ),
+    (
+        'glucose_level',
+        r'glucose|blood sugar|\bfbs\b|\brbs\b|\bfbg\b',
+        r'urine|tolerance',
+        {**_unit(1.0, *MG_DL), **_unit(18.016, 'mmol/l')},
+    ),
+    (
+        'cholesterol_level',
+        r'cholesterol',
+        r'\bhdl\b|\bldl\b|\bvldl\b|non[- ]hdl|ratio',
+        {**_unit(1.0, *MG_DL), **_unit(38.67, 'mmol/l')},
+    ),
+    (
+        'blood_urea_nitrogen',
+        r'blood urea nitrogen|\bbun\b|urea nitrogen',
+        r'ratio',
+        {**_unit(1.0, *MG_DL), **_unit(2.801, 'mmol/l')},
+    ),
+    # Indian reports usually give urea itself; BUN is 28/60 of it by mass.
+    (
+        'blood_urea_nitrogen',
+        r'\burea\b',
+        r'nitrogen|\bbun\b|ratio|urine',
+        {**_unit(0.4667, *MG_DL), **_unit(2.801, 'mmol/l')},
+    ),
+    (
+        'creatinine',
+        r'creatinine',
+        r'clearance|ratio|urine|kinase|egfr',
+        {**_unit(1.0, *MG_DL), **_unit(1 / 88.42, *UMOL_L)},
+    ),
+    ('sodium', r'sodium|\bna\+', r'urine', _unit(1.0, *MMOL_L)),
+    ('potassium', r'potassium|\bk\+', r'urine', _unit(1.0, *MMOL_L)),
+    ('chloride', r'chloride|\bcl-', r'urine', _unit(1.0, *MMOL_L)),
+    (
+        'calcium',
+        r'calcium',
+        r'ionized|ionised|urine',
+        {**_unit(1.0, *MG_DL), **_unit(4.008, 'mmol/l')},
+    ),
+    (
+        'alt_sgpt',
+        r'\bsgpt\b|\balt\b|alanine (?:amino)?transferase|alanine (?:amino)?transaminase',
+        None,
+        _unit(1.0, *U_L),
+    ),
+    (
+        'ast_sgot',
+        r'\bsgot\b|\bast\b|aspartate (?:amino)?transferase|aspartate (?:amino)?transaminase',
+        None,
+        _unit(1.0, *U_L),
+    ),
+    (
+        'albumin',
+        r'albumin',
+        r'globulin|ratio|a\s*/\s*g|micro|urine',
+        {**_unit(1.0, *G_DL), **_unit(0.1, *G_L)},
+    ),
+    (
+        'total_bilirubin',
+        r'bilirubin',
+        r'direct|indirect|conjugated|urine',
+        {**_unit(1.0, *MG_DL), **_unit(1 / 17.1, *UMOL_L)},
+    ),
+    ('heart_rate', r'pulse|heart rate', None, _unit(1.0, 'bpm', '/min', 'beats/min')),
+    ('weight_kg', r'\bweight\b', None, _unit(1.0, 'kg', 'kgs')),
+    ('height_cm', r'\bheight\b', None, {**_unit(1.0, 'cm', 'cms'), **_unit(100.0, 'm')}),
+]
+
+# Numbers, including Indian and Western digit grouping (2,50,000 and 250,000).
+NUMBER = re.compile(r'(?<![\w.])(\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)')
+# Reference ranges and limits, and bracketed notes, which are never the result.
+NOISE = re.compile(
+    r'\([^)]*\)|\[[^\]]*\]'
+    r'|\d+(?:\.\d+)?\s*(?:-|–|to)\s*\d+(?:\.\d+)?'
+    r'|[<>≤≥]=?\s*\d+(?:\.\d+)?'
+)
+# Abnormal-result flags some labs print between the value and its unit.
+FLAG = re.compile(r'^\s*(?:h|l|high|low|\*+|↑|↓)(?=\s|$)', re.IGNORECASE)
+
+BLOOD_PRESSURE = re.compile(
+    r'\b(?:blood pressure|b\.?\s?p\.?)\b\D{0,15}?(\d{2,3})\s*/\s*(\d{2,3})', re.IGNORECASE
+)
+BLOOD_PRESSURE_LABEL = re.compile(r'\bblood pressure\b|\bb\.?p\.?\s*[:\-]', re.IGNORECASE)
+
+TITLES = r'(?:(?:mr|mrs|ms|miss|master|smt|shri|sri|baby|dr)\.?\s+)?'
+NAME = re.compile(
+    r'\b(?:patient(?:\'s)?\s*name|name\s+of\s+(?:the\s+)?patient|patient|name)\s*[:\-]\s*'
+    + TITLES
+    + r"([A-Za-z][A-Za-z.' ]{1,60}?)"
+    r'(?=\s{2,}|\s*[|,]|\s+(?:age|sex|gender|ref|dob|uhid|id|date|mobile|phone|lab)\b|$)',
+    re.IGNORECASE,
+)
+NAME_LABEL = re.compile(r'\b(?:patient(?:\'s)?\s*name|name)\s*:', re.IGNORECASE)
+AGE = re.compile(
+    r'\bage\b(?:\s*/\s*(?:sex|gender))?\s*[:\-]?\s*(\d{1,3})\s*(?:y|yr|yrs|years?)?\b',
+    re.IGNORECASE,
+)
+AGE_LABEL = re.compile(r'\bage\b\s*(?:/\s*(?:sex|gender))?\s*:', re.IGNORECASE)
+GENDER = re.compile(
+    r'\b(?:sex|gender)\b\s*[:\-]?\s*(?:\d{1,3}\s*(?:y\w*)?\s*/\s*)?(male|female|m|f)\b'
+    r'|\bage\b\s*/\s*(?:sex|gender)\s*[:\-]?\s*\d{1,3}\s*(?:y\w*)?\s*/\s*(male|female|m|f)\b',
+    re.IGNORECASE,
+)
+GENDER_LABEL = re.compile(r'\b(?:sex|gender)\b\s*:', re.IGNORECASE)
+PHONE = re.compile(
+    r'\b(?:mobile|phone|contact|mob)(?:\s*no\.?)?\s*[:\-]\s*(\+?\d[\d\s-]{8,15}\d)', re.IGNORECASE
+)
+
+ANALYTE_PATTERNS = [
+    (
+        field,
+        re.compile(names, re.IGNORECASE),
+        re.compile(exclude, re.IGNORECASE) if exclude else None,
+        units,
+    )
+    for field, names, exclude, units in ANALYTES
+]
+
+
+def pdf_text(source):
+    """
+    The text layer of the PDF at ``source``, a path or an open binary file.
+
+    Returns:
+        The text of up to ``MAX_PAGES`` pages, or None when the document has
+        more pages, no usable text layer, or cannot be read.
+    """
+    position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    try:
+        reader = PdfReader(source)
+        if reader.is_encrypted or len(reader.pages) > MAX_PAGES:
+            return None
+        text = '\n'.join(page.extract_text() or '' for page in reader.pages)
+    except (PdfReadError, OSError, ValueError, KeyError, TypeError):
+        logger.info('Could not read a text layer from %s', source, exc_info=True)
+        return None
+    finally:
+        if position is not None:
+            source.seek(position)
+
+    if len(re.sub(r'\s', '', text)) < MIN_TEXT_CHARS:
+        return None
+    return text
+
+
+def normalize_unit(token: str) -> str:
+    unit = token.lower().replace('µ', 'u').replace('μ', 'u').replace(' ', '')
+    return unit.replace('cu.mm', 'cumm').replace('cmm', 'cumm').replace('x10', '10').rstrip('.,;')
+
+
+def read_value(rest: str, units: dict):
+    """
+    The value and unit factor at the start of ``rest``, the text after a name.
+
+    Returns:
+        ``(value, factor)``; ``value`` is None when there is no number, and
+        ``factor`` is None when the number carries a unit not in ``units``.
+    """
+    rest = NOISE.sub(' ', rest)
+    match = NUMBER.search(rest)
+    if match is None:
+        return None, None
+    value = float(match.group(1).replace(',', ''))
+
+    after = FLAG.sub('', rest[match.end() :], count=1)
+    token = after.split()[0] if after.split() else ''
+    unit = normalize_unit(token)
+    if not unit or not re.search(r'[a-z/%]', unit):
+        return value, 1.0
+    canonical = {normalize_unit(name): factor for name, factor in units.items()}
+    if unit in canonical:
+        return value, canonical[unit]
+    # A word that is not a unit, such as a method or a comment, means no unit.
+    if not re.search(r'[/%^]', unit) and unit.isalpha() and len(unit) > 4:
+        return value, 1.0
+    return value, None
+
+
+def in_bounds(field: str, value) -> bool:
+    minimum, maximum = BOUNDS[field]
+    return minimum <= value <= maximum
+
+
+def coerce(field: str, value):
+    """``value`` rounded as the form stores ``field``."""
+    return int(round(value)) if field in INTEGER_FIELDS else round(value, 2)
+
+
+def parse(text: str):
+    """
+    Read screening fields from report text.
+
+    Returns:
+        ``(data, unresolved)``: the fields read, in the form's units, and the
+        names of fields the text mentions but whose value could not be read.
+    """
+    data = {}
+    unresolved = set()
+
+    for line in text.splitlines():
+        for field, names, exclude, units in ANALYTE_PATTERNS:
+            if field in data:
+                continue
+            match = names.search(line)
+            if match is None or (exclude and exclude.search(line)):
+                continue
+            value, factor = read_value(line[match.end() :], units)
+            if value is None or factor is None or not in_bounds(field, value * factor):
+                unresolved.add(field)
+                continue
+            data[field] = coerce(field, value * factor)
+            unresolved.discard(field)
+
+        _parse_vitals(line, data, unresolved)
+        _parse_demographics(line, data, unresolved)
+
+    return data, sorted(unresolved - data.keys())
+
+
+def _parse_vitals(line, data, unresolved):
+    if 'systolic_bp' in data or not BLOOD_PRESSURE_LABEL.search(line):
+        return
+    match = BLOOD_PRESSURE.search(line)
+    systolic, diastolic = (int(match.group(1)), int(match.group(2))) if match else (None, None)
+    if match and in_bounds('systolic_bp', systolic) and in_bounds('diastolic_bp', diastolic):
+        data['systolic_bp'], data['diastolic_bp'] = systolic, diastolic
+    else:
+        unresolved.update({'systolic_bp', 'diastolic_bp'})
+
+
+def _parse_demographics(line, data, unresolved):
+    if 'full_name' not in data and NAME_LABEL.search(line):
+        match = NAME.search(line)
+        if match:
+            data['full_name'] = ' '.join(match.group(1).strip(" .'").split())
+        else:
+            unresolved.add('full_name')
+
+    if 'age' not in data and AGE_LABEL.search(line):
+        match = AGE.search(line)
+        if match and in_bounds('age', int(match.group(1))):
+            data['age'] = int(match.group(1))
+        else:
+            unresolved.add('age')
+
+    if 'gender' not in data and (
+        GENDER_LABEL.search(line) or re.search(r'age\s*/\s*sex', line, re.I)
+    ):
+        match = GENDER.search(line)
+        if match:
+            letter = (match.group(1) or match.group(2))[0].upper()
+            data['gender'] = 'Male' if letter == 'M' else 'Female'
+        else:
+            unresolved.add('gender')
+
+    if 'phone' not in data:
+        match = PHONE.search(line)
+        if match:
+            data['phone'] = re.sub(r'[\s-]', '', match.group(1))
+
+
+def validated(values: dict, fields) -> dict:
+    """The entries of ``values`` for ``fields`` that are usable, as ``parse`` would keep them."""
+    kept = {}
+    for field in fields:
+        value = values.get(field)
+        if value is None or value == '':
+            continue
+        if field in BOUNDS:
+            try:
+                number = float(value)
+            except (TypeError, ValueError):
+                continue
+            if in_bounds(field, number):
+                kept[field] = coerce(field, number)
+        else:
+            kept[field] = value
+    return kept
+
+
+def complete(data: dict) -> dict:
+    """``data`` with every document field, null where nothing was read, like Gemini's answer."""
+    return {field: data.get(field) for field in DOCUMENT_FIELDS}
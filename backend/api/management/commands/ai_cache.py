@@ -0,0 +1,35 @@
+"""Inspect, prune or clear the Gemini result cache."""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+
+from api import ai_cache
+from api.models import AICachedResult
+
+
+class Command(BaseCommand):
+    help = (
+        'Report on the Gemini result cache table, prune expired and over-limit rows, or '
+        'clear it. Pruning also happens on every write; this is for ad-hoc maintenance.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['stats', 'prune', 'clear'])
+
+    def handle(self, *args, action='stats', **options):
+        if action == 'prune':
+            deleted = ai_cache.prune()
+            self.stdout.write(self.style.SUCCESS(f'Pruned {deleted} cached AI results.'))
+        elif action == 'clear':
+            deleted, _ = AICachedResult.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Cleared {deleted} cached AI results.'))
+
+        entries = AICachedResult.objects.count()
+        hits = AICachedResult.objects.aggregate(hits=Sum('hit_count'))['hits'] or 0
+        self.stdout.write(f'{entries} cached AI results, served {hits} times.')
+        for kind, totals in ai_cache.hit_rates().items():
+            rate = totals['hit_rate']
+            self.stdout.write(
+                f'  {kind}: {totals["entries"]} results, {totals["hits"]} hits, '
+                f'hit rate {"n/a" if rate is None else f"{rate:.0%}"}'
+            )
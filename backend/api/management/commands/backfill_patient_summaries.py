@@ -0,0 +1,44 @@
+"""Recompute every patient's denormalized screening summary."""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api import patient_summary
+from api.models import Patient
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Patient.screening_count and the latest-screening columns from the raw '
+        'screenings. Run after bulk edits or deletions that bypass record_screening.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Patients updated per transaction, bounding how long rows stay locked.',
+        )
+
+    def handle(self, *args, batch_size=1000, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Patient.objects.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += patient_summary.refresh(Patient.objects.filter(pk__in=ids))
+            last_id = ids[-1]
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed the screening summary of {updated} patients.')
+        )
@@ -0,0 +1,63 @@
+"""Recompute the daily screening rollup from the screenings table."""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import rollups
+from api.models import Screening
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild DailyScreeningRollup rows for a date range from the raw screenings. '
+        'Run after bulk edits or deletions that bypass record_screening.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start',
+            type=date.fromisoformat,
+            help='First day to rebuild (YYYY-MM-DD). Defaults to the earliest screening.',
+        )
+        parser.add_argument(
+            '--end',
+            type=date.fromisoformat,
+            help='Last day to rebuild (YYYY-MM-DD). Defaults to today.',
+        )
+        parser.add_argument(
+            '--chunk-days',
+            type=int,
+            default=31,
+            help='Days rebuilt per transaction, bounding how long rows stay locked.',
+        )
+
+    def handle(self, *args, start=None, end=None, chunk_days=31, **options):
+        end = end or timezone.localdate()
+        if start is None:
+            first = (
+                Screening.objects.order_by('created_at')
+                .values_list('created_at', flat=True)
+                .first()
+            )
+            if first is None:
+                self.stdout.write('No screenings to roll up.')
+                return
+            start = timezone.localdate(first)
+
+        if start > end:
+            raise CommandError('--start must not be after --end')
+        if chunk_days < 1:
+            raise CommandError('--chunk-days must be at least 1')
+
+        written = 0
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            written += rollups.rebuild(chunk_start, chunk_end)
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {written} rollup rows for {start} to {end}.')
+        )
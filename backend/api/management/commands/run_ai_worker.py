@@ -0,0 +1,57 @@
+"""Drain the AI enrichment queue."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from api import ai_service, enrichment
+
+
+class Command(BaseCommand):
+    help = (
+        'Process queued AI enrichment jobs, adding Gemini insights to new screenings. Run '
+        'one or more alongside the web server; each claims its own jobs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Jobs claimed per round trip to the queue.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the jobs that are due now, then exit.',
+        )
+
+    def handle(self, *args, batch_size=10, poll_interval=2.0, once=False, **options):
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        ai_service.warm_up_if_enabled()
+
+        processed = 0
+        try:
+            while True:
+                # A long-lived process must drop connections the server has closed.
+                close_old_connections()
+                count = enrichment.run_pending(batch_size)
+                processed += count
+                if count:
+                    continue
+                if once:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} AI enrichment jobs.'))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 09:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_screening_rollup(apps, schema_editor):
+    DailyScreeningRollup = apps.get_model('api', 'DailyScreeningRollup')
+    Screening = apps.get_model('api', 'Screening')
+
+    rows = (
+        Screening.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'patient__health_worker_id', 'patient__village', 'risk_level')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    DailyScreeningRollup.objects.bulk_create(
+        (
+            DailyScreeningRollup(
+                date=row['day'],
+                health_worker_id=row['patient__health_worker_id'],
+                village=row['patient__village'],
+                risk_level=row['risk_level'],
+                screening_count=row['count'],
+            )
+            for row in rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_screening_albumin_screening_alt_sgpt_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyScreeningRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('village', models.CharField(max_length=255)),
+                ('risk_level', models.CharField(choices=[('Low', 'Low'), ('Medium', 'Medium'), ('High', 'High')], max_length=10)),
+                ('screening_count', models.PositiveIntegerField(default=0)),
+                ('health_worker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'daily_screening_rollups',
+                'indexes': [models.Index(fields=['health_worker', 'date'], name='rollup_worker_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'health_worker', 'village', 'risk_level'), name='unique_daily_screening_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_screening_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_screening_summary(apps, schema_editor):
+    Patient = apps.get_model('api', 'Patient')
+    Screening = apps.get_model('api', 'Screening')
+
+    screenings = Screening.objects.filter(patient=OuterRef('pk'))
+    latest = screenings.order_by('-created_at', '-id')
+    count = screenings.order_by().values('patient').annotate(count=Count('id')).values('count')
+    Patient.objects.update(
+        screening_count=Coalesce(Subquery(count, output_field=IntegerField()), 0),
+        latest_screening=Subquery(latest.values('pk')[:1]),
+        latest_risk_level=Subquery(latest.values('risk_level')[:1]),
+        latest_screened_at=Subquery(latest.values('created_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_daily_screening_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patient',
+            name='latest_risk_level',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='latest_screened_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='latest_screening',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.screening'),
+        ),
+        migrations.AddField(
+            model_name='patient',
+            name='screening_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_screening_summary, migrations.RunPython.noop),
+    ]
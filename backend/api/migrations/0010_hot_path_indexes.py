@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_patient_created_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['health_worker', 'status', 'scheduled_date'], name='appt_worker_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['scheduled_date'], name='appt_pending_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['health_worker', '-created_at'], name='patient_worker_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recommendation',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['patient', '-priority', '-created_at', '-id'], name='rec_open_by_patient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='screening',
+            index=models.Index(fields=['patient', '-created_at'], name='screening_patient_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='screening',
+            index=models.Index(fields=['-created_at', '-id'], name='screening_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='screening',
+            index=models.Index(fields=['risk_level', '-created_at', '-id'], name='screening_risk_created_idx'),
+        ),
+    ]
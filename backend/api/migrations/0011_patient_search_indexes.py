@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:00
+
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    'patient_name_trgm_idx': 'full_name',
+    'patient_village_trgm_idx': 'village',
+    'patient_phone_trgm_idx': 'phone',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # SQLite gets its FTS5 shadow table from api.search.ensure_sqlite_fts,
+    # which runs after every migrate; other backends keep the plain scan.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON patients USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def settle_existing_screenings(apps, schema_editor):
+    # Screenings written before the queue existed were enriched inline or not at all.
+    Screening = apps.get_model('api', 'Screening')
+    Screening.objects.filter(ai_insights__isnull=False).update(ai_status='complete')
+    Screening.objects.filter(ai_insights__isnull=True).update(ai_status='unavailable')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_patient_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screening',
+            name='ai_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('complete', 'Complete'), ('unavailable', 'Unavailable'), ('failed', 'Failed')], default='pending', max_length=12),
+        ),
+        migrations.RunPython(settle_existing_screenings, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='AIEnrichmentJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField()),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('screening', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ai_job', to='api.screening')),
+            ],
+            options={
+                'db_table': 'ai_enrichment_jobs',
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['run_after'], name='ai_job_due_idx')],
+            },
+        ),
+    ]
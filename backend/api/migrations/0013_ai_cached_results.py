@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_ai_enrichment_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AICachedResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('model_name', models.CharField(max_length=64)),
+                ('result', models.JSONField()),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'ai_cached_results',
+                'indexes': [models.Index(fields=['last_used_at'], name='ai_cache_last_used_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_ai_cached_results'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aicachedresult',
+            name='kind',
+            field=models.CharField(choices=[('analysis', 'Analysis'), ('extraction', 'Lab report extraction')], default='analysis', max_length=12),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -59,8 +60,24 @@ class Patient(models.Model):
     phone = models.CharField(max_length=20, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Screening summary, maintained by api.patient_summary.
+    latest_screening = models.ForeignKey(
+        'Screening', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    latest_risk_level = models.CharField(max_length=10, blank=True, null=True, db_index=True)
+    latest_screened_at = models.DateTimeField(blank=True, null=True)
+    screening_count = models.PositiveIntegerField(default=0)
+
     class Meta:
         db_table = 'patients'
+        indexes = [
+            # Serves the newest-first keyset pagination in api.pagination.
+            models.Index(fields=['-created_at', '-id'], name='patient_created_id_idx'),
+            # A worker's caseload, newest first, and its registration trend.
+            models.Index(
+                fields=['health_worker', '-created_at'], name='patient_worker_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.full_name} ({self.village})"
@@ -75,6 +92,13 @@ class Screening(models.Model):
         ('High', 'High'),
     ]
 
+    AI_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('complete', 'Complete'),
+        ('unavailable', 'Unavailable'),
+        ('failed', 'Failed'),
+    ]
+
     SMOKING_CHOICES = [
         ('Never', 'Never'),
         ('Former', 'Former'),
@@ -124,11 +148,23 @@ class Screening(models.Model):
     risk_level = models.CharField(max_length=10, choices=RISK_LEVEL_CHOICES, default='Low')
     risk_notes = models.TextField(blank=True, null=True)
     ai_insights = models.TextField(blank=True, null=True)
+    # Progress of the background Gemini enrichment; see api/enrichment.py.
+    ai_status = models.CharField(max_length=12, choices=AI_STATUS_CHOICES, default='pending')
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'screenings'
+        indexes = [
+            # One patient's history, and the join side of worker-scoped lists.
+            models.Index(fields=['patient', '-created_at'], name='screening_patient_created_idx'),
+            # Keyset pagination of the screening list.
+            models.Index(fields=['-created_at', '-id'], name='screening_created_id_idx'),
+            # The list's ``risk`` filter and the officer's recent high-risk cases.
+            models.Index(
+                fields=['risk_level', '-created_at', '-id'], name='screening_risk_created_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"Screening for {self.patient.full_name} - {self.risk_level}"
@@ -156,6 +192,19 @@ class Appointment(models.Model):
     class Meta:
         db_table = 'appointments'
         ordering = ['-scheduled_date']
+        indexes = [
+            # A worker's appointments by status, and their pending count.
+            models.Index(
+                fields=['health_worker', 'status', 'scheduled_date'],
+                name='appt_worker_status_date_idx',
+            ),
+            # System-wide pending appointments on the officer dashboard.
+            models.Index(
+                fields=['scheduled_date'],
+                condition=models.Q(status='scheduled'),
+                name='appt_pending_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Appointment for {self.patient.full_name} on {self.scheduled_date}"
@@ -192,6 +241,126 @@ class Recommendation(models.Model):
     class Meta:
         db_table = 'recommendations'
         ordering = ['-priority', '-created_at']
+        indexes = [
+            # A patient's open recommendations, in list order.
+            models.Index(
+                fields=['patient', '-priority', '-created_at', '-id'],
+                condition=models.Q(is_completed=False),
+                name='rec_open_by_patient_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} for {self.patient.full_name}"
+
+
+class DailyScreeningRollup(models.Model):
+    """
+    Screening counts per day, health worker, village and risk band.
+
+    Dashboards read trends and risk distributions from here, so their cost
+    grows with the number of days reported rather than the number of
+    screenings. ``record_screening`` keeps the rollup current as screenings are
+    written; ``manage.py rebuild_screening_rollup`` recomputes it for a date
+    range after edits that bypass that path, such as admin deletions.
+    """
+
+    date = models.DateField()
+    health_worker = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    village = models.CharField(max_length=255)
+    risk_level = models.CharField(max_length=10, choices=Screening.RISK_LEVEL_CHOICES)
+    screening_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'daily_screening_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'health_worker', 'village', 'risk_level'],
+                name='unique_daily_screening_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['health_worker', 'date'], name='rollup_worker_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.village} {self.risk_level}: {self.screening_count}"
+
+
+class AIEnrichmentJob(models.Model):
+    """
+    A queued request to add Gemini insights to one screening.
+
+    ``record_screening`` inserts the job in the screening's own transaction, so
+    a committed screening always has one; ``manage.py run_ai_worker`` claims
+    due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` and retries failures
+    with exponential backoff. A ``running`` job whose lease has expired is
+    treated as abandoned by a crashed worker and claimed again.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    screening = models.OneToOneField(Screening, on_delete=models.CASCADE, related_name='ai_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField()
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ai_enrichment_jobs'
+        indexes = [
+            # The worker's claim query: due jobs, oldest first.
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='pending'),
+                name='ai_job_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"AI enrichment for screening {self.screening_id}: {self.status}"
+
+
+class AICachedResult(models.Model):
+    """
+    A stored Gemini response, keyed by a hash of the exact request.
+
+    ``api/ai_cache.py`` consults this table, behind an in-process LRU, before
+    calling Gemini, so a retried or replayed analysis, or a lab report
+    uploaded again, is answered without spending quota. Rows expire after
+    their kind's TTL (``AI_CACHE_TTL`` or ``AI_EXTRACTION_CACHE_TTL``), and
+    the least recently used are evicted beyond ``AI_CACHE_MAX_ENTRIES``.
+    """
+
+    KIND_CHOICES = [
+        ('analysis', 'Analysis'),
+        ('extraction', 'Lab report extraction'),
+    ]
+
+    key = models.CharField(max_length=64, unique=True)
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES, default='analysis')
+    model_name = models.CharField(max_length=64)
+    result = models.JSONField()
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'ai_cached_results'
+        indexes = [
+            # Least-recently-used eviction.
+            models.Index(fields=['last_used_at'], name='ai_cache_last_used_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} {self.key[:12]}"
@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination, newest first by default.
+
+A cursor is the opaque, URL-safe encoding of the sort-key values of the last
+row a client has seen. Each page is then a range scan from that row, so page
+500 is as cheap as page 1, and rows inserted while a client is paging neither
+repeat nor go missing the way they do with OFFSET.
+
+Orderings must end in a unique column (``id``) so every row has a distinct
+position.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+ORDERING = ('-created_at', '-id')
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(row, ordering=ORDERING) -> str:
+    """Encode the position just after ``row`` as an opaque token."""
+    values = [getattr(row, field.lstrip('-')) for field in ordering]
+    # isoformat() rather than DjangoJSONEncoder, which drops sub-millisecond
+    # precision and would make rows within the same millisecond collide.
+    raw = json.dumps(values, default=lambda value: value.isoformat(), separators=(',', ':'))
+    raw = raw.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str, model, ordering=ORDERING):
+    """
+    Decode a token from :func:`encode_cursor` back into typed sort-key values.
+
+    Returns:
+        One value per ``ordering`` field, or ``None`` for an empty token (the
+        first page).
+
+    Raises:
+        ValueError: If the token was not produced for this model and ordering.
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(ordering):
+            raise ValueError
+        return [
+            model._meta.get_field(field.lstrip('-')).to_python(value)
+            for field, value in zip(ordering, values, strict=True)
+        ]
+    except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def after(ordering, values) -> Q:
+    """
+    Match the rows sorting strictly after ``values`` under ``ordering``.
+
+    ``(a, b) > (x, y)`` expands to ``a > x OR (a = x AND b > y)``, with each
+    comparison flipped for descending fields.
+    """
+    condition = Q()
+    equal_so_far = Q()
+    for field, value in zip(ordering, values, strict=True):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal_so_far & Q(**{f'{name}__{lookup}': value})
+        equal_so_far &= Q(**{name: value})
+    return condition
+
+
+def keyset_page(queryset, cursor, page_size: int, ordering=ORDERING):
+    """
+    Return one page of ``queryset`` after ``cursor``.
+
+    Args:
+        queryset: The rows to page through.
+        cursor: A token from a previous page, or empty for the first page.
+        page_size: Maximum rows to return.
+        ordering: Sort fields, ending in a unique one.
+
+    Returns:
+        ``(rows, next_cursor)``; ``next_cursor`` is ``None`` on the last page.
+
+    Raises:
+        ValueError: If ``cursor`` is malformed.
+    """
+    values = decode_cursor(cursor, queryset.model, ordering)
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(after(ordering, values))
+
+    # One extra row tells us whether there is a next page without a COUNT.
+    rows = list(queryset[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1], ordering)
+
+
+def estimated_count(queryset) -> tuple:
+    """
+    Return a cheap row count for ``queryset``.
+
+    On PostgreSQL this is the planner's estimate from ``EXPLAIN``, which costs
+    no table scan but can drift from the truth, especially under selective
+    filters. Other backends fall back to an exact ``COUNT``.
+
+    Returns:
+        ``(count, is_estimate)``; ``is_estimate`` is True only when the count
+        came from the planner's statistics.
+    """
+    if connection.vendor != 'postgresql':
+        return queryset.count(), False
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows']), True
+
+
+def parse_page_size(query_params) -> int:
+    """Read ``page_size``, clamped to ``1..MAX_PAGE_SIZE``."""
+    try:
+        page_size = int(query_params.get('page_size', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError) as exc:
+        raise ParseError('page_size must be an integer') from exc
+    return min(max(1, page_size), MAX_PAGE_SIZE)
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination class over :func:`keyset_page`.
+
+    Views may set ``keyset_ordering`` to page in an order other than
+    ``ORDERING``; it must end in ``id``.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = getattr(view, 'keyset_ordering', ORDERING)
+        self.page_size = parse_page_size(request.query_params)
+        try:
+            rows, self.next_cursor = keyset_page(
+                queryset, request.query_params.get('cursor'), self.page_size, ordering
+            )
+        except ValueError as exc:
+            raise ParseError(str(exc)) from exc
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {'page_size': self.page_size, 'next_cursor': self.next_cursor, 'results': data}
+        )
@@ -0,0 +1,78 @@
+"""
+Maintenance of the screening summary denormalized onto ``Patient``.
+
+``latest_screening``, ``latest_risk_level``, ``latest_screened_at`` and
+``screening_count`` let patient lists, the ``risk`` filter and the officer
+dashboard read a patient's current state without touching the screenings
+table. ``record_screening`` folds each new screening in; :func:`refresh`
+recomputes the summary from the screenings themselves after deletes and for
+the backfill command.
+"""
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Patient, Screening
+
+
+def note_screening(patient, screening, count: int = 1) -> None:
+    """
+    Fold one newly written ``screening`` into ``patient``'s summary.
+
+    The count is a single ``UPDATE ... SET count = count + 1``. The latest-*
+    columns only move forward, so a back-dated screening (e.g. synced from an
+    offline device) never replaces a newer one. ``count`` lets a batch fold in
+    several screenings at once, passing the newest as ``screening``.
+    """
+    is_latest = Q(latest_screened_at__isnull=True) | Q(latest_screened_at__lte=screening.created_at)
+
+    def if_latest(field, value):
+        output_field = Patient._meta.get_field(field)
+        return Case(When(is_latest, then=Value(value)), default=F(field), output_field=output_field)
+
+    Patient.objects.filter(pk=patient.pk).update(
+        screening_count=F('screening_count') + count,
+        latest_screening_id=if_latest('latest_screening_id', screening.pk),
+        latest_risk_level=if_latest('latest_risk_level', screening.risk_level),
+        latest_screened_at=if_latest('latest_screened_at', screening.created_at),
+    )
+
+    # Mirror the update on the caller's instance so it can be serialized as is.
+    patient.screening_count += count
+    if patient.latest_screened_at is None or patient.latest_screened_at <= screening.created_at:
+        patient.latest_screening = screening
+        patient.latest_risk_level = screening.risk_level
+        patient.latest_screened_at = screening.created_at
+
+
+def note_screenings(screenings) -> None:
+    """Fold a batch of new screenings in, e.g. from ``bulk_create``; one UPDATE per patient."""
+    by_patient = {}
+    for screening in screenings:
+        by_patient.setdefault(screening.patient_id, []).append(screening)
+    for group in by_patient.values():
+        latest = max(group, key=lambda screening: (screening.created_at, screening.pk))
+        note_screening(latest.patient, latest, count=len(group))
+
+
+def summary_columns() -> dict:
+    """Column expressions recomputing every summary field from the screenings table."""
+    screenings = Screening.objects.filter(patient=OuterRef('pk'))
+    latest = screenings.order_by('-created_at', '-id')
+    count = screenings.order_by().values('patient').annotate(count=Count('id')).values('count')
+    return {
+        'screening_count': Coalesce(Subquery(count, output_field=IntegerField()), 0),
+        'latest_screening': Subquery(latest.values('pk')[:1]),
+        'latest_risk_level': Subquery(latest.values('risk_level')[:1]),
+        'latest_screened_at': Subquery(latest.values('created_at')[:1]),
+    }
+
+
+def refresh(patients) -> int:
+    """
+    Recompute the summary of every patient in the ``patients`` queryset.
+
+    Returns:
+        The number of patients updated.
+    """
+    return patients.update(**summary_columns())
@@ -0,0 +1,105 @@
+"""
+Split multi-page PDF lab reports so Gemini can read the pages in parallel.
+
+Sent whole, a multi-page report took longer with every page, and one page
+Gemini could not read failed the whole extraction. ``split`` turns a report
+into single-page PDFs. ``ai_service`` extracts them concurrently, caching
+each one by its own hash, and ``merge`` combines the answers into one result.
+
+Where pages disagree on a field, ``merge`` prefers values inside the
+serializers' bounds, then the value most pages agree on. A tie goes to the
+earliest page, since reports put the patient's details and the main panel
+first. The values that lost are reported as conflicts.
+"""
+
+import io
+import logging
+import os
+from collections import Counter
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.errors import PdfReadError
+
+from . import lab_text
+
+logger = logging.getLogger(__name__)
+
+# Reports longer than this are sent whole rather than fanned out.
+MAX_PAGES = 20
+
+
+def split(source):
+    """
+    The pages of the PDF at ``source``, a path or an open binary file.
+
+    Returns:
+        Each page as the bytes of a PDF of its own, or None when the document
+        has a single page, more than ``MAX_PAGES``, or cannot be read.
+    """
+    position = None if isinstance(source, (str, os.PathLike)) else source.tell()
+    try:
+        reader = PdfReader(source)
+        if reader.is_encrypted or not 1 < len(reader.pages) <= MAX_PAGES:
+            return None
+        pages = []
+        for page in reader.pages:
+            writer = PdfWriter()
+            writer.add_page(page)
+            output = io.BytesIO()
+            writer.write(output)
+            pages.append(output.getvalue())
+    except (PdfReadError, OSError, ValueError, KeyError, TypeError):
+        logger.info('Could not split %s into pages', source, exc_info=True)
+        return None
+    finally:
+        if position is not None:
+            source.seek(position)
+    return pages
+
+
+def _plausible(field: str, value) -> bool:
+    if field not in lab_text.BOUNDS:
+        return True
+    try:
+        return lab_text.in_bounds(field, float(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _key(value):
+    """What makes two answers the same: case and spacing do not, nor 7 against 7.0."""
+    if isinstance(value, str):
+        return ' '.join(value.split()).lower()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return repr(value)
+
+
+def merge(pages):
+    """
+    Combine the extracted data of each page, in page order, into one result.
+
+    Returns:
+        ``(data, conflicts)``: the merged fields, null where no page had a
+        value, and for each field the pages disagreed on, every distinct
+        value given in page order.
+    """
+    data, conflicts = {}, {}
+    fields = dict.fromkeys(field for page in pages for field in page)
+    for field in fields:
+        values = [page[field] for page in pages if page.get(field) not in (None, '')]
+        values = [value for value in values if _plausible(field, value)] or values
+        if not values:
+            data[field] = None
+            continue
+
+        first = {}
+        for value in values:
+            first.setdefault(_key(value), value)
+        counts = Counter(_key(value) for value in values)
+        # Most pages win; among equals, the earliest page (dicts keep order).
+        winner = max(first, key=lambda key: counts[key])
+        data[field] = first[winner]
+        if len(first) > 1:
+            conflicts[field] = list(first.values())
+    return data, conflicts
@@ -0,0 +1,146 @@
+"""
+Maintenance of the ``DailyScreeningRollup`` table.
+
+Screenings are folded into the rollup as they are written, keyed by the
+screening's local date and the patient's worker and village at that moment.
+When a patient is reassigned, moved or deleted their screenings are shifted to
+the new key, so per-worker dashboards stay in step with ``scope_for``.
+"""
+
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import DailyScreeningRollup, Screening
+
+
+def rollup_key(day, health_worker_id, village, risk_level) -> tuple:
+    """The natural key of one rollup row."""
+    return (day, health_worker_id, village, risk_level)
+
+
+def screening_key(screening, patient) -> tuple:
+    """The rollup key a freshly written ``screening`` for ``patient`` counts towards."""
+    return rollup_key(
+        timezone.localdate(screening.created_at),
+        patient.health_worker_id,
+        patient.village,
+        screening.risk_level,
+    )
+
+
+def adjust(key, delta: int) -> None:
+    """
+    Add ``delta`` to the rollup row identified by ``key``, creating it if needed.
+
+    The increment is a single ``UPDATE ... SET count = count + delta``; only when
+    no row exists yet is one inserted, and a concurrent insert of the same key
+    falls back to the update.
+    """
+    day, health_worker_id, village, risk_level = key
+    match = DailyScreeningRollup.objects.filter(
+        date=day, health_worker_id=health_worker_id, village=village, risk_level=risk_level
+    )
+    if delta < 0:
+        # Clamp so a rollup that has drifted low can never go negative.
+        match.update(screening_count=Greatest(F('screening_count') + delta, 0))
+        return
+    if match.update(screening_count=F('screening_count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            DailyScreeningRollup.objects.create(
+                date=day,
+                health_worker_id=health_worker_id,
+                village=village,
+                risk_level=risk_level,
+                screening_count=delta,
+            )
+    except IntegrityError:
+        match.update(screening_count=F('screening_count') + delta)
+
+
+def apply_counts(counts: Counter) -> None:
+    """Apply a ``{key: delta}`` batch, one statement per distinct key."""
+    for key, delta in counts.items():
+        if delta:
+            adjust(key, delta)
+
+
+def add_screening(screening, patient=None) -> None:
+    """Count one newly written screening."""
+    adjust(screening_key(screening, patient or screening.patient), 1)
+
+
+def add_screenings(screenings) -> None:
+    """Count a batch of newly written screenings, e.g. from ``bulk_create``."""
+    apply_counts(Counter(screening_key(screening, screening.patient) for screening in screenings))
+
+
+def patient_screening_counts(patient) -> list:
+    """``(day, risk_level, count)`` for every day ``patient`` was screened."""
+    rows = (
+        Screening.objects.filter(patient=patient)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'risk_level')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return [(row['day'], row['risk_level'], row['count']) for row in rows]
+
+
+def move_patient(patient, old_health_worker_id, old_village) -> None:
+    """Shift ``patient``'s screenings from their previous worker/village key to the current one."""
+    counts = Counter()
+    for day, risk_level, count in patient_screening_counts(patient):
+        counts[rollup_key(day, old_health_worker_id, old_village, risk_level)] -= count
+        counts[rollup_key(day, patient.health_worker_id, patient.village, risk_level)] += count
+    apply_counts(counts)
+
+
+def remove_patient(patient) -> None:
+    """Subtract every screening of a patient who is about to be deleted."""
+    apply_counts(
+        Counter(
+            {
+                rollup_key(day, patient.health_worker_id, patient.village, risk_level): -count
+                for day, risk_level, count in patient_screening_counts(patient)
+            }
+        )
+    )
+
+
+@transaction.atomic
+def rebuild(start, end) -> int:
+    """
+    Recompute the rollup from the screenings table for ``start``..``end`` inclusive.
+
+    Returns:
+        The number of rollup rows written.
+    """
+    window_start = timezone.make_aware(datetime.combine(start, time.min))
+    window_end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+
+    DailyScreeningRollup.objects.filter(date__gte=start, date__lte=end).delete()
+    rows = (
+        Screening.objects.filter(created_at__gte=window_start, created_at__lt=window_end)
+        .annotate(day=TruncDate('created_at'))
+        .values('day', 'patient__health_worker_id', 'patient__village', 'risk_level')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    created = DailyScreeningRollup.objects.bulk_create(
+        DailyScreeningRollup(
+            date=row['day'],
+            health_worker_id=row['patient__health_worker_id'],
+            village=row['patient__village'],
+            risk_level=row['risk_level'],
+            screening_count=row['count'],
+        )
+        for row in rows
+    )
+    return len(created)
@@ -0,0 +1,197 @@
+"""
+Ranked patient search over name, village and phone.
+
+``search_patients`` picks a backend for the active database:
+
+* PostgreSQL: ``ILIKE`` filters served by ``pg_trgm`` GIN indexes (migration
+  0011), ranked by trigram word similarity so a partial name typed into the
+  search box surfaces the closest names first.
+* SQLite: an FTS5 shadow table (``patient_search``) using the trigram
+  tokenizer, kept in step with ``patients`` by triggers and ranked by BM25.
+* Anything else, or a term too short to form a trigram: the plain
+  ``icontains`` scan, ranked by which column matched.
+
+``PATIENT_SEARCH_BACKEND`` in settings forces one of ``'postgres'``,
+``'sqlite_fts'`` or ``'basic'``; the default ``'auto'`` follows the vendor.
+Every backend annotates ``search_rank`` (higher is better) and orders by it.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'patient_search'
+
+# Trigram indexes, in both backends, cannot match anything shorter.
+MIN_TRIGRAM_LENGTH = 3
+
+# BM25 column weights for (full_name, village, phone): a name hit matters most.
+FTS_WEIGHTS = (10.0, 2.0, 1.0)
+
+SQLITE_FTS_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        full_name, village, phone,
+        content='patients', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, full_name, village, phone)
+        VALUES (new.id, new.full_name, new.village, new.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name, village, phone)
+        VALUES ('delete', old.id, old.full_name, old.village, old.phone);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF full_name, village, phone ON patients BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name, village, phone)
+        VALUES ('delete', old.id, old.full_name, old.village, old.phone);
+        INSERT INTO {FTS_TABLE}(rowid, full_name, village, phone)
+        VALUES (new.id, new.full_name, new.village, new.phone);
+    END
+    """,
+]
+
+SQLITE_FTS_OBJECTS = {FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'}
+
+
+def sqlite_supports_fts(connection) -> bool:
+    """Whether this SQLite build has FTS5 with the trigram tokenizer (3.34+)."""
+    return connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 34)
+
+
+def ensure_sqlite_fts(connection) -> bool:
+    """
+    Create the FTS5 table and its triggers if any are missing, then reindex.
+
+    Idempotent, and run after every ``migrate``: SQLite drops a table's
+    triggers whenever a schema change makes Django rebuild it, so this also
+    heals the index after future ``Patient`` migrations.
+
+    Returns:
+        True if anything was (re)created.
+    """
+    if not sqlite_supports_fts(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            sorted(SQLITE_FTS_OBJECTS),
+        )
+        if {row[0] for row in cursor.fetchall()} == SQLITE_FTS_OBJECTS:
+            return False
+        for statement in SQLITE_FTS_STATEMENTS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    logger.info('Rebuilt the %s full-text index', FTS_TABLE)
+    return True
+
+
+def fts_phrase(term: str) -> str:
+    """Quote ``term`` as a single FTS5 phrase so user input is never parsed as syntax."""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def basic_search(queryset, term):
+    """``icontains`` over every column, ranked by the column that matched."""
+    return (
+        queryset.filter(
+            Q(full_name__icontains=term) | Q(village__icontains=term) | Q(phone__icontains=term)
+        )
+        .annotate(
+            search_rank=Case(
+                When(full_name__istartswith=term, then=Value(3)),
+                When(full_name__icontains=term, then=Value(2)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        )
+        .order_by('-search_rank', *queryset.query.order_by)
+    )
+
+
+def postgres_search(queryset, term):
+    """Trigram-indexed ``ILIKE``, ranked by word similarity to the name or village."""
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    return (
+        queryset.filter(
+            Q(full_name__icontains=term) | Q(village__icontains=term) | Q(phone__icontains=term)
+        )
+        .annotate(
+            search_rank=Greatest(
+                TrigramWordSimilarity(Value(term), 'full_name'),
+                TrigramWordSimilarity(Value(term), 'village'),
+                output_field=FloatField(),
+            )
+        )
+        .order_by('-search_rank', *queryset.query.order_by)
+    )
+
+
+def sqlite_fts_search(queryset, term):
+    """
+    FTS5 trigram match, ranked by weighted BM25 (negated so higher is better).
+
+    The FTS table is joined rather than filtered through a subquery: ``bm25()``
+    only works inside the query that runs the ``MATCH``, and the join lets
+    SQLite drive the lookup from the index instead of scanning ``patients``.
+    """
+    table = queryset.model._meta.db_table
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    return queryset.extra(
+        select={'search_rank': f'-bm25({FTS_TABLE}, {weights})'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+        params=[fts_phrase(term)],
+    ).order_by('-search_rank', *queryset.query.order_by)
+
+
+def backend_name(connection) -> str:
+    """The backend ``search_patients`` uses for ``connection``."""
+    configured = getattr(settings, 'PATIENT_SEARCH_BACKEND', 'auto')
+    if configured != 'auto':
+        return configured
+    if connection.vendor == 'postgresql':
+        return 'postgres'
+    if sqlite_supports_fts(connection):
+        return 'sqlite_fts'
+    return 'basic'
+
+
+BACKENDS = {
+    'basic': basic_search,
+    'postgres': postgres_search,
+    'sqlite_fts': sqlite_fts_search,
+}
+
+
+def search_patients(queryset, term: str):
+    """
+    Filter ``queryset`` to patients matching ``term``, best matches first.
+
+    Args:
+        queryset: A ``Patient`` queryset; its ordering breaks ties in rank.
+        term: The raw search text.
+
+    Returns:
+        The filtered queryset, annotated with ``search_rank``.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    name = backend_name(connections[queryset.db])
+    if len(term) < MIN_TRIGRAM_LENGTH and name != 'postgres':
+        name = 'basic'
+    return BACKENDS[name](queryset, term)
@@ -193,9 +193,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 class PatientSerializer(serializers.ModelSerializer):
     """Serializer for patient details."""
 
-    health_worker_id = serializers.IntegerField(source='health_worker.id', read_only=True)
-    screening_count = serializers.SerializerMethodField()
-    latest_risk_level = serializers.SerializerMethodField()
+    health_worker_id = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Patient
@@ -211,14 +209,13 @@ class PatientSerializer(serializers.ModelSerializer):
             'screening_count',
             'latest_risk_level',
         ]
-        read_only_fields = ['id', 'health_worker_id', 'created_at']
-
-    def get_screening_count(self, obj):
-        return obj.screenings.count()
-
-    def get_latest_risk_level(self, obj):
-        latest = obj.screenings.order_by('-created_at').first()
-        return latest.risk_level if latest else None
+        read_only_fields = [
+            'id',
+            'health_worker_id',
+            'created_at',
+            'screening_count',
+            'latest_risk_level',
+        ]
 
 
 class PatientCreateSerializer(serializers.ModelSerializer):
@@ -306,6 +303,7 @@ class ScreeningSerializer(serializers.ModelSerializer):
             'risk_level',
             'risk_notes',
             'ai_insights',
+            'ai_status',
             'created_at',
         ]
         read_only_fields = [
@@ -314,6 +312,7 @@ class ScreeningSerializer(serializers.ModelSerializer):
             'risk_level',
             'risk_notes',
             'ai_insights',
+            'ai_status',
             'created_at',
         ]
 
@@ -382,7 +381,11 @@ class ScreeningCreateSerializer(serializers.ModelSerializer):
             self.fields[name] = bounded_field(serializers.FloatField, bounds)
 
     def validate_patient_id(self, value):
-        if not Patient.objects.filter(id=value).exists():
+        # A batch resolves every patient up front and passes the ids in, rather
+        # than paying for one existence query per item.
+        known = self.context.get('patient_ids')
+        exists = value in known if known is not None else Patient.objects.filter(id=value).exists()
+        if not exists:
             raise serializers.ValidationError('Patient not found')
         return value
 
@@ -0,0 +1,110 @@
+"""
+Model signal handlers keeping derived tables, the patient search index and
+cached dashboards in step with patient, screening and appointment edits.
+
+Connected from ``ApiConfig.ready``.
+"""
+
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import dashboard_cache, patient_summary, rollups, search
+from .models import Appointment, Patient, Screening, User
+
+
+@receiver(pre_save, sender=Patient)
+def remember_rollup_key(sender, instance, raw=False, **kwargs):
+    """Note the worker and village a patient's screenings are currently rolled up under."""
+    if raw or instance.pk is None:
+        return
+    instance._previous_rollup_key = (
+        Patient.objects.filter(pk=instance.pk).values_list('health_worker_id', 'village').first()
+    )
+
+
+@receiver(post_save, sender=Patient)
+def move_rollup_counts(sender, instance, created, raw=False, **kwargs):
+    """Re-key the patient's screening counts after a reassignment or a village change."""
+    previous = getattr(instance, '_previous_rollup_key', None)
+    if raw or created or previous is None:
+        return
+    if previous != (instance.health_worker_id, instance.village):
+        rollups.move_patient(instance, *previous)
+
+
+@receiver(pre_delete, sender=Patient)
+def remove_rollup_counts(sender, instance, **kwargs):
+    """Subtract the patient's screenings before they are cascade-deleted."""
+    rollups.remove_patient(instance)
+
+
+@receiver(post_delete, sender=Screening)
+def remove_screening_count(sender, instance, origin=None, **kwargs):
+    """
+    Subtract a screening deleted on its own.
+
+    Screenings cascade-deleted with their patient (or the patient's account)
+    were already subtracted by ``remove_rollup_counts``.
+    """
+    if not (isinstance(origin, Screening) or getattr(origin, 'model', None) is Screening):
+        return
+    patient = (
+        Patient.objects.filter(pk=instance.patient_id).only('health_worker_id', 'village').first()
+    )
+    if patient is not None:
+        rollups.adjust(rollups.screening_key(instance, patient), -1)
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+def invalidate_patient_dashboards(sender, instance, **kwargs):
+    """Drop cached dashboards of the patient's worker, and of their previous one."""
+    previous = getattr(instance, '_previous_rollup_key', None)
+    previous_worker_id = previous[0] if previous else None
+    dashboard_cache.invalidate_workers_on_commit(instance.health_worker_id, previous_worker_id)
+
+
+@receiver(post_save, sender=Screening)
+@receiver(post_delete, sender=Screening)
+def invalidate_screening_dashboards(sender, instance, **kwargs):
+    """Drop cached dashboards that count or list this screening."""
+    if Screening.patient.is_cached(instance):
+        health_worker_id = instance.patient.health_worker_id
+    else:
+        # Cheaper than loading the patient, and safe while it is being deleted.
+        health_worker_id = (
+            Patient.objects.filter(pk=instance.patient_id)
+            .values_list('health_worker_id', flat=True)
+            .first()
+        )
+    dashboard_cache.invalidate_workers_on_commit(health_worker_id)
+
+
+@receiver(post_delete, sender=Screening)
+def refresh_patient_summary(sender, instance, **kwargs):
+    """Recompute the patient's screening count and latest band once a screening is gone."""
+    patient_summary.refresh(Patient.objects.filter(pk=instance.patient_id))
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_dashboards(sender, instance, **kwargs):
+    """Drop cached dashboards showing the appointment's worker's schedule."""
+    dashboard_cache.invalidate_workers_on_commit(instance.health_worker_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_worker_dashboards(sender, instance, update_fields=None, **kwargs):
+    """Drop cached officer dashboards listing a health worker who was added, edited or removed."""
+    if instance.role != 'health_worker' or update_fields == frozenset({'last_login'}):
+        return
+    dashboard_cache.invalidate_workers_on_commit(instance.id)
+
+
+@receiver(post_migrate)
+def install_patient_search_index(sender, using, **kwargs):
+    """(Re)create the SQLite full-text index on patients once the api app is migrated."""
+    if sender.name == 'api':
+        search.ensure_sqlite_fts(connections[using])
@@ -8,9 +8,11 @@ django.setup()
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from rest_framework.test import APIClient
 
-from api.models import Patient
+from api import ai_cache, ai_guard, patient_summary, rollups
+from api.models import Patient, Screening
 
 User = get_user_model()
 
@@ -32,6 +34,28 @@ def no_gemini_key(monkeypatch):
     monkeypatch.delenv('GEMINI_API_KEY', raising=False)
 
 
+@pytest.fixture(autouse=True)
+def no_ai_cache(settings):
+    """
+    Keep the Gemini result cache off unless a test turns it on.
+
+    Its in-process LRU outlives a test, so a result cached by one test would
+    otherwise answer the same prompt in the next.
+    """
+    settings.AI_CACHE_TTL = 0
+    settings.AI_EXTRACTION_CACHE_TTL = 0
+    yield
+    ai_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def closed_ai_circuit():
+    """Start and leave every test with the Gemini circuit breaker closed."""
+    ai_guard.breaker.reset()
+    yield
+    ai_guard.breaker.reset()
+
+
 @pytest.fixture(autouse=True)
 def fast_password_hashing(settings):
     """
@@ -43,6 +67,19 @@ def fast_password_hashing(settings):
     settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Start every test with an empty cache.
+
+    The local-memory cache outlives a test's rolled-back transaction, so a
+    dashboard cached by one test would otherwise be served to the next.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -59,6 +96,54 @@ def make_user(email, role, **extra):
     )
 
 
+def text_pdf(*pages):
+    """A PDF with a text layer, one page per list of lines, as a report generator writes it."""
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # The page tree, once the pages are numbered.
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for lines in pages:
+        shown = ' '.join(
+            '({}) Tj T*'.format(line.replace('(', '\\(').replace(')', '\\)')) for line in lines
+        )
+        stream = f'BT /F1 10 Tf 14 TL 40 800 Td {shown} ET'
+        kids.append(f'{len(objects) + 1} 0 R')
+        objects.append(
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>'
+        )
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    document = '%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(document))
+        document += f'{number} 0 obj\n{body}\nendobj\n'
+    xref = len(document)
+    document += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'
+    document += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets)
+    document += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'
+    return document.encode('latin-1')
+
+
+def make_screening(patient, **fields):
+    """
+    Insert a screening with explicit risk fields and fold it into the rollup
+    and the patient's screening summary.
+
+    ``record_screening`` derives the risk band from the vitals, so tests that
+    need a particular band write the row directly and apply the same
+    bookkeeping the write path performs.
+    """
+    screening = Screening.objects.create(patient=patient, **fields)
+    rollups.add_screening(screening, patient)
+    patient_summary.note_screening(patient, screening)
+    return screening
+
+
 @pytest.fixture
 def health_worker(db):
     return make_user('worker@example.com', 'health_worker')
@@ -0,0 +1,163 @@
+"""Tests for the async AI views served under ASGI."""
+
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory
+
+from api import ai_guard, ai_service
+from api.views import ai_async
+
+pytestmark = pytest.mark.django_db
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeAsyncModel:
+    """Answers ``generate_content_async`` after ``delay`` seconds, recording the contents."""
+
+    def __init__(self):
+        self.calls = []
+        self.delay = 0
+        self.text = '{"systolic_bp": 120, "diastolic_bp": 80}'
+
+    async def generate_content_async(self, contents, request_options=None, generation_config=None):
+        self.calls.append(contents)
+        await asyncio.sleep(self.delay)
+        return FakeResponse(self.text)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    fake = FakeAsyncModel()
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: fake)
+    return fake
+
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Stand in for ``genai.upload_file``, recording the content and MIME type of each."""
+    seen = []
+
+    def upload_file(path, mime_type=None):
+        seen.append((path.read(), mime_type))
+        return 'uploaded-file'
+
+    monkeypatch.setattr(ai_service.genai, 'upload_file', upload_file)
+    return seen
+
+
+def post(view, data=None, query='', **extra):
+    request = RequestFactory().post(f'/api/ai/{query}', data or {}, **extra)
+    return async_to_sync(view.as_view())(request)
+
+
+def post_json(view, payload, query=''):
+    return post(view, json.dumps(payload), query, content_type='application/json')
+
+
+class TestTextVitals:
+    def test_returns_the_extracted_data(self, model):
+        response = post_json(
+            ai_async.AITextVitalsView, {'text': 'Sita from Rampur, bp 120 over 80'}
+        )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {'systolic_bp': 120, 'diastolic_bp': 80}
+        assert 'Sita from Rampur, bp 120 over 80' in model.calls[0]
+
+    def test_requires_text(self, model):
+        response = post_json(ai_async.AITextVitalsView, {})
+
+        assert response.status_code == 400
+        assert json.loads(response.content) == {'detail': 'No transcription text provided'}
+
+    def test_degrades_without_an_api_key(self):
+        response = post_json(
+            ai_async.AITextVitalsView, {'text': 'Sita from Rampur, bp 120 over 80'}
+        )
+
+        assert response.status_code == 500
+        assert 'GEMINI_API_KEY' in json.loads(response.content)['detail']
+
+
+class TestAnalysis:
+    def test_shares_the_result_cache(self, settings, model):
+        settings.AI_CACHE_TTL = 3600
+        model.text = '{"summary": "Stable", "formatted_insights": "**Overview**"}'
+
+        post_json(ai_async.AIAnalysisView, {'age': 52})
+        cached = post_json(ai_async.AIAnalysisView, {'age': 52})
+        fresh = post_json(ai_async.AIAnalysisView, {'age': 52}, query='?refresh=true')
+
+        assert json.loads(cached.content)['cached'] is True
+        assert 'cached' not in json.loads(fresh.content)
+        assert len(model.calls) == 2
+
+    def test_rejects_a_body_that_is_not_an_object(self, model):
+        response = post(ai_async.AIAnalysisView, '[1, 2]', content_type='application/json')
+
+        assert response.status_code == 400
+
+
+class TestUploads:
+    def test_lab_report_is_uploaded_straight_from_memory(self, model, uploads):
+        report = SimpleUploadedFile('report.pdf', b'%PDF-1.4 stub')
+
+        response = post(ai_async.AILabExtractionView, {'file': report})
+
+        assert response.status_code == 200
+        assert uploads == [(b'%PDF-1.4 stub', 'application/pdf')]
+        assert model.calls[0] == [ai_service.DOCUMENT_PROMPT, 'uploaded-file']
+
+    def test_a_repeat_lab_report_is_served_from_the_cache(self, settings, model, uploads):
+        settings.AI_EXTRACTION_CACHE_TTL = 3600
+
+        for _ in range(2):
+            response = post(
+                ai_async.AILabExtractionView,
+                {'file': SimpleUploadedFile('report.pdf', b'%PDF-1.4 stub')},
+            )
+
+        assert response.status_code == 200
+        assert json.loads(response.content) == {'systolic_bp': 120, 'diastolic_bp': 80}
+        assert len(uploads) == len(model.calls) == 1
+
+    def test_voice_rejects_an_unsupported_type(self, model, uploads):
+        response = post(ai_async.AIVoiceVitalsView, {'audio': SimpleUploadedFile('a.exe', b'x')})
+
+        assert response.status_code == 400
+        assert uploads == []
+
+
+class TestProtection:
+    def test_an_open_circuit_answers_503(self, model):
+        for _ in range(ai_guard.MIN_CALLS):
+            ai_guard.breaker.record(False, 0.1)
+
+        response = post_json(
+            ai_async.AITextVitalsView, {'text': 'Sita from Rampur, bp 120 over 80'}
+        )
+
+        assert response.status_code == 503
+        assert response['Retry-After'] == '30'
+        assert model.calls == []
+
+    def test_the_deadline_bounds_the_whole_call(self, settings, model):
+        settings.AI_TIMEOUT_SECONDS = 0.05
+        model.delay = 1
+
+        response = post_json(
+            ai_async.AITextVitalsView, {'text': 'Sita from Rampur, bp 120 over 80'}
+        )
+
+        assert response.status_code == 500
+        assert ai_guard.breaker.snapshot()['calls'] == 1
+        assert ai_guard.snapshot()['in_flight'] == 0
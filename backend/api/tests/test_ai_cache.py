@@ -0,0 +1,302 @@
+"""Tests for the content-addressed Gemini result cache."""
+
+import io
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from api import ai_cache, ai_service
+from api.models import AICachedResult
+
+from .conftest import make_user
+
+pytestmark = pytest.mark.django_db
+
+SCREENING = {'age': 52, 'gender': 'Male', 'systolic_bp': 150, 'glucose_level': 110.5}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+@pytest.fixture
+def gemini_calls(settings, monkeypatch):
+    """Turn the cache on and count the prompts that reach Gemini."""
+    settings.AI_CACHE_TTL = 3600
+    prompts = []
+
+    def generate(prompt, **options):
+        prompts.append(prompt)
+        return FakeResponse('{"summary": "Stable", "formatted_insights": "**Overview**"}')
+
+    monkeypatch.setattr(ai_service, 'try_generate_content', generate)
+    return prompts
+
+
+class TestKeys:
+    def test_key_depends_on_the_model_and_every_part(self):
+        key = ai_cache.make_key('gemini-2.5-flash', 'prompt')
+
+        assert key == ai_cache.make_key('gemini-2.5-flash', 'prompt')
+        assert key != ai_cache.make_key('gemini-2.5-pro', 'prompt')
+        assert ai_cache.make_key('m', 'ab', 'c') != ai_cache.make_key('m', 'a', 'bc')
+
+    @pytest.mark.parametrize('value', [120, 120.0, '120', ' 120 '])
+    def test_equal_readings_normalize_alike(self, value):
+        assert ai_service.normalize_input(value) == 120
+
+    def test_blanks_and_text_normalize(self):
+        assert ai_service.normalize_input('') is None
+        assert ai_service.normalize_input(' Current ') == 'Current'
+        assert ai_service.normalize_input('nan') == 'nan'
+
+
+class TestAnalysisCache:
+    def test_a_repeat_analysis_is_served_without_calling_gemini(self, gemini_calls):
+        first = ai_service.analyze_health_data(SCREENING)
+        second = ai_service.analyze_health_data(SCREENING)
+
+        assert len(gemini_calls) == 1
+        assert second == {**first, 'cached': True}
+        assert ai_cache.stats()['memory_hits'] == 1
+
+    def test_equivalent_payloads_share_an_entry(self, gemini_calls):
+        ai_service.analyze_health_data(SCREENING)
+        ai_service.analyze_health_data(
+            {**{key: str(value) for key, value in SCREENING.items()}, 'notes': 'ignored'}
+        )
+
+        assert len(gemini_calls) == 1
+
+    def test_other_processes_are_served_from_the_table(self, gemini_calls):
+        ai_service.analyze_health_data(SCREENING)
+        ai_cache.clear()
+
+        result = ai_service.analyze_health_data(SCREENING)
+
+        assert result['cached'] is True
+        assert len(gemini_calls) == 1
+        assert ai_cache.stats()['db_hits'] == 1
+        assert AICachedResult.objects.get().hit_count == 1
+
+    def test_bypass_calls_gemini_and_refreshes_the_entry(self, gemini_calls):
+        ai_service.analyze_health_data(SCREENING)
+
+        result = ai_service.analyze_health_data(SCREENING, use_cache=False)
+
+        assert 'cached' not in result
+        assert len(gemini_calls) == 2
+        assert AICachedResult.objects.count() == 1
+
+    def test_failures_are_not_cached(self, settings, monkeypatch):
+        settings.AI_CACHE_TTL = 3600
+        monkeypatch.setattr(
+            ai_service, 'try_generate_content', lambda p, **options: FakeResponse('nope')
+        )
+
+        ai_service.analyze_health_data(SCREENING)
+
+        assert not AICachedResult.objects.exists()
+        assert ai_cache.stats()['misses'] == 1
+
+    def test_expired_entries_are_not_served(self, gemini_calls):
+        ai_service.analyze_health_data(SCREENING)
+        ai_cache.clear()
+        AICachedResult.objects.update(created_at=timezone.now() - timedelta(hours=2))
+
+        ai_service.analyze_health_data(SCREENING)
+
+        assert len(gemini_calls) == 2
+
+    def test_a_table_hit_expires_from_memory_with_its_row(self, gemini_calls, monkeypatch):
+        ai_service.analyze_health_data(SCREENING)
+        ai_cache.clear()
+        AICachedResult.objects.update(created_at=timezone.now() - timedelta(minutes=59))
+        ai_service.analyze_health_data(SCREENING)
+
+        # Two minutes on, the row has expired, so its copy in memory must have too.
+        now = time.monotonic()
+        monkeypatch.setattr(ai_cache.time, 'monotonic', lambda: now + 120)
+        ai_service.analyze_health_data(SCREENING)
+
+        assert ai_cache.stats()['memory_hits'] == 0
+        assert ai_cache.stats()['db_hits'] == 2
+
+    def test_a_zero_ttl_disables_the_cache(self, settings, gemini_calls):
+        settings.AI_CACHE_TTL = 0
+
+        ai_service.analyze_health_data(SCREENING)
+        ai_service.analyze_health_data(SCREENING)
+
+        assert len(gemini_calls) == 2
+        assert not AICachedResult.objects.exists()
+
+
+class TestEviction:
+    def test_the_table_keeps_the_most_recently_used_rows(self, settings):
+        settings.AI_CACHE_TTL = 3600
+        settings.AI_CACHE_MAX_ENTRIES = 2
+        for name in ['a', 'b']:
+            ai_cache.put(name, 'm', {'name': name})
+        AICachedResult.objects.filter(key='a').update(last_used_at=timezone.now())
+
+        ai_cache.put('c', 'm', {'name': 'c'})
+
+        assert set(AICachedResult.objects.values_list('key', flat=True)) == {'a', 'c'}
+
+    def test_the_memory_lru_is_bounded(self, settings):
+        settings.AI_CACHE_TTL = 3600
+        settings.AI_CACHE_MEMORY_ENTRIES = 2
+        for name in ['a', 'b', 'c']:
+            ai_cache.put(name, 'm', {'name': name})
+
+        assert ai_cache.stats()['memory_entries'] == 2
+
+    def test_command_prunes_expired_rows(self, settings, capsys):
+        settings.AI_CACHE_TTL = 3600
+        ai_cache.put('old', 'm', {})
+        AICachedResult.objects.update(created_at=timezone.now() - timedelta(hours=2))
+
+        call_command('ai_cache', 'prune')
+
+        assert not AICachedResult.objects.exists()
+        assert 'Pruned 1' in capsys.readouterr().out
+
+
+class TestAnalysisEndpoint:
+    def test_refresh_bypasses_the_cache(self, api_client, gemini_calls):
+        url = reverse('ai_analyze')
+        api_client.post(url, SCREENING, format='json')
+
+        cached = api_client.post(url, SCREENING, format='json')
+        fresh = api_client.post(f'{url}?refresh=true', SCREENING, format='json')
+
+        assert cached.data['cached'] is True
+        assert 'cached' not in fresh.data
+        assert len(gemini_calls) == 2
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def generate_content(self, contents, request_options=None):
+        self.calls.append(contents)
+        return FakeResponse('{"hemoglobin": 13.5, "glucose_level": 98}')
+
+
+@pytest.fixture
+def extraction_calls(settings, monkeypatch):
+    """Turn the extraction cache on and count the documents that reach Gemini."""
+    settings.AI_EXTRACTION_CACHE_TTL = 3600
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    model = FakeModel()
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: model)
+    monkeypatch.setattr(ai_service.genai, 'upload_file', lambda path, mime_type=None: 'uploaded')
+    return model.calls
+
+
+def report(content=b'%PDF-1.4\nreport one'):
+    return io.BytesIO(content)
+
+
+class TestExtractionCache:
+    def test_the_same_document_is_extracted_once(self, extraction_calls):
+        first = ai_service.extract_screening_data_from_file(report(), 'application/pdf')
+        second = ai_service.extract_screening_data_from_file(report(), 'application/pdf')
+
+        assert len(extraction_calls) == 1
+        assert second == {**first, 'cached': True}
+        assert AICachedResult.objects.get().kind == ai_cache.EXTRACTION
+
+    def test_a_different_document_is_extracted_again(self, extraction_calls):
+        ai_service.extract_screening_data_from_file(report(), 'application/pdf')
+        ai_service.extract_screening_data_from_file(report(b'%PDF-1.4\nreport two'))
+
+        assert len(extraction_calls) == 2
+
+    def test_a_known_hash_is_used_without_reading_the_file(self, extraction_calls):
+        digest = ai_service.content_sha256(report())
+        ai_service.extract_screening_data_from_file(report(), 'application/pdf')
+        unreadable = report()
+        unreadable.read = None
+
+        result = ai_service.extract_screening_data_from_file(unreadable, sha256=digest)
+
+        assert result['cached'] is True
+
+    def test_hashing_leaves_the_file_where_it_was(self):
+        document = report()
+        document.read(4)
+
+        ai_service.content_sha256(document)
+
+        assert document.tell() == 4
+
+    def test_its_ttl_is_independent_of_the_analysis_cache(self, settings, extraction_calls):
+        settings.AI_EXTRACTION_CACHE_TTL = 0
+        settings.AI_CACHE_TTL = 3600
+
+        ai_service.extract_screening_data_from_file(report())
+        ai_service.extract_screening_data_from_file(report())
+
+        assert len(extraction_calls) == 2
+        assert not AICachedResult.objects.exists()
+
+    def test_failures_are_not_cached(self, extraction_calls, monkeypatch):
+        monkeypatch.setattr(ai_service, 'extraction_result', lambda text: {'success': False})
+
+        ai_service.extract_screening_data_from_file(report())
+
+        assert not AICachedResult.objects.exists()
+
+    def test_the_lab_endpoint_reuses_a_repeat_upload(self, api_client, extraction_calls):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        def post():
+            upload = SimpleUploadedFile('report.pdf', b'%PDF-1.4\nreport one')
+            return api_client.post(reverse('lab_extract'), {'image': upload}, format='multipart')
+
+        first, second = post(), post()
+
+        assert first.data == second.data == {'hemoglobin': 13.5, 'glucose_level': 98}
+        assert len(extraction_calls) == 1
+
+
+class TestHitRates:
+    def test_counts_memory_and_table_hits_per_kind(self, settings, extraction_calls):
+        ai_service.extract_screening_data_from_file(report())
+        ai_service.extract_screening_data_from_file(report())
+        ai_cache.clear()
+        ai_service.extract_screening_data_from_file(report())
+
+        rates = ai_cache.hit_rates()
+
+        assert rates[ai_cache.EXTRACTION] == {'entries': 1, 'hits': 2, 'hit_rate': 0.667}
+        assert rates[ai_cache.ANALYSIS] == {'entries': 0, 'hits': 0, 'hit_rate': None}
+
+    def test_memory_hits_reach_the_table_in_batches(self, extraction_calls):
+        ai_service.extract_screening_data_from_file(report())
+        ai_service.extract_screening_data_from_file(report())
+
+        assert AICachedResult.objects.get().hit_count == 0
+        ai_cache.hit_rates()
+        assert AICachedResult.objects.get().hit_count == 1
+
+    def test_are_shown_in_the_admin(self, client, extraction_calls):
+        client.force_login(
+            make_user('admin@example.com', 'admin', is_staff=True, is_superuser=True)
+        )
+        ai_service.extract_screening_data_from_file(report())
+        ai_service.extract_screening_data_from_file(report())
+
+        response = client.get(reverse('admin:api_aicachedresult_changelist'))
+
+        assert response.status_code == 200
+        assert b'Lab report extraction' in response.content
+        assert b'50%' in response.content
@@ -0,0 +1,227 @@
+"""Tests for the deadline, bulkhead and circuit breaker around Gemini calls."""
+
+import io
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from api import ai_guard, ai_service, enrichment
+from api.models import AIEnrichmentJob
+
+from .test_screenings import screening_payload
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Records the timeout of each request; fails while ``error`` is set."""
+
+    def __init__(self):
+        self.timeouts = []
+        self.error = None
+
+    def generate_content(self, contents, request_options=None, generation_config=None):
+        self.timeouts.append(request_options['timeout'])
+        if self.error:
+            raise self.error
+        return FakeResponse('{"summary": "Stable", "formatted_insights": "**Overview**"}')
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    fake = FakeModel()
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: fake)
+    return fake
+
+
+def trip():
+    for _ in range(ai_guard.MIN_CALLS):
+        ai_guard.breaker.record(False, 0.1)
+
+
+def ok(deadline):
+    return 'ok'
+
+
+class TestCircuitBreaker:
+    def test_stays_closed_below_the_error_rate(self):
+        for succeeded in [True, True, False] * ai_guard.MIN_CALLS:
+            ai_guard.breaker.record(succeeded, 0.1)
+
+        assert ai_guard.breaker.snapshot()['state'] == ai_guard.CLOSED
+
+    def test_opens_on_errors_and_rejects_with_a_retry_hint(self):
+        trip()
+
+        with pytest.raises(ai_guard.Rejected) as raised:
+            ai_guard.call(ok)
+
+        assert ai_guard.breaker.snapshot()['state'] == ai_guard.OPEN
+        assert raised.value.retry_after == 30
+
+    def test_opens_on_p95_latency(self, settings):
+        settings.AI_BREAKER_P95_SECONDS = 5
+        for _ in range(ai_guard.MIN_CALLS):
+            ai_guard.breaker.record(True, 8.0)
+
+        assert ai_guard.breaker.snapshot()['state'] == ai_guard.OPEN
+
+    def test_a_successful_trial_closes_it(self, settings):
+        settings.AI_BREAKER_COOLDOWN_SECONDS = 0
+        trip()
+
+        assert ai_guard.call(ok) == 'ok'
+        assert ai_guard.breaker.snapshot() == {
+            'state': ai_guard.CLOSED,
+            'calls': 0,
+            'error_rate': 0.0,
+            'p95_seconds': 0.0,
+        }
+
+    def test_a_failed_trial_reopens_it(self, settings):
+        settings.AI_BREAKER_COOLDOWN_SECONDS = 0
+        trip()
+
+        def fail(deadline):
+            raise ConnectionError('still down')
+
+        with pytest.raises(ConnectionError):
+            ai_guard.call(fail)
+
+        assert ai_guard.breaker.snapshot()['state'] == ai_guard.OPEN
+
+    def test_only_one_trial_runs_at_a_time(self, settings):
+        settings.AI_BREAKER_COOLDOWN_SECONDS = 0
+        trip()
+
+        def nested(deadline):
+            return ai_guard.call(ok)
+
+        with pytest.raises(ai_guard.Rejected, match='recovering'):
+            ai_guard.call(nested)
+
+
+class TestBulkheadAndDeadline:
+    def test_rejects_calls_beyond_the_concurrency_cap(self, settings):
+        settings.AI_MAX_CONCURRENCY = 1
+
+        def nested(deadline):
+            return ai_guard.call(ok)
+
+        with pytest.raises(ai_guard.Rejected, match='Too many'):
+            ai_guard.call(nested)
+        assert ai_guard.snapshot()['in_flight'] == 0
+
+    def test_requests_carry_the_time_left(self, settings, model):
+        settings.AI_TIMEOUT_SECONDS = 12
+
+        ai_service.try_generate_content('prompt')
+
+        assert 11 < model.timeouts[0] <= 12
+
+    def test_an_exhausted_deadline_raises(self):
+        with pytest.raises(ai_guard.DeadlineExceeded):
+            ai_guard.Deadline(0).remaining()
+
+    def test_steps_without_a_timeout_are_bounded_by_the_deadline(self):
+        started = time.monotonic()
+
+        with pytest.raises(ai_guard.DeadlineExceeded):
+            ai_guard.Deadline(0.1).run(time.sleep, 2)
+
+        assert time.monotonic() - started < 1
+        assert ai_guard.Deadline(5).run(sum, [1, 2]) == 3
+
+    def test_no_step_starts_once_the_deadline_has_passed(self):
+        steps = []
+
+        with pytest.raises(ai_guard.DeadlineExceeded):
+            ai_guard.Deadline(0).run(steps.append, 'upload')
+
+        assert steps == []
+
+    def test_steps_still_running_past_their_deadline_shed_new_ones(self, monkeypatch):
+        monkeypatch.setattr(ai_guard, '_step_slots', threading.BoundedSemaphore(1))
+        upload_done = threading.Event()
+
+        with pytest.raises(ai_guard.DeadlineExceeded):
+            ai_guard.Deadline(0.05).run(upload_done.wait, 2)
+        with pytest.raises(ai_guard.Rejected, match='Too many'):
+            ai_guard.call(lambda deadline: deadline.run(sum, [1, 2]))
+        assert ai_guard.breaker.snapshot()['calls'] == 0
+
+        upload_done.set()
+        assert ai_guard._step_slots.acquire(timeout=1)
+        ai_guard._step_slots.release()
+        assert ai_guard.Deadline(5).run(sum, [1, 2]) == 3
+
+    def test_a_slow_upload_fails_the_extraction_in_time(self, settings, model, monkeypatch):
+        settings.AI_TIMEOUT_SECONDS = 0.1
+        monkeypatch.setattr(
+            ai_service.genai, 'upload_file', lambda path, mime_type=None: time.sleep(2)
+        )
+        started = time.monotonic()
+
+        result = ai_service.extract_vitals_from_audio(io.BytesIO(b'audio'), 'audio/webm')
+
+        assert time.monotonic() - started < 1
+        assert result['success'] is False
+        assert model.timeouts == []
+
+
+@pytest.mark.django_db
+class TestDegradation:
+    def test_an_open_circuit_skips_gemini(self, model):
+        trip()
+
+        result = ai_service.analyze_health_data({'age': 40})
+
+        assert result['success'] is False
+        assert result['retry_after'] == 30
+        assert model.timeouts == []
+
+    def test_failures_feed_the_breaker(self, model):
+        model.error = ConnectionError('upstream down')
+
+        for _ in range(ai_guard.MIN_CALLS):
+            ai_service.extract_vitals_from_text('Sita from Rampur, bp 120 over 80')
+
+        assert ai_guard.breaker.snapshot()['state'] == ai_guard.OPEN
+
+    def test_shed_endpoints_answer_503_with_retry_after(self, api_client, model):
+        trip()
+
+        response = api_client.post(
+            reverse('text_vitals'), {'text': 'Sita from Rampur, bp 120 over 80'}
+        )
+
+        assert response.status_code == 503
+        assert response['Retry-After'] == '30'
+
+    def test_shed_enrichment_waits_without_spending_an_attempt(
+        self, auth_client, health_worker, patient, model
+    ):
+        auth_client(health_worker).post(
+            reverse('screenings'), screening_payload(patient), format='json'
+        )
+        trip()
+
+        enrichment.run_pending()
+
+        job = AIEnrichmentJob.objects.get()
+        assert (job.status, job.attempts) == ('pending', 0)
+        assert job.screening.ai_status == 'pending'
+
+    def test_health_check_reports_the_breaker(self, client):
+        trip()
+
+        response = client.get('/health')
+
+        assert response.status_code == 200
+        assert response.json()['ai']['state'] == 'open'
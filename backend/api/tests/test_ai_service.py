@@ -74,12 +74,73 @@ class TestConfiguration:
         assert ai_service.is_configured() is False
 
 
+class FakeModel:
+    pings = []
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def count_tokens(self, contents, request_options=None):
+        self.pings.append(self.model_name)
+        if self.model_name == 'unreachable':
+            raise ConnectionError('no route to host')
+
+
+@pytest.fixture
+def model_registry(monkeypatch):
+    """Build fake models against an empty registry, and leave it empty."""
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    monkeypatch.setattr(ai_service.genai, 'configure', lambda **kwargs: None)
+    monkeypatch.setattr(ai_service.genai, 'GenerativeModel', FakeModel)
+    monkeypatch.setattr(ai_service.genai_client, 'get_default_generative_client', object)
+    FakeModel.pings = []
+    ai_service.clear_models()
+    yield
+    ai_service.clear_models()
+
+
+class TestModelRegistry:
+    def test_reuses_the_instance_for_a_model_name(self, model_registry):
+        model = get_model()
+
+        assert get_model() is model
+        assert get_model('gemini-2.5-pro') is not model
+
+    def test_a_forked_process_builds_its_own(self, model_registry, monkeypatch):
+        model = get_model()
+        monkeypatch.setattr(ai_service.os, 'getpid', lambda: -1)
+
+        assert get_model() is not model
+
+    def test_warm_up_builds_and_pings_each_model(self, model_registry):
+        assert ai_service.warm_up(['gemini-2.5-flash', 'gemini-2.5-pro']) is True
+
+        assert FakeModel.pings == ['gemini-2.5-flash', 'gemini-2.5-pro']
+        assert get_model('gemini-2.5-pro').model_name == 'gemini-2.5-pro'
+
+    def test_a_failed_warm_up_does_not_raise(self, model_registry):
+        assert ai_service.warm_up(['unreachable']) is False
+
+    def test_warm_up_is_skipped_without_a_key(self, model_registry, monkeypatch):
+        monkeypatch.delenv('GEMINI_API_KEY')
+
+        assert ai_service.warm_up() is False
+        assert FakeModel.pings == []
+
+    def test_warm_up_only_runs_when_enabled(self, model_registry, settings):
+        settings.AI_WARMUP = False
+        assert ai_service.warm_up_if_enabled() is False
+
+        settings.AI_WARMUP = True
+        assert ai_service.warm_up_if_enabled() is True
+
+
 class TestAnalyzeHealthData:
     def test_returns_the_parsed_analysis(self, monkeypatch):
         monkeypatch.setattr(
             ai_service,
             'try_generate_content',
-            lambda prompt: FakeResponse(
+            lambda prompt, **options: FakeResponse(
                 '{"summary": "Stable", "formatted_insights": "**Overview**"}'
             ),
         )
@@ -93,7 +154,7 @@ class TestAnalyzeHealthData:
         monkeypatch.setattr(
             ai_service,
             'try_generate_content',
-            lambda prompt: FakeResponse('{"summary": "Stable"}'),
+            lambda prompt, **options: FakeResponse('{"summary": "Stable"}'),
         )
 
         result = analyze_health_data({'age': 40})
@@ -104,7 +165,7 @@ class TestAnalyzeHealthData:
         monkeypatch.setattr(
             ai_service,
             'try_generate_content',
-            lambda prompt: FakeResponse('the model refused'),
+            lambda prompt, **options: FakeResponse('the model refused'),
         )
 
         result = analyze_health_data({'age': 40})
@@ -122,7 +183,7 @@ class TestAnalyzeHealthData:
         assert 'GEMINI_API_KEY' in result['error']
 
     def test_reports_failure_when_the_model_raises(self, monkeypatch):
-        def boom(prompt):
+        def boom(prompt, **options):
             raise RuntimeError('upstream exploded')
 
         monkeypatch.setattr(ai_service, 'try_generate_content', boom)
@@ -167,7 +228,7 @@ class TestExtractors:
     def test_text_extraction_degrades_without_an_api_key(self, monkeypatch):
         monkeypatch.delenv('GEMINI_API_KEY', raising=False)
 
-        result = extract_vitals_from_text('BP is 120 over 80')
+        result = extract_vitals_from_text('Sita from Rampur, BP is 120 over 80')
 
         assert result['success'] is False
         assert 'GEMINI_API_KEY' in result['error']
@@ -179,7 +240,7 @@ class TestExtractors:
             lambda prompt: FakeResponse('{"systolic_bp": 120, "diastolic_bp": 80}'),
         )
 
-        result = extract_vitals_from_text('BP is 120 over 80')
+        result = extract_vitals_from_text('Sita from Rampur, BP is 120 over 80')
 
         assert result['success'] is True
         assert result['data']['systolic_bp'] == 120
@@ -1,7 +1,11 @@
 """Tests for the AI endpoints' request validation and upload handling."""
 
+import io
+import os
+
 import pytest
-from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
 from django.urls import reverse
 
 from api.views import ai as ai_views
@@ -9,7 +13,18 @@ from api.views import ai as ai_views
 pytestmark = pytest.mark.django_db
 
 
-def upload(name, content=b'stub-bytes', content_type='application/octet-stream'):
+# Leading bytes that identify each type to AIUploadHandler.
+SIGNATURES = {
+    '.pdf': b'%PDF-1.4\n',
+    '.jpg': b'\xff\xd8\xff\xe0\x00\x10JFIF\x00',
+    '.png': b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR',
+    '.webm': b'\x1aE\xdf\xa3\x9fB\x86\x81\x01B\xf7\x81',
+}
+
+
+def upload(name, content=None, content_type='application/octet-stream'):
+    if content is None:
+        content = SIGNATURES.get(os.path.splitext(name)[1], b'') + b'stub-bytes'
     return SimpleUploadedFile(name, content, content_type=content_type)
 
 
@@ -51,7 +66,6 @@ class TestValidateUpload:
 
 class TestSpooledUpload:
     def test_writes_the_content_then_removes_the_file(self):
-        import os
 
         uploaded = upload('report.pdf', b'hello world')
 
@@ -64,7 +78,6 @@ class TestSpooledUpload:
         assert not os.path.exists(captured)
 
     def test_removes_the_file_even_when_the_body_raises(self):
-        import os
 
         captured = {}
 
@@ -76,6 +89,33 @@ class TestSpooledUpload:
         assert not os.path.exists(captured['path'])
 
 
+class TestUploadSource:
+    def test_a_small_upload_is_passed_from_memory(self):
+        uploaded = upload('report.pdf', b'hello world')
+        uploaded.read()
+
+        with ai_views.upload_source(uploaded, '.pdf') as (source, mime_type):
+            assert source.read() == b'hello world'
+            assert mime_type == 'application/pdf'
+
+    def test_a_large_upload_reuses_djangos_temporary_file(self):
+        uploaded = TemporaryUploadedFile('dictation', 'audio/webm', 11, None)
+        uploaded.write(b'hello world')
+        uploaded.flush()
+
+        with ai_views.upload_source(uploaded, '.webm') as (source, mime_type):
+            assert source == uploaded.temporary_file_path()
+            assert mime_type == 'audio/webm'
+
+    def test_any_other_upload_is_copied_then_removed(self):
+
+        with ai_views.upload_source(File(io.BytesIO(b'hello world')), '.png') as (source, _):
+            with open(source, 'rb') as handle:
+                assert handle.read() == b'hello world'
+
+        assert not os.path.exists(source)
+
+
 class TestLabExtractionEndpoint:
     def test_requires_a_file(self, api_client):
         response = api_client.post(reverse('lab_extract'), {}, format='multipart')
@@ -103,10 +143,20 @@ class TestLabExtractionEndpoint:
         assert response.status_code == 400
         assert 'too large' in response.data['detail']
 
+    def test_rejects_content_that_does_not_match_a_supported_type(self, api_client):
+        response = api_client.post(
+            reverse('lab_extract'),
+            {'image': upload('report.png', b'MZ\x90\x00 not an image')},
+            format='multipart',
+        )
+
+        assert response.status_code == 400
+        assert 'does not match' in response.data['detail']
+
     def test_accepts_the_file_under_the_alternate_key(self, api_client, monkeypatch):
         monkeypatch.setattr(
             'api.ai_service.extract_screening_data_from_file',
-            lambda path: {'success': True, 'data': {'age': 44}},
+            lambda path, mime_type=None, sha256=None: {'success': True, 'data': {'age': 44}},
         )
 
         response = api_client.post(
@@ -119,7 +169,7 @@ class TestLabExtractionEndpoint:
     def test_surfaces_an_extraction_failure_as_detail(self, api_client, monkeypatch):
         monkeypatch.setattr(
             'api.ai_service.extract_screening_data_from_file',
-            lambda path: {'success': False, 'error': 'model refused'},
+            lambda path, mime_type=None, sha256=None: {'success': False, 'error': 'model refused'},
         )
 
         response = api_client.post(
@@ -150,7 +200,7 @@ class TestVoiceVitalsEndpoint:
     def test_returns_extracted_vitals(self, auth_client, health_worker, monkeypatch):
         monkeypatch.setattr(
             'api.ai_service.extract_vitals_from_audio',
-            lambda path: {'success': True, 'data': {'systolic_bp': 130}},
+            lambda path, mime_type=None: {'success': True, 'data': {'systolic_bp': 130}},
         )
 
         response = auth_client(health_worker).post(
@@ -0,0 +1,202 @@
+"""Tests for the compact health-analysis prompt and its output budget."""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api import ai_guard, ai_service
+from api import analysis_prompt as builder
+
+SPARSE = {'age': 52, 'gender': 'Male', 'systolic_bp': 150, 'diastolic_bp': 95}
+
+ANSWER = {
+    'summary': 'Blood pressure is high.',
+    'summary_hi': 'रक्तचाप अधिक है।',
+    'concerns': ['Hypertension', 'Stroke risk', 'Kidney strain'],
+    'concerns_hi': ['उच्च रक्तचाप', 'स्ट्रोक का खतरा', 'गुर्दे पर दबाव'],
+    'recommendations': ['Refer to the PHC', 'Cut down on salt'],
+    'recommendations_hi': ['पीएचसी भेजें', 'नमक कम करें'],
+}
+
+
+class TestBuild:
+    def test_lists_only_the_fields_present(self):
+        prompt = builder.build(SPARSE, 2048)
+
+        assert '- Patient: Age 52 | Gender Male' in prompt
+        assert '- Vitals: BP 150/95' in prompt
+        assert 'None' not in prompt
+        for panel in ('Hematology', 'Metabolic', 'Liver', 'Lifestyle', 'Computed Risk'):
+            assert panel not in prompt
+
+    def test_groups_the_panels_present(self):
+        prompt = builder.build(
+            {**SPARSE, 'hemoglobin': 10.2, 'creatinine': 1.4, 'risk_level': 'High'}, 2048
+        )
+
+        assert '- Hematology: Hb 10.2\n- Metabolic: Cr 1.4\n- Computed Risk: High' in prompt
+
+    def test_marks_a_missing_blood_pressure_reading(self):
+        assert '- Vitals: BP 150/?' in builder.build({'systolic_bp': 150}, 2048)
+
+    def test_says_so_when_nothing_was_measured(self):
+        assert '- Nothing was measured.' in builder.build({}, 2048)
+
+    def test_asks_for_no_markdown(self):
+        prompt = builder.build(SPARSE, 2048)
+
+        assert 'formatted_insights' not in prompt
+        assert not prompt.startswith(' ')
+
+    @pytest.mark.parametrize('budget, limit', [(2048, 5), (700, 3), (400, 1), (100, 1)])
+    def test_sizes_the_lists_to_the_budget(self, budget, limit):
+        assert builder.list_limit(budget) == limit
+        assert f'at most {limit} short strings' in builder.build(SPARSE, budget)
+
+
+class TestEstimateTokens:
+    def test_counts_english_at_about_four_characters_a_token(self):
+        assert builder.estimate_tokens('a' * 400) == 100
+
+    def test_counts_devanagari_as_costlier(self):
+        assert builder.estimate_tokens('क' * 400) == 200
+
+
+class TestInsights:
+    def test_renders_the_markdown_the_ui_shows(self):
+        markdown = builder.insights(ANSWER, 'High')
+
+        assert markdown.startswith('**Medical Diagnostic Overview**\n\nThe screening reveals a')
+        assert '**High**' in markdown
+        assert '**Diagnostic Details:**\n- Hypertension\n- Stroke risk' in markdown
+        assert '**Clinical Guidance:**\n1. Refer to the PHC\n2. Cut down on salt' in markdown
+
+    def test_renders_hindi(self):
+        markdown = builder.insights(ANSWER, 'High', 'hi')
+
+        assert '**उच्च**' in markdown
+        assert '- उच्च रक्तचाप' in markdown
+        assert '2. नमक कम करें' in markdown
+
+    def test_needs_a_summary(self):
+        assert builder.insights({'concerns': ['x']}) is None
+
+
+def truncated(text):
+    """A response Gemini stopped at ``max_output_tokens``."""
+    reason = SimpleNamespace(name='MAX_TOKENS')
+    return SimpleNamespace(text=text, candidates=[SimpleNamespace(finish_reason=reason)])
+
+
+def answered():
+    return SimpleNamespace(text=json.dumps(ANSWER), candidates=[])
+
+
+class FakeModel:
+    """Answers with ``responses`` in turn, recording each prompt and its timeout."""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        self.delay = 0
+
+    def generate_content(self, prompt, request_options=None, **options):
+        self.requests.append((prompt, request_options['timeout']))
+        time.sleep(self.delay)
+        return self.responses.pop(0)
+
+    async def generate_content_async(self, prompt, request_options=None, **options):
+        return self.generate_content(prompt, request_options, **options)
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    fake = FakeModel()
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: fake)
+    return fake
+
+
+class TestAnalyzeHealthData:
+    @pytest.fixture
+    def requests(self, monkeypatch):
+        calls = []
+
+        def generate(prompt, **options):
+            calls.append((prompt, options))
+            return type('Response', (), {'text': json.dumps(ANSWER)})()
+
+        monkeypatch.setattr(ai_service, 'try_generate_content', generate)
+        return calls
+
+    def test_enforces_the_output_budget(self, requests, settings):
+        settings.AI_ANALYSIS_MAX_OUTPUT_TOKENS = 550
+
+        result = ai_service.analyze_health_data(SPARSE)
+
+        ((prompt, options),) = requests
+        assert options['generation_config']['max_output_tokens'] == 550
+        assert 'at most 2 short strings' in prompt
+        assert result['analysis']['concerns'] == ['Hypertension', 'Stroke risk']
+        assert len(result['analysis']['concerns_hi']) == 2
+
+    def test_builds_both_markdown_documents(self, requests):
+        result = ai_service.analyze_health_data({**SPARSE, 'risk_level': 'High'})
+
+        analysis = result['analysis']
+        assert analysis['formatted_insights'].startswith('**Medical Diagnostic Overview**')
+        assert '**High**' in analysis['formatted_insights']
+        assert analysis['formatted_insights_hi'].startswith('**चिकित्सा निदान अवलोकन**')
+
+    def test_retries_an_answer_cut_off_at_the_cap_with_shorter_lists(self, gemini):
+        gemini.responses = [truncated(json.dumps(ANSWER)[:120]), answered()]
+
+        result = ai_service.analyze_health_data(SPARSE)
+
+        assert result['success'] is True
+        (first, _), (second, _) = gemini.requests
+        assert 'at most 5 short strings' in first
+        assert 'at most 2 short strings' in second
+        assert result['analysis']['formatted_insights_hi']
+
+    def test_the_retry_shares_the_first_request_deadline(self, gemini, settings):
+        settings.AI_TIMEOUT_SECONDS = 12
+        gemini.responses = [truncated('{"summ'), answered()]
+
+        ai_service.analyze_health_data(SPARSE)
+
+        (_, first), (_, second) = gemini.requests
+        assert second < first <= 12
+        assert ai_guard.breaker.snapshot()['calls'] == 1
+
+    def test_skips_the_retry_once_the_deadline_has_passed(self, gemini, settings):
+        settings.AI_TIMEOUT_SECONDS = 0.05
+        gemini.delay = 0.1
+        gemini.responses = [truncated('{"summ'), answered()]
+
+        result = ai_service.analyze_health_data(SPARSE)
+
+        assert result['success'] is False
+        assert len(gemini.requests) == 1
+
+    def test_fails_cleanly_when_the_retry_is_cut_off_too(self, gemini):
+        gemini.responses = [truncated('{"summ'), truncated('{"summ')]
+
+        result = ai_service.analyze_health_data(SPARSE)
+
+        assert result == {
+            'success': False,
+            'error': 'Failed to parse AI response',
+            'analysis': None,
+        }
+
+    def test_async_retries_too(self, gemini):
+        gemini.responses = [truncated('{"summary": "Blood'), answered()]
+
+        result = async_to_sync(ai_service.analyze_health_data_async)(SPARSE)
+
+        assert result['success'] is True
+        assert gemini.responses == []
@@ -3,11 +3,23 @@
 from datetime import timedelta
 
 import pytest
+from django.db.models import Count, Q
 from django.urls import reverse
 from django.utils import timezone
 
-from api.models import Appointment, Recommendation, Screening
-from api.views.analytics import month_bounds, month_starts
+from api.models import Appointment, Patient, Recommendation, Screening
+from api.views.analytics import (
+    FIVE_YEAR_AGE_BANDS,
+    age_distribution,
+    bucket_bounds,
+    bucket_starts,
+    month_bounds,
+    month_starts,
+    parse_age_bands,
+    time_series,
+)
+
+from .conftest import make_screening
 
 pytestmark = pytest.mark.django_db
 
@@ -42,6 +54,113 @@ class TestMonthHelpers:
         assert end == date(2028, 2, 29)
 
 
+class TestAgeDistribution:
+    @pytest.fixture
+    def ages(self, health_worker):
+        for age in (4, 18, 19, 50, 65, 66, 90):
+            Patient.objects.create(
+                full_name=f'Age {age}',
+                age=age,
+                gender='Other',
+                village='X',
+                health_worker=health_worker,
+            )
+
+    def test_band_edges_are_inclusive(self, ages):
+        assert age_distribution(Patient.objects.all()) == {
+            '0-18': 2,
+            '19-35': 1,
+            '36-50': 1,
+            '51-65': 1,
+            '65+': 2,
+        }
+
+    def test_counts_every_band_in_one_query(self, ages, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            distribution = age_distribution(Patient.objects.all(), FIVE_YEAR_AGE_BANDS)
+
+        assert len(distribution) == len(FIVE_YEAR_AGE_BANDS)
+        assert distribution['85+'] == 1
+
+    def test_parses_a_custom_band_list(self):
+        assert parse_age_bands('0-17, 18-59,60+') == (
+            ('0-17', 0, 17),
+            ('18-59', 18, 59),
+            ('60+', 60, None),
+        )
+
+    @pytest.mark.parametrize('value', ['adults', '30-20', '5-', '-5', ','])
+    def test_rejects_malformed_band_lists(self, value):
+        with pytest.raises(ValueError):
+            parse_age_bands(value)
+
+
+class TestTimeSeries:
+    def screen_at(self, patient, when, risk_level='Low'):
+        screening = Screening.objects.create(patient=patient, risk_level=risk_level)
+        # created_at is auto_now_add, so backdate it after the insert.
+        Screening.objects.filter(id=screening.id).update(created_at=when)
+
+    def test_week_buckets_start_on_monday(self):
+        from datetime import date
+
+        starts = bucket_starts('week', 3, end=date(2026, 3, 5))
+
+        assert starts == [date(2026, 2, 16), date(2026, 2, 23), date(2026, 3, 2)]
+
+    def test_quarter_buckets_cover_three_calendar_months(self):
+        from datetime import date
+
+        starts = bucket_starts('quarter', 4, end=date(2026, 2, 10))
+
+        assert starts == [date(2025, 4, 1), date(2025, 7, 1), date(2025, 10, 1), date(2026, 1, 1)]
+        assert bucket_bounds(date(2025, 10, 1), 'quarter') == (
+            date(2025, 10, 1),
+            date(2025, 12, 31),
+        )
+
+    def test_rejects_an_unknown_granularity(self):
+        with pytest.raises(ValueError):
+            bucket_starts('fortnight', 2)
+
+    @pytest.mark.parametrize('granularity', ['day', 'week', 'month', 'quarter'])
+    def test_counts_each_series_in_one_query(self, granularity, patient, django_assert_num_queries):
+        self.screen_at(patient, timezone.now(), risk_level='High')
+        self.screen_at(patient, timezone.now())
+
+        with django_assert_num_queries(2):
+            buckets = time_series(
+                granularity,
+                4,
+                [
+                    (
+                        Screening.objects.all(),
+                        {
+                            'screenings': Count('id'),
+                            'highRisk': Count('id', filter=Q(risk_level='High')),
+                        },
+                    ),
+                    (Patient.objects.all(), {'patients': Count('id')}),
+                ],
+            )
+
+        assert len(buckets) == 4
+        assert buckets[-1]['screenings'] == 2
+        assert buckets[-1]['highRisk'] == 1
+        assert buckets[-1]['patients'] == 1
+        assert all(bucket['screenings'] == 0 for bucket in buckets[:-1])
+
+    def test_places_rows_in_the_right_day_and_skips_those_outside_the_window(self, patient):
+        today = timezone.localdate()
+        self.screen_at(patient, timezone.now() - timedelta(days=2))
+        self.screen_at(patient, timezone.now() - timedelta(days=30))
+
+        buckets = time_series('day', 7, [(Screening.objects.all(), {'n': Count('id')})])
+
+        assert [bucket['n'] for bucket in buckets] == [0, 0, 0, 0, 1, 0, 0]
+        assert buckets[-1]['start'] == today
+
+
 class TestDashboardStats:
     def test_scopes_counts_to_the_workers_own_caseload(
         self, auth_client, health_worker, patient, other_patient
@@ -70,14 +189,14 @@ class TestDashboardStats:
     def test_risk_distribution_always_reports_all_three_bands(
         self, auth_client, health_worker, patient
     ):
-        Screening.objects.create(patient=patient, risk_level='Low', risk_score=0)
+        make_screening(patient, risk_level='Low', risk_score=0)
 
         response = auth_client(health_worker).get(reverse('dashboard_stats'))
 
         assert response.data['risk_distribution'] == {'Low': 1, 'Medium': 0, 'High': 0}
 
     def test_weekly_trend_covers_seven_days(self, auth_client, health_worker, patient):
-        Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+        make_screening(patient, risk_level='High', risk_score=70)
 
         response = auth_client(health_worker).get(reverse('dashboard_stats'))
 
@@ -127,6 +246,39 @@ class TestAnalytics:
         assert response.data['age_distribution']['51-65'] == 1
         assert response.data['age_distribution']['0-18'] == 0
 
+    def test_accepts_a_preset_band_set(self, auth_client, health_officer, patient):
+        response = auth_client(health_officer).get(reverse('analytics'), {'age_bands': 'five_year'})
+
+        assert response.status_code == 200
+        assert response.data['age_distribution']['50-54'] == 1
+
+    def test_returns_an_opt_in_trend_at_the_requested_granularity(
+        self, auth_client, health_officer, patient
+    ):
+        make_screening(patient, risk_level='High', risk_score=70)
+
+        response = auth_client(health_officer).get(
+            reverse('analytics'), {'granularity': 'week', 'periods': 4}
+        )
+
+        assert response.status_code == 200
+        assert len(response.data['trend']) == 4
+        assert response.data['trend'][-1]['screenings'] == 1
+        assert response.data['trend'][-1]['patients'] == 1
+
+    @pytest.mark.parametrize(
+        'params', [{'granularity': 'hour'}, {'granularity': 'day', 'periods': 'lots'}]
+    )
+    def test_rejects_an_invalid_trend_window(self, auth_client, health_officer, params):
+        response = auth_client(health_officer).get(reverse('analytics'), params)
+
+        assert response.status_code == 400
+
+    def test_rejects_an_invalid_band_set(self, auth_client, health_officer):
+        response = auth_client(health_officer).get(reverse('analytics'), {'age_bands': 'old'})
+
+        assert response.status_code == 400
+
     def test_monthly_trend_covers_six_months(self, auth_client, health_officer):
         response = auth_client(health_officer).get(reverse('analytics'))
 
@@ -199,7 +351,7 @@ class TestAppointments:
 
         response = auth_client(health_worker).get(reverse('appointments'))
 
-        assert [a['reason'] for a in response.data] == ['Mine']
+        assert [a['reason'] for a in response.data['results']] == ['Mine']
 
     def test_upcoming_filter_excludes_past_appointments(self, auth_client, health_worker, patient):
         now = timezone.now()
@@ -218,7 +370,35 @@ class TestAppointments:
 
         response = auth_client(health_worker).get(reverse('appointments'), {'upcoming': 'true'})
 
-        assert [a['reason'] for a in response.data] == ['Future']
+        assert [a['reason'] for a in response.data['results']] == ['Future']
+
+    def test_pages_by_scheduled_date_without_per_row_queries(
+        self, auth_client, health_officer, health_worker, patient, django_assert_max_num_queries
+    ):
+        now = timezone.now()
+        for day in range(5):
+            Appointment.objects.create(
+                patient=patient,
+                health_worker=health_worker,
+                scheduled_date=now + timedelta(days=day),
+                reason=f'Day {day}',
+            )
+
+        client = auth_client(health_officer)
+        with django_assert_max_num_queries(1):
+            first = client.get(reverse('appointments'), {'page_size': 3}).data
+        second = client.get(
+            reverse('appointments'), {'page_size': 3, 'cursor': first['next_cursor']}
+        ).data
+
+        assert [a['reason'] for a in first['results'] + second['results']] == [
+            'Day 4',
+            'Day 3',
+            'Day 2',
+            'Day 1',
+            'Day 0',
+        ]
+        assert first['results'][0]['health_worker_name'] == health_worker.full_name
 
 
 class TestRecommendations:
@@ -234,7 +414,7 @@ class TestRecommendations:
 
         response = auth_client(health_worker).get(reverse('recommendations'))
 
-        assert [r['title'] for r in response.data] == ['Mine']
+        assert [r['title'] for r in response.data['results']] == ['Mine']
 
     def test_incomplete_filter_hides_completed_recommendations(
         self, auth_client, health_worker, patient
@@ -254,7 +434,7 @@ class TestRecommendations:
             reverse('recommendations'), {'incomplete': 'true'}
         )
 
-        assert [r['title'] for r in response.data] == ['Open']
+        assert [r['title'] for r in response.data['results']] == ['Open']
 
     def test_can_be_marked_completed(self, auth_client, health_worker, patient):
         recommendation = Recommendation.objects.create(
@@ -0,0 +1,218 @@
+"""Tests for the scope-aware dashboard response cache and its invalidation."""
+
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from api import dashboard_cache
+from api.models import Appointment, Patient
+
+from .conftest import make_screening
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def dashboard_cache_on(settings):
+    # Off by default without REDIS_URL; the test process has a single cache.
+    settings.DASHBOARD_CACHE_TIMEOUT = 300
+
+
+@pytest.fixture
+def committed(django_capture_on_commit_callbacks):
+    """Run the wrapped writes' on-commit hooks, as a real commit would."""
+    return lambda: django_capture_on_commit_callbacks(execute=True)
+
+
+def screening_total(client, url='dashboard_stats'):
+    return client.get(reverse(url)).data['total_screenings']
+
+
+class TestGetOrCompute:
+    def test_a_hit_skips_the_computation(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {'value': len(calls)}
+
+        first = dashboard_cache.get_or_compute('global', 'probe', {}, compute)
+        second = dashboard_cache.get_or_compute('global', 'probe', {}, compute)
+
+        assert first == second == {'value': 1}
+        assert len(calls) == 1
+
+    def test_query_parameters_are_part_of_the_key(self):
+        dashboard_cache.get_or_compute('global', 'probe', {'a': '1'}, lambda: 'one')
+
+        assert dashboard_cache.get_or_compute('global', 'probe', {'a': '2'}, lambda: 'two') == 'two'
+
+    def test_invalidating_a_scope_forces_a_recomputation(self):
+        dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'stale')
+        dashboard_cache.invalidate('global')
+
+        assert dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'fresh') == 'fresh'
+
+    def test_a_lost_version_counter_never_resurrects_old_entries(self):
+        dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'stale')
+        cache.delete('dashboard:version:global')
+
+        assert dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'fresh') == 'fresh'
+
+    def test_a_zero_timeout_disables_caching(self, settings):
+        settings.DASHBOARD_CACHE_TIMEOUT = 0
+        dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'first')
+
+        assert dashboard_cache.get_or_compute('global', 'probe', {}, lambda: 'second') == 'second'
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        start = threading.Barrier(8)
+        results = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'payload'
+
+        def request():
+            start.wait()
+            results.append(dashboard_cache.get_or_compute('global', 'probe', {}, compute))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['payload'] * 8
+        assert len(calls) == 1
+
+
+class TestDashboardInvalidation:
+    def test_repeat_request_is_served_without_queries(
+        self, auth_client, health_worker, patient, django_assert_num_queries
+    ):
+        client = auth_client(health_worker)
+        client.get(reverse('dashboard_stats'))
+
+        with django_assert_num_queries(0):
+            response = client.get(reverse('dashboard_stats'))
+
+        assert response.status_code == 200
+
+    def test_a_new_screening_refreshes_the_workers_dashboard(
+        self, auth_client, health_worker, patient, committed
+    ):
+        client = auth_client(health_worker)
+        assert screening_total(client) == 0
+
+        with committed():
+            make_screening(patient, risk_level='High', risk_score=70)
+
+        assert screening_total(client) == 1
+
+    def test_a_write_leaves_other_workers_caches_alone(
+        self,
+        auth_client,
+        health_worker,
+        other_worker,
+        other_patient,
+        django_assert_num_queries,
+        committed,
+    ):
+        client = auth_client(health_worker)
+        client.get(reverse('dashboard_stats'))
+
+        with committed():
+            make_screening(other_patient, risk_level='Low', risk_score=5)
+
+        with django_assert_num_queries(0):
+            client.get(reverse('dashboard_stats'))
+
+    def test_a_workers_write_refreshes_the_officer_dashboard(
+        self, auth_client, health_officer, patient, committed
+    ):
+        client = auth_client(health_officer)
+        before = client.get(reverse('officer_dashboard')).data['overview']['total_screenings']
+
+        with committed():
+            make_screening(patient, risk_level='Low', risk_score=5)
+
+        after = client.get(reverse('officer_dashboard')).data['overview']['total_screenings']
+        assert after == before + 1
+
+    def test_reassigning_a_patient_refreshes_the_previous_workers_dashboard(
+        self, auth_client, health_worker, other_worker, patient, committed
+    ):
+        client = auth_client(health_worker)
+        assert client.get(reverse('dashboard_stats')).data['total_patients'] == 1
+
+        patient.health_worker = other_worker
+        with committed():
+            patient.save()
+
+        assert client.get(reverse('dashboard_stats')).data['total_patients'] == 0
+
+    def test_deleting_a_patient_refreshes_the_dashboard(
+        self, auth_client, health_worker, patient, committed
+    ):
+        client = auth_client(health_worker)
+        with committed():
+            make_screening(patient, risk_level='Low', risk_score=5)
+        assert screening_total(client) == 1
+
+        with committed():
+            Patient.objects.filter(pk=patient.pk).delete()
+
+        assert screening_total(client) == 0
+
+    def test_a_new_appointment_refreshes_pending_appointments(
+        self, auth_client, health_worker, patient, committed
+    ):
+        client = auth_client(health_worker)
+        assert client.get(reverse('dashboard_stats')).data['pending_appointments'] == 0
+
+        with committed():
+            Appointment.objects.create(
+                patient=patient,
+                health_worker=health_worker,
+                scheduled_date='2999-01-01T10:00:00Z',
+            )
+
+        assert client.get(reverse('dashboard_stats')).data['pending_appointments'] == 1
+
+    def test_deactivating_a_worker_refreshes_the_officer_dashboard(
+        self, auth_client, health_officer, health_worker, committed
+    ):
+        client = auth_client(health_officer)
+        assert client.get(reverse('officer_dashboard')).data['overview']['active_workers'] == 1
+
+        health_worker.is_active = False
+        with committed():
+            health_worker.save()
+
+        assert client.get(reverse('officer_dashboard')).data['overview']['active_workers'] == 0
+
+    def test_invalidation_waits_for_the_commit(
+        self, auth_client, health_worker, patient, django_capture_on_commit_callbacks
+    ):
+        client = auth_client(health_worker)
+        assert screening_total(client) == 0
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            make_screening(patient, risk_level='High', risk_score=70)
+            # Until the commit, requests are still served the cached dashboard.
+            assert screening_total(client) == 0
+
+        for callback in callbacks:
+            callback()
+        assert screening_total(client) == 1
+
+    def test_invalid_parameters_are_rejected_before_the_cache(self, auth_client, health_worker):
+        response = auth_client(health_worker).get(reverse('analytics'), {'age_bands': 'bogus'})
+
+        assert response.status_code == 400
@@ -0,0 +1,122 @@
+"""Tests for reading dictated vitals without Gemini."""
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api import ai_service, dictation
+
+
+class TestNormalize:
+    @pytest.mark.parametrize(
+        'text, expected',
+        [
+            ('pulse seventy two', 'pulse 72'),
+            ('one thirty over eighty five', '130 over 85'),
+            ('one hundred and ten', '110'),
+            ('ninety eight point six', '98.6'),
+            ('seventy-two', '72'),
+            ('बीपी १३० बटा ८५', 'बीपी 130 बटा 85'),
+        ],
+    )
+    def test_writes_numbers_as_digits(self, text, expected):
+        assert dictation.normalize(text) == expected
+
+
+class TestParse:
+    @pytest.mark.parametrize(
+        'text, expected',
+        [
+            (
+                'BP 130 over 85, pulse 72, weight 64',
+                {'systolic_bp': 130, 'diastolic_bp': 85, 'heart_rate': 72, 'weight_kg': 64},
+            ),
+            (
+                'blood pressure one twenty by eighty, heart rate eighty eight bpm',
+                {'systolic_bp': 120, 'diastolic_bp': 80, 'heart_rate': 88},
+            ),
+            (
+                'बीपी 140 बटा 90, नाड़ी 76, वजन 58 किलो',
+                {'systolic_bp': 140, 'diastolic_bp': 90, 'heart_rate': 76, 'weight_kg': 58},
+            ),
+            (
+                'umar 52 saal, vajan 70 kilo, bp 150 bata 95',
+                {'age': 52, 'weight_kg': 70, 'systolic_bp': 150, 'diastolic_bp': 95},
+            ),
+            ('45 years old male', {'age': 45, 'gender': 'Male'}),
+            ('sugar one hundred and ten, hb 11.5', {'glucose_level': 110, 'hemoglobin': 11.5}),
+        ],
+    )
+    def test_reads_plain_dictation(self, text, expected):
+        assert dictation.parse(text) == expected
+
+    def test_reads_a_value_before_its_keyword(self):
+        assert dictation.parse('64 kilo vajan hai') == {'weight_kg': 64}
+
+    @pytest.mark.parametrize(
+        'text, field, expected',
+        [
+            ('height 5 feet 6 inches', 'height_cm', 167.64),
+            ('height 1.65 meters', 'height_cm', 165),
+            ('weight 150 pounds', 'weight_kg', 68.04),
+        ],
+    )
+    def test_converts_units(self, text, field, expected):
+        assert dictation.parse(text)[field] == pytest.approx(expected)
+
+    @pytest.mark.parametrize(
+        'text',
+        [
+            'Ramesh from Rampur, BP 130 over 85',
+            'smokes daily, bp 120 over 80',
+            'temperature ninety eight point six',
+            'pulse 720',
+            'weight not measured',
+            'bp 130 over 85 and 140 over 90',
+            'pulse 72 over 80',
+            'weight 160 cm',
+            '',
+        ],
+    )
+    def test_leaves_what_it_cannot_account_for_to_gemini(self, text):
+        assert dictation.parse(text) is None
+
+
+class TestExtraction:
+    def test_reads_plain_dictation_without_gemini(self, monkeypatch):
+        def fail(prompt):
+            raise AssertionError('Gemini was called')
+
+        monkeypatch.setattr(ai_service, 'try_generate_content', fail)
+
+        result = ai_service.extract_vitals_from_text('BP 130 over 85, pulse 72')
+
+        assert result['success']
+        assert result['source'] == 'local'
+        assert result['data']['systolic_bp'] == 130
+        assert result['data']['full_name'] is None
+
+    def test_sends_the_rest_to_gemini(self, monkeypatch):
+        prompts = []
+        monkeypatch.setattr(
+            ai_service,
+            'try_generate_content',
+            lambda prompt: prompts.append(prompt) or type('R', (), {'text': '{"age": 40}'})(),
+        )
+
+        result = ai_service.extract_vitals_from_text('Ramesh from Rampur, BP 130 over 85')
+
+        assert result == {'success': True, 'data': {'age': 40}}
+        assert len(prompts) == 1
+
+    def test_can_be_turned_off(self, settings):
+        settings.AI_DICTATION_PARSER = False
+
+        result = ai_service.extract_vitals_from_text('BP 130 over 85')
+
+        assert result['success'] is False
+        assert 'GEMINI_API_KEY' in result['error']
+
+    def test_async(self):
+        result = async_to_sync(ai_service.extract_vitals_from_text_async)('pulse seventy two')
+
+        assert result['data']['heart_rate'] == 72
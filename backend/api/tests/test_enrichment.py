@@ -0,0 +1,246 @@
+"""Tests for the queued AI enrichment of screenings."""
+
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from api import ai_service, enrichment
+from api.models import AIEnrichmentJob, Screening
+
+from .test_screenings import screening_payload
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    """
+    Configure a fake key and script ``analyze_health_data``'s results in order.
+
+    A callable result is called while "Gemini is working" and returns the result.
+    """
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    results = []
+
+    def analyze(data):
+        result = results.pop(0)
+        if callable(result):
+            result = result()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    monkeypatch.setattr(ai_service, 'analyze_health_data', analyze)
+    return results
+
+
+def insight(text):
+    return {'success': True, 'analysis': {'formatted_insights': text}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Let a test move ``timezone.now`` forward, as a long Gemini call would."""
+    real_now = timezone.now
+    elapsed = [timedelta(0)]
+    monkeypatch.setattr(timezone, 'now', lambda: real_now() + elapsed[0])
+
+    def advance(seconds):
+        elapsed[0] += timedelta(seconds=seconds)
+
+    return advance
+
+
+@pytest.fixture
+def queued(auth_client, health_worker, patient):
+    response = auth_client(health_worker).post(
+        reverse('screenings'), screening_payload(patient), format='json'
+    )
+    return Screening.objects.get(pk=response.data['id'])
+
+
+class TestWritePath:
+    def test_create_returns_pending_without_calling_gemini(
+        self, auth_client, health_worker, patient, gemini
+    ):
+        response = auth_client(health_worker).post(
+            reverse('screenings'), screening_payload(patient), format='json'
+        )
+
+        assert response.status_code == 201
+        assert response.data['ai_status'] == 'pending'
+        assert response.data['ai_insights'] is None
+        assert AIEnrichmentJob.objects.get(screening_id=response.data['id']).status == 'pending'
+
+    def test_eager_mode_enriches_once_the_transaction_commits(
+        self,
+        settings,
+        auth_client,
+        health_worker,
+        patient,
+        gemini,
+        django_capture_on_commit_callbacks,
+    ):
+        settings.AI_ENRICHMENT_EAGER = True
+        gemini.append(insight('**Overview**'))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = auth_client(health_worker).post(
+                reverse('screenings'), screening_payload(patient), format='json'
+            )
+
+        screening = Screening.objects.get(pk=response.data['id'])
+        assert screening.ai_status == 'complete'
+        assert screening.ai_insights == '**Overview**'
+
+
+class TestWorker:
+    def test_stores_the_insight(self, queued, gemini):
+        gemini.append(insight('**Overview**'))
+
+        assert enrichment.run_pending() == 1
+
+        queued.refresh_from_db()
+        assert (queued.ai_status, queued.ai_insights) == ('complete', '**Overview**')
+        assert queued.ai_job.status == 'done'
+
+    def test_marks_the_screening_unavailable_without_an_api_key(self, queued):
+        enrichment.run_pending()
+
+        queued.refresh_from_db()
+        assert queued.ai_status == 'unavailable'
+        assert queued.ai_job.attempts == 1
+
+    def test_failures_are_retried_with_backoff(self, queued, gemini):
+        gemini.append({'success': False, 'error': 'quota exceeded'})
+
+        enrichment.run_pending()
+
+        job = AIEnrichmentJob.objects.get(screening=queued)
+        assert (job.status, job.attempts, job.last_error) == ('pending', 1, 'quota exceeded')
+        assert job.run_after > timezone.now() + timedelta(seconds=25)
+        assert enrichment.run_pending() == 0
+
+        gemini.append(insight('**Overview**'))
+        AIEnrichmentJob.objects.update(run_after=timezone.now())
+        enrichment.run_pending()
+
+        queued.refresh_from_db()
+        assert queued.ai_status == 'complete'
+
+    def test_gives_up_after_the_last_attempt(self, queued, gemini):
+        AIEnrichmentJob.objects.update(attempts=enrichment.MAX_ATTEMPTS - 1)
+        gemini.append(RuntimeError('upstream exploded'))
+
+        enrichment.run_pending()
+
+        queued.refresh_from_db()
+        assert queued.ai_status == 'failed'
+        assert queued.ai_job.status == 'failed'
+        assert queued.ai_job.last_error == 'upstream exploded'
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        assert enrichment.retry_delay(1) == timedelta(seconds=30)
+        assert enrichment.retry_delay(3) == timedelta(seconds=120)
+        assert enrichment.retry_delay(20) == timedelta(seconds=enrichment.RETRY_CAP_SECONDS)
+
+    def test_a_claimed_job_is_not_claimed_again(self, queued):
+        assert len(enrichment.claim(10)) == 1
+        assert enrichment.claim(10) == []
+
+    def test_an_abandoned_job_is_reclaimed_after_its_lease(self, queued):
+        enrichment.claim(10)
+        AIEnrichmentJob.objects.update(
+            locked_at=timezone.now() - timedelta(seconds=enrichment.LEASE_SECONDS + 1)
+        )
+
+        assert enrichment.run_pending() == 1
+        assert AIEnrichmentJob.objects.get().attempts == 2
+
+    def test_each_job_of_a_batch_gets_a_full_lease(
+        self, auth_client, health_worker, patient, queued, gemini, clock
+    ):
+        auth_client(health_worker).post(
+            reverse('screenings'), screening_payload(patient), format='json'
+        )
+        second_worker = []
+
+        def slow(text, then=None):
+            def answer():
+                clock(enrichment.LEASE_SECONDS * 2 / 3)
+                if then:
+                    second_worker.append(then())
+                return insight(text)
+
+            return answer
+
+        gemini.extend([slow('first'), slow('second', then=enrichment.run_pending)])
+
+        assert enrichment.run_pending() == 2
+
+        assert second_worker == [0]
+        assert set(Screening.objects.values_list('ai_insights', flat=True)) == {'first', 'second'}
+        assert list(AIEnrichmentJob.objects.values_list('attempts', flat=True)) == [1, 1]
+
+    def test_a_worker_whose_lease_lapsed_writes_nothing(self, queued, gemini, clock):
+        def outlived_lease():
+            clock(enrichment.LEASE_SECONDS + 1)
+            gemini.append(insight('second worker'))
+            assert enrichment.run_pending() == 1
+            return insight('first worker')
+
+        gemini.append(outlived_lease)
+
+        enrichment.run_pending()
+
+        queued.refresh_from_db()
+        assert queued.ai_insights == 'second worker'
+        job = AIEnrichmentJob.objects.get()
+        assert (job.status, job.attempts, job.locked_at) == ('done', 2, None)
+
+    def test_a_lapsed_retry_is_not_rescheduled_by_its_old_worker(self, queued, gemini, clock):
+        def outlived_lease():
+            clock(enrichment.LEASE_SECONDS + 1)
+            gemini.append(insight('second worker'))
+            enrichment.run_pending()
+            return {'success': False, 'error': 'quota exceeded'}
+
+        gemini.append(outlived_lease)
+
+        enrichment.run_pending()
+
+        job = AIEnrichmentJob.objects.get()
+        assert (job.status, job.last_error) == ('done', '')
+
+    def test_command_drains_the_queue_once(self, queued, gemini):
+        gemini.append(insight('**Overview**'))
+
+        call_command('run_ai_worker', '--once')
+
+        queued.refresh_from_db()
+        assert queued.ai_status == 'complete'
+
+
+class TestScreeningDetail:
+    def test_returns_the_enrichment_status(self, auth_client, health_worker, queued):
+        response = auth_client(health_worker).get(reverse('screening_detail', args=[queued.id]))
+
+        assert response.status_code == 200
+        assert response.data['ai_status'] == 'pending'
+
+    def test_is_scoped_to_the_workers_caseload(self, auth_client, other_worker, queued):
+        response = auth_client(other_worker).get(reverse('screening_detail', args=[queued.id]))
+
+        assert response.status_code == 404
+
+    def test_patients_only_see_their_own(self, auth_client, patient_user, patient, queued):
+        url = reverse('screening_detail', args=[queued.id])
+        assert auth_client(patient_user).get(url).status_code == 404
+
+        patient.user = patient_user
+        patient.save()
+
+        assert auth_client(patient_user).get(url).status_code == 200
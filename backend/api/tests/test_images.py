@@ -0,0 +1,144 @@
+"""Tests for shrinking lab-report photos before upload."""
+
+import io
+import os
+
+import pytest
+from asgiref.sync import async_to_sync
+from PIL import Image
+
+from api import ai_service, images
+
+
+def photo(size=(1200, 900), orientation=None, format='JPEG'):
+    """A noisy colour photo, which compresses badly, as encoded bytes."""
+    image = Image.frombytes('RGB', size, os.urandom(size[0] * size[1] * 3))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    output = io.BytesIO()
+    image.save(output, format=format, quality=95, exif=exif)
+    return output.getvalue()
+
+
+@pytest.fixture
+def inline(settings):
+    settings.AI_IMAGE_MAX_SIDE = 400
+    settings.AI_IMAGE_QUALITY = 70
+    settings.AI_IMAGE_WORKERS = 0
+
+
+class TestDownscale:
+    def test_shrinks_to_a_grayscale_jpeg_within_the_size(self):
+        original = photo()
+
+        prepared = images.downscale(original, 400, 70)
+
+        assert len(prepared) < len(original)
+        with Image.open(io.BytesIO(prepared)) as image:
+            assert image.format == 'JPEG'
+            assert image.mode == 'L'
+            assert image.size == (400, 300)
+
+    def test_turns_the_image_upright(self):
+        # Orientation 6: the camera was turned a quarter, so width and height swap.
+        prepared = images.downscale(photo(orientation=6), 400, 70)
+
+        with Image.open(io.BytesIO(prepared)) as image:
+            assert image.size == (300, 400)
+
+    def test_reads_a_path(self, tmp_path):
+        path = tmp_path / 'report.png'
+        path.write_bytes(photo(format='PNG'))
+
+        assert images.downscale(str(path), 400, 70)
+
+    def test_keeps_an_image_that_would_not_shrink(self):
+        small = Image.new('L', (50, 50), color=255)
+        output = io.BytesIO()
+        small.save(output, format='PNG')
+
+        assert images.downscale(output.getvalue(), 400, 70) is None
+
+    def test_gives_up_on_what_it_cannot_decode(self):
+        assert images.downscale(b'\x00\x00\x00\x18ftypheic' + b'\x00' * 64, 400, 70) is None
+
+
+class TestPrepare:
+    def test_replaces_a_photo_with_its_smaller_version(self, inline):
+        original = io.BytesIO(photo())
+
+        source, mime_type = images.prepare(original, 'image/jpeg')
+
+        assert mime_type == 'image/jpeg'
+        assert len(source.getvalue()) < len(original.getvalue())
+        assert original.tell() == 0
+
+    def test_guesses_the_type_of_a_path(self, inline, tmp_path):
+        path = tmp_path / 'report.webp'
+        path.write_bytes(photo(format='WEBP'))
+
+        source, mime_type = images.prepare(str(path))
+
+        assert isinstance(source, io.BytesIO)
+        assert mime_type == 'image/jpeg'
+
+    def test_passes_a_pdf_through(self, inline):
+        document = io.BytesIO(b'%PDF-1.4\n')
+
+        assert images.prepare(document, 'application/pdf') == (document, 'application/pdf')
+
+    def test_can_be_turned_off(self, inline, settings):
+        settings.AI_IMAGE_MAX_SIDE = 0
+        original = io.BytesIO(photo())
+
+        assert images.prepare(original, 'image/jpeg') == (original, 'image/jpeg')
+
+    def test_runs_in_the_worker_pool(self, inline, settings):
+        settings.AI_IMAGE_WORKERS = 1
+        try:
+            source, _ = images.prepare(io.BytesIO(photo()), 'image/jpeg')
+            pool = images.get_pool()
+        finally:
+            images.shutdown_pool()
+
+        assert pool is not None
+        with Image.open(source) as image:
+            assert image.size == (400, 300)
+
+    def test_falls_back_to_the_original_when_the_work_fails(self, inline, monkeypatch):
+        def fail(*args):
+            raise MemoryError('out of memory')
+
+        monkeypatch.setattr(images, 'downscale', fail)
+        original = io.BytesIO(photo())
+
+        assert images.prepare(original, 'image/jpeg') == (original, 'image/jpeg')
+
+    def test_async(self, inline):
+        source, mime_type = async_to_sync(images.prepare_async)(io.BytesIO(photo()), 'image/png')
+
+        assert mime_type == 'image/jpeg'
+        assert isinstance(source, io.BytesIO)
+
+
+def test_extraction_uploads_the_shrunk_photo(inline, monkeypatch):
+    class Model:
+        def generate_content(self, contents, request_options=None):
+            return type('Response', (), {'text': '{"hemoglobin": 12.1}'})()
+
+    uploads = []
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: Model())
+    monkeypatch.setattr(
+        ai_service.genai,
+        'upload_file',
+        lambda path, mime_type=None: uploads.append((len(path.getvalue()), mime_type)),
+    )
+    original = photo()
+
+    result = ai_service.extract_screening_data_from_file(io.BytesIO(original), 'image/png')
+
+    assert result == {'success': True, 'data': {'hemoglobin': 12.1}}
+    assert uploads[0][0] < len(original)
+    assert uploads[0][1] == 'image/jpeg'
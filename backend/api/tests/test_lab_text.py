@@ -0,0 +1,190 @@
+"""Tests for reading lab values from a PDF's text layer."""
+
+import io
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from api import ai_service, lab_text
+
+from .conftest import text_pdf
+
+REPORT = [
+    'CITY DIAGNOSTICS PVT LTD',
+    'Patient Name : Mr. Ramesh Kumar        Age/Sex : 42 Yrs/M',
+    'Ref. By : Dr. S. Gupta   Mobile No: 98765 43210',
+    'Test Name                     Result    Unit          Bio. Ref. Interval',
+    'HAEMOGLOBIN (Hb)              13.2      g/dL          13.0 - 17.0',
+    'Total Leucocyte Count (TLC)   7,800     /cumm         4000 - 11000',
+    'Platelet Count                2.5       lakhs/cumm    1.5 - 4.5',
+    'Glucose Fasting (Plasma)      126  H    mg/dL         70 - 100',
+    'Blood Urea                    30        mg/dL         15 - 40',
+    'Serum Creatinine              88        umol/L        62 - 106',
+    'BUN/Creatinine Ratio          12',
+    'SGPT (ALT)                    32        U/L           < 40',
+    'Total Cholesterol             212       mg/dL         < 200',
+    'HDL Cholesterol               45        mg/dL',
+    'Calcium                       see note',
+]
+
+
+class TestParse:
+    def test_reads_values_in_the_form_units(self):
+        data, unresolved = lab_text.parse('\n'.join(REPORT))
+
+        assert data['hemoglobin'] == 13.2
+        assert data['wbc_count'] == 7.8
+        assert data['platelet_count'] == 250
+        assert data['glucose_level'] == 126
+        assert data['blood_urea_nitrogen'] == 14
+        assert data['creatinine'] == 1.0
+        assert data['alt_sgpt'] == 32
+        assert data['cholesterol_level'] == 212
+        assert unresolved == ['calcium']
+
+    def test_reads_the_demographics(self):
+        data, _ = lab_text.parse('\n'.join(REPORT))
+
+        assert data['full_name'] == 'Ramesh Kumar'
+        assert data['age'] == 42
+        assert data['gender'] == 'Male'
+        assert data['phone'] == '9876543210'
+
+    def test_leaves_an_unknown_unit_to_gemini(self):
+        data, unresolved = lab_text.parse('Haemoglobin   13.2   mmol/kg   13.0 - 17.0')
+
+        assert 'hemoglobin' not in data
+        assert unresolved == ['hemoglobin']
+
+    def test_leaves_an_out_of_bounds_value_to_gemini(self):
+        data, unresolved = lab_text.parse('Serum Sodium   1390   mmol/L   135 - 145')
+
+        assert 'sodium' not in data
+        assert unresolved == ['sodium']
+
+    def test_does_not_read_a_ratio_as_its_analyte(self):
+        data, unresolved = lab_text.parse('BUN/Creatinine Ratio   12\nA/G Ratio   1.5')
+
+        assert data == {}
+        assert unresolved == []
+
+
+class TestPdfText:
+    def test_reads_the_text_layer_and_rewinds(self):
+        document = io.BytesIO(text_pdf(REPORT))
+
+        text = lab_text.pdf_text(document)
+
+        assert 'HAEMOGLOBIN' in text
+        assert document.tell() == 0
+
+    def test_treats_a_scan_as_having_no_text_layer(self):
+        assert lab_text.pdf_text(io.BytesIO(text_pdf(['Page 1']))) is None
+
+    def test_gives_up_on_what_it_cannot_read(self):
+        assert lab_text.pdf_text(io.BytesIO(b'%PDF-1.4\nnot really')) is None
+
+
+class Model:
+    def __init__(self, answer='{"calcium": 9.4}'):
+        self.answer = answer
+        self.calls = []
+
+    def generate_content(self, contents, request_options=None):
+        self.calls.append(contents)
+        return type('Response', (), {'text': self.answer})()
+
+    async def generate_content_async(self, contents, request_options=None):
+        return self.generate_content(contents)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    """Gemini, answering the text-only prompt; any upload fails the test."""
+    model = Model()
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: model)
+
+    def upload_file(path, mime_type=None):
+        raise AssertionError('the file was uploaded')
+
+    monkeypatch.setattr(ai_service.genai, 'upload_file', upload_file)
+    return model
+
+
+class TestExtraction:
+    def test_asks_gemini_only_for_what_the_text_left_unread(self, model):
+        result = ai_service.extract_screening_data_from_file(
+            io.BytesIO(text_pdf(REPORT)), 'application/pdf'
+        )
+
+        assert result['success']
+        assert result['source'] == 'text_layer'
+        assert result['data']['hemoglobin'] == 13.2
+        assert result['data']['calcium'] == 9.4
+        assert result['data']['village'] is None
+        assert len(model.calls) == 1
+        assert '- calcium (mg/dL)' in model.calls[0]
+        assert '- hemoglobin' not in model.calls[0]
+
+    def test_needs_no_gemini_call_when_everything_was_read(self, model):
+        lines = [line for line in REPORT if not line.startswith('Calcium')]
+
+        result = ai_service.extract_screening_data_from_file(
+            io.BytesIO(text_pdf(lines)), 'application/pdf'
+        )
+
+        assert result['data']['creatinine'] == 1.0
+        assert model.calls == []
+
+    def test_discards_an_implausible_answer(self, model):
+        model.answer = '{"calcium": 940}'
+
+        result = ai_service.extract_screening_data_from_file(
+            io.BytesIO(text_pdf(REPORT)), 'application/pdf'
+        )
+
+        assert result['data']['calcium'] is None
+
+    def test_keeps_the_local_values_when_gemini_fails(self, model, monkeypatch):
+        def fail(contents, request_options=None):
+            raise RuntimeError('quota exceeded')
+
+        monkeypatch.setattr(model, 'generate_content', fail)
+
+        result = ai_service.extract_screening_data_from_file(
+            io.BytesIO(text_pdf(REPORT)), 'application/pdf'
+        )
+
+        assert result['success']
+        assert result['data']['hemoglobin'] == 13.2
+
+    def test_uploads_a_pdf_without_lab_values(self, model, monkeypatch):
+        uploads = []
+        monkeypatch.setattr(
+            ai_service.genai, 'upload_file', lambda path, mime_type=None: uploads.append(path)
+        )
+        letter = ['Discharge summary for the patient named below.'] * 3
+
+        ai_service.extract_screening_data_from_file(io.BytesIO(text_pdf(letter)), 'application/pdf')
+
+        assert len(uploads) == 1
+
+    def test_can_be_turned_off(self, model, settings, monkeypatch):
+        settings.AI_PDF_TEXT_LAYER = False
+        uploads = []
+        monkeypatch.setattr(
+            ai_service.genai, 'upload_file', lambda path, mime_type=None: uploads.append(path)
+        )
+
+        ai_service.extract_screening_data_from_file(io.BytesIO(text_pdf(REPORT)), 'application/pdf')
+
+        assert len(uploads) == 1
+
+    def test_async(self, model):
+        result = async_to_sync(ai_service.extract_screening_data_from_file_async)(
+            io.BytesIO(text_pdf(REPORT)), 'application/pdf'
+        )
+
+        assert result['data']['hemoglobin'] == 13.2
+        assert result['data']['calcium'] == 9.4
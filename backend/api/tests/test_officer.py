@@ -1,10 +1,13 @@
 """Tests for health-officer oversight endpoints and their access control."""
 
 import pytest
+from django.db import connection
 from django.urls import reverse
 
 from api.models import Patient, Screening
 
+from .conftest import make_screening, make_user
+
 pytestmark = pytest.mark.django_db
 
 OFFICER_ONLY_ROUTES = [
@@ -50,6 +53,23 @@ class TestHealthWorkerList:
             'high_risk_patients': 1,
         }
 
+    def test_query_count_does_not_grow_with_the_number_of_workers(
+        self, auth_client, health_officer, django_assert_max_num_queries
+    ):
+        for index in range(15):
+            worker = make_user(f'bulk{index}@example.com', 'health_worker')
+            patient = Patient.objects.create(
+                full_name=f'P{index}', age=40, gender='Other', village='V', health_worker=worker
+            )
+            Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+
+        client = auth_client(health_officer)
+        with django_assert_max_num_queries(2):
+            response = client.get(reverse('health_workers'))
+
+        assert len(response.data) == 15
+        assert all(w['stats']['high_risk_patients'] == 1 for w in response.data)
+
     def test_only_lists_health_workers(
         self, auth_client, health_officer, health_worker, patient_user
     ):
@@ -147,6 +167,89 @@ class TestAllPatients:
         assert response.data['total'] == 1
         assert response.data['results'][0]['full_name'] == 'Sunita Devi'
 
+    def test_cursor_mode_walks_every_patient_once_newest_first(
+        self, auth_client, health_officer, many_patients
+    ):
+        client = auth_client(health_officer)
+        seen, cursor = [], ''
+        while cursor is not None:
+            response = client.get(reverse('all_patients'), {'cursor': cursor, 'page_size': 10})
+            assert response.status_code == 200
+            seen.extend(row['id'] for row in response.data['results'])
+            cursor = response.data['next_cursor']
+
+        assert seen == [p.id for p in reversed(many_patients)]
+
+    def test_cursor_pages_are_stable_when_patients_are_added(
+        self, auth_client, health_officer, health_worker, many_patients
+    ):
+        client = auth_client(health_officer)
+        first = client.get(reverse('all_patients'), {'cursor': '', 'page_size': 10}).data
+        Patient.objects.create(
+            full_name='Newcomer',
+            age=20,
+            gender='Male',
+            village='Bulkville',
+            health_worker=health_worker,
+        )
+
+        second = client.get(
+            reverse('all_patients'), {'cursor': first['next_cursor'], 'page_size': 10}
+        ).data
+
+        assert [row['id'] for row in second['results']] == [
+            p.id for p in reversed(many_patients[5:15])
+        ]
+
+    def test_cursor_mode_applies_the_filters(
+        self, auth_client, health_officer, patient, other_patient
+    ):
+        response = auth_client(health_officer).get(
+            reverse('all_patients'), {'cursor': '', 'village': 'Rampur'}
+        )
+
+        assert [row['full_name'] for row in response.data['results']] == ['Sunita Devi']
+        assert response.data['next_cursor'] is None
+
+    def test_cursor_mode_reports_an_exact_total_on_request(
+        self, auth_client, health_officer, many_patients
+    ):
+        client = auth_client(health_officer)
+        exact = client.get(reverse('all_patients'), {'cursor': '', 'include_total': 'true'}).data
+
+        assert exact['total_is_estimate'] is False
+        assert exact['total'] == 25
+
+    def test_cursor_mode_only_flags_planner_estimates(
+        self, auth_client, health_officer, many_patients
+    ):
+        response = auth_client(health_officer).get(reverse('all_patients'), {'cursor': ''})
+
+        if connection.vendor == 'postgresql':
+            assert response.data['total_is_estimate'] is True
+        else:
+            # No planner statistics to read, so the count is exact.
+            assert response.data['total_is_estimate'] is False
+            assert response.data['total'] == 25
+
+    def test_ranked_search_is_paged_by_number_only(self, auth_client, health_officer, patient):
+        client = auth_client(health_officer)
+
+        searched = client.get(reverse('all_patients'), {'search': 'Ramesh', 'cursor': ''})
+        ranked = client.get(reverse('all_patients'), {'search': 'Ramesh', 'page': 1})
+
+        assert searched.status_code == 400
+        assert 'page' in searched.data['detail']
+        assert [row['id'] for row in ranked.data['results']] == [patient.id]
+
+    def test_rejects_a_tampered_cursor(self, auth_client, health_officer):
+        response = auth_client(health_officer).get(
+            reverse('all_patients'), {'cursor': 'not-a-cursor'}
+        )
+
+        assert response.status_code == 400
+        assert response.data == {'detail': 'Invalid cursor'}
+
 
 class TestUpdateWorkerStatus:
     def test_deactivates_a_worker(self, auth_client, health_officer, health_worker):
@@ -253,6 +356,34 @@ class TestSystemAnalytics:
 
         assert response.data['risk_factor_prevalence'] == {}
 
+    def test_worker_performance_reports_completion_rates(
+        self, auth_client, health_officer, health_worker, patient
+    ):
+        Patient.objects.create(
+            full_name='Unscreened', age=30, gender='Other', village='V', health_worker=health_worker
+        )
+        Screening.objects.create(patient=patient, risk_level='Low', risk_score=0)
+
+        response = auth_client(health_officer).get(reverse('system_analytics'))
+
+        assert response.data['worker_performance'] == [
+            {
+                'worker_name': health_worker.full_name,
+                'patients': 2,
+                'screenings': 1,
+                'completion_rate': 50.0,
+            }
+        ]
+
+    def test_age_distribution_honours_a_custom_band_list(
+        self, auth_client, health_officer, patient
+    ):
+        response = auth_client(health_officer).get(
+            reverse('system_analytics'), {'age_bands': '0-49,50+'}
+        )
+
+        assert response.data['age_distribution'] == {'0-49': 0, '50+': 1}
+
     def test_worker_performance_skips_workers_without_patients(
         self, auth_client, health_officer, health_worker, other_worker, patient
     ):
@@ -267,7 +398,7 @@ class TestOfficerDashboard:
     def test_summarises_the_whole_system(
         self, auth_client, health_officer, health_worker, patient, other_patient
     ):
-        Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+        make_screening(patient, risk_level='High', risk_score=70)
 
         response = auth_client(health_officer).get(reverse('officer_dashboard'))
 
@@ -279,6 +410,23 @@ class TestOfficerDashboard:
         assert len(response.data['monthly_trend']) == 6
         assert len(response.data['recent_high_risk']) == 1
 
+    def test_ranks_top_workers_by_screening_volume_and_honours_the_limit(
+        self, auth_client, health_officer, health_worker, other_worker, patient, other_patient
+    ):
+        for _ in range(3):
+            Screening.objects.create(patient=other_patient, risk_level='Low', risk_score=0)
+        Screening.objects.create(patient=patient, risk_level='Low', risk_score=0)
+
+        client = auth_client(health_officer)
+        ranked = client.get(reverse('officer_dashboard')).data['top_workers']
+        limited = client.get(reverse('officer_dashboard'), {'top_workers': 1}).data['top_workers']
+
+        assert [(w['id'], w['screenings']) for w in ranked] == [
+            (other_worker.id, 3),
+            (health_worker.id, 1),
+        ]
+        assert [w['id'] for w in limited] == [other_worker.id]
+
     def test_top_workers_excludes_those_without_screenings(
         self, auth_client, health_officer, other_worker, other_patient
     ):
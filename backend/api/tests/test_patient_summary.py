@@ -0,0 +1,150 @@
+"""Tests for the screening summary denormalized onto Patient."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from api import patient_summary
+from api.models import Patient, Screening
+
+from .conftest import make_screening
+
+pytestmark = pytest.mark.django_db
+
+
+def post_screening(client, patient, **fields):
+    payload = {'patient_id': patient.id, **fields}
+    response = client.post(reverse('screenings'), payload, format='json')
+    assert response.status_code == 201
+    return response
+
+
+class TestMaintenance:
+    def test_recording_screenings_updates_the_summary(self, auth_client, health_worker, patient):
+        client = auth_client(health_worker)
+        post_screening(client, patient)
+        latest = post_screening(client, patient, systolic_bp=190, glucose_level=230)
+
+        patient.refresh_from_db()
+        assert patient.screening_count == 2
+        assert patient.latest_screening_id == latest.data['id']
+        assert patient.latest_risk_level == 'High'
+        assert patient.latest_screened_at == Screening.objects.get(pk=latest.data['id']).created_at
+
+    def test_a_back_dated_screening_counts_but_does_not_become_the_latest(self, patient):
+        current = make_screening(patient, risk_level='Low', risk_score=5)
+        older = Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+        Screening.objects.filter(pk=older.pk).update(
+            created_at=current.created_at - timedelta(days=30)
+        )
+        older.refresh_from_db()
+
+        patient_summary.note_screening(patient, older)
+
+        patient.refresh_from_db()
+        assert patient.screening_count == 2
+        assert patient.latest_screening == current
+        assert patient.latest_risk_level == 'Low'
+
+    def test_deleting_the_latest_screening_falls_back_to_the_previous_one(self, patient):
+        make_screening(patient, risk_level='Low', risk_score=5)
+        latest = make_screening(patient, risk_level='High', risk_score=70)
+
+        latest.delete()
+
+        patient.refresh_from_db()
+        assert patient.screening_count == 1
+        assert patient.latest_risk_level == 'Low'
+
+    def test_deleting_the_only_screening_clears_the_summary(self, patient):
+        make_screening(patient, risk_level='High', risk_score=70).delete()
+
+        patient.refresh_from_db()
+        assert patient.screening_count == 0
+        assert patient.latest_screening is None
+        assert patient.latest_risk_level is None
+        assert patient.latest_screened_at is None
+
+
+class TestBackfillCommand:
+    def test_rebuilds_summaries_written_behind_its_back(self, patient, other_patient):
+        Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+        Screening.objects.create(patient=patient, risk_level='Medium', risk_score=30)
+
+        out = StringIO()
+        call_command('backfill_patient_summaries', '--batch-size', '1', stdout=out)
+
+        patient.refresh_from_db()
+        other_patient.refresh_from_db()
+        assert patient.screening_count == 2
+        assert patient.latest_risk_level == 'Medium'
+        assert other_patient.screening_count == 0
+        assert other_patient.latest_risk_level is None
+        assert 'of 2 patients' in out.getvalue()
+
+    def test_rejects_a_non_positive_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('backfill_patient_summaries', '--batch-size', '0')
+
+
+class TestReaders:
+    def test_patient_list_query_count_does_not_grow_with_the_page(
+        self, auth_client, health_officer, health_worker, django_assert_max_num_queries
+    ):
+        for index in range(20):
+            patient = Patient.objects.create(
+                full_name=f'Patient {index}',
+                age=40,
+                gender='Female',
+                village='Chandpur',
+                health_worker=health_worker,
+            )
+            make_screening(patient, risk_level='Low', risk_score=5)
+
+        with django_assert_max_num_queries(3):
+            response = auth_client(health_officer).get(reverse('all_patients'))
+
+        assert len(response.data['results']) == 20
+        assert all(row['screening_count'] == 1 for row in response.data['results'])
+        assert all(row['latest_risk_level'] == 'Low' for row in response.data['results'])
+
+    def test_risk_filter_ignores_bands_the_patient_has_left(
+        self, auth_client, health_officer, patient
+    ):
+        make_screening(patient, risk_level='High', risk_score=70)
+        make_screening(patient, risk_level='Low', risk_score=5)
+
+        client = auth_client(health_officer)
+
+        assert client.get(reverse('patients'), {'risk': 'High'}).data == []
+        assert len(client.get(reverse('patients'), {'risk': 'Low'}).data) == 1
+
+    def test_officer_dashboard_counts_each_patient_in_one_band(
+        self, auth_client, health_officer, patient, other_patient
+    ):
+        make_screening(patient, risk_level='High', risk_score=70)
+        make_screening(patient, risk_level='Medium', risk_score=30)
+        make_screening(other_patient, risk_level='Low', risk_score=5)
+
+        response = auth_client(health_officer).get(reverse('officer_dashboard'))
+
+        assert response.data['risk_distribution'] == {'Low': 1, 'Medium': 1, 'High': 0}
+        assert response.data['overview']['high_risk_count'] == 0
+
+    def test_the_latest_screening_pointer_is_not_writable(
+        self, auth_client, health_officer, patient
+    ):
+        response = auth_client(health_officer).patch(
+            reverse('update_patient', args=[patient.id]),
+            {'screening_count': 99, 'latest_risk_level': 'High'},
+            format='json',
+        )
+
+        assert response.status_code == 200
+        patient.refresh_from_db()
+        assert patient.screening_count == 0
+        assert patient.latest_risk_level is None
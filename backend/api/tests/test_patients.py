@@ -5,6 +5,8 @@ from django.urls import reverse
 
 from api.models import Appointment, Patient, Screening
 
+from .conftest import make_screening
+
 pytestmark = pytest.mark.django_db
 
 
@@ -59,7 +61,7 @@ class TestListPatients:
     def test_risk_filter_returns_patients_with_a_matching_screening(
         self, auth_client, health_officer, patient, other_patient
     ):
-        Screening.objects.create(patient=patient, risk_level='High', risk_score=70)
+        make_screening(patient, risk_level='High', risk_score=70)
 
         response = auth_client(health_officer).get(reverse('patients'), {'risk': 'High'})
 
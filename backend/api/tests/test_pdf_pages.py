@@ -0,0 +1,231 @@
+"""Tests for extracting multi-page PDF lab reports page by page."""
+
+import io
+import json
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from pypdf import PdfReader
+
+from api import ai_service, pdf_pages
+
+from .conftest import text_pdf
+
+# What Gemini reads on each page, by the page's text.
+ANSWERS = {
+    'page one': {'full_name': 'Sunita Devi', 'hemoglobin': 11.8, 'glucose_level': None},
+    'page two': {'full_name': 'Sunita Devi', 'glucose_level': 132, 'creatinine': 0.8},
+    'page three': {'full_name': None, 'cholesterol_level': 188},
+}
+
+
+def report(*names):
+    return io.BytesIO(text_pdf(*([name] for name in names)))
+
+
+class TestSplit:
+    def test_gives_each_page_a_document_of_its_own(self):
+        document = report('page one', 'page two')
+
+        pages = pdf_pages.split(document)
+
+        assert [PdfReader(io.BytesIO(page)).pages[0].extract_text().strip() for page in pages] == [
+            'page one',
+            'page two',
+        ]
+        assert document.tell() == 0
+
+    def test_a_page_splits_the_same_from_any_report(self):
+        first = pdf_pages.split(report('page one', 'page two'))
+        second = pdf_pages.split(report('page one', 'page two', 'page three'))
+
+        assert second[:2] == first
+
+    def test_leaves_a_single_page_whole(self):
+        assert pdf_pages.split(report('page one')) is None
+
+    def test_leaves_a_long_report_whole(self, monkeypatch):
+        monkeypatch.setattr(pdf_pages, 'MAX_PAGES', 2)
+
+        assert pdf_pages.split(report('page one', 'page two', 'page three')) is None
+
+    def test_gives_up_on_what_it_cannot_read(self):
+        assert pdf_pages.split(io.BytesIO(b'%PDF-1.4\nnot really')) is None
+
+
+class TestMerge:
+    def test_combines_the_fields_of_every_page(self):
+        data, conflicts = pdf_pages.merge(list(ANSWERS.values()))
+
+        assert data == {
+            'full_name': 'Sunita Devi',
+            'hemoglobin': 11.8,
+            'glucose_level': 132,
+            'creatinine': 0.8,
+            'cholesterol_level': 188,
+        }
+        assert conflicts == {}
+
+    def test_the_value_most_pages_agree_on_wins(self):
+        data, conflicts = pdf_pages.merge(
+            [{'hemoglobin': 13.1}, {'hemoglobin': 12.4}, {'hemoglobin': 12.4}]
+        )
+
+        assert data['hemoglobin'] == 12.4
+        assert conflicts == {'hemoglobin': [13.1, 12.4]}
+
+    def test_a_tie_goes_to_the_earliest_page(self):
+        data, _ = pdf_pages.merge([{'full_name': 'Sunita Devi'}, {'full_name': 'S. Devi'}])
+
+        assert data['full_name'] == 'Sunita Devi'
+
+    def test_case_and_number_format_do_not_conflict(self):
+        data, conflicts = pdf_pages.merge(
+            [{'gender': 'Female', 'sodium': 140}, {'gender': 'female', 'sodium': 140.0}]
+        )
+
+        assert data == {'gender': 'Female', 'sodium': 140}
+        assert conflicts == {}
+
+    def test_prefers_a_plausible_value(self):
+        # A reference range misread as the result on one page.
+        data, conflicts = pdf_pages.merge([{'potassium': 51}, {'potassium': 4.2}])
+
+        assert data['potassium'] == 4.2
+        assert conflicts == {}
+
+
+class Model:
+    """Gemini, answering from ANSWERS and recording how many pages it read at once."""
+
+    def __init__(self):
+        self.pages = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self.lock = threading.Lock()
+
+    def read(self, page):
+        with self.lock:
+            self.pages.append(page)
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        if page == 'bad page':
+            raise RuntimeError('could not read the page')
+        return type('Response', (), {'text': json.dumps(ANSWERS[page])})()
+
+    def generate_content(self, contents, request_options=None):
+        return self.read(contents[1])
+
+    async def generate_content_async(self, contents, request_options=None):
+        return await ai_service.asyncio.to_thread(self.read, contents[1])
+
+
+@pytest.fixture
+def model(settings, monkeypatch):
+    settings.AI_PDF_PAGE_WORKERS = 2
+    model = Model()
+    monkeypatch.setenv('GEMINI_API_KEY', 'test-key')
+    monkeypatch.setattr(ai_service, 'get_model', lambda model_name=None: model)
+    monkeypatch.setattr(
+        ai_service.genai,
+        'upload_file',
+        lambda path, mime_type=None: PdfReader(path).pages[0].extract_text().strip(),
+    )
+    return model
+
+
+class TestExtraction:
+    def test_extracts_the_pages_in_parallel_and_merges_them(self, model):
+        result = ai_service.extract_screening_data_from_file(
+            report('page one', 'page two', 'page three'), 'application/pdf'
+        )
+
+        assert result['success']
+        assert result['pages'] == 3
+        assert result['data']['glucose_level'] == 132
+        assert result['data']['cholesterol_level'] == 188
+        assert sorted(model.pages) == ['page one', 'page three', 'page two']
+        assert model.most_in_flight == 2
+
+    def test_never_fans_out_past_the_bulkhead(self, model, settings):
+        settings.AI_PDF_PAGE_WORKERS = 8
+        settings.AI_MAX_CONCURRENCY = 1
+
+        result = ai_service.extract_screening_data_from_file(
+            report('page one', 'page two', 'page three'), 'application/pdf'
+        )
+
+        assert result['success']
+        assert model.most_in_flight == 1
+
+    def test_a_bad_page_does_not_fail_the_others(self, model):
+        result = ai_service.extract_screening_data_from_file(
+            report('page one', 'bad page', 'page three'), 'application/pdf'
+        )
+
+        assert result['success']
+        assert result['failed_pages'] == [2]
+        assert result['data']['hemoglobin'] == 11.8
+
+    def test_fails_when_every_page_does(self, model):
+        result = ai_service.extract_screening_data_from_file(
+            report('bad page', 'bad page'), 'application/pdf'
+        )
+
+        assert result == {'success': False, 'error': 'could not read the page'}
+
+    @pytest.mark.django_db
+    def test_a_re_upload_only_sends_the_new_page(self, model, settings):
+        settings.AI_EXTRACTION_CACHE_TTL = 3600
+        ai_service.extract_screening_data_from_file(
+            report('page one', 'page two'), 'application/pdf'
+        )
+        model.pages.clear()
+
+        result = ai_service.extract_screening_data_from_file(
+            report('page one', 'page two', 'page three'), 'application/pdf'
+        )
+
+        assert model.pages == ['page three']
+        assert result['data']['cholesterol_level'] == 188
+
+    @pytest.mark.django_db
+    def test_a_report_missing_pages_is_not_cached(self, model, settings):
+        settings.AI_EXTRACTION_CACHE_TTL = 3600
+        ai_service.extract_screening_data_from_file(
+            report('page one', 'bad page'), 'application/pdf'
+        )
+        model.pages.clear()
+
+        ai_service.extract_screening_data_from_file(
+            report('page one', 'bad page'), 'application/pdf'
+        )
+
+        assert model.pages == ['bad page']
+
+    def test_can_be_turned_off(self, model, settings, monkeypatch):
+        settings.AI_PDF_PAGE_WORKERS = 0
+        monkeypatch.setattr(
+            ai_service.genai, 'upload_file', lambda path, mime_type=None: 'page one'
+        )
+
+        result = ai_service.extract_screening_data_from_file(
+            report('page one', 'page two'), 'application/pdf'
+        )
+
+        assert model.pages == ['page one']
+        assert 'pages' not in result
+
+    def test_async(self, model):
+        result = async_to_sync(ai_service.extract_screening_data_from_file_async)(
+            report('page one', 'bad page', 'page two', 'page three'), 'application/pdf'
+        )
+
+        assert result['failed_pages'] == [2]
+        assert result['data']['creatinine'] == 0.8
+        assert model.most_in_flight == 2
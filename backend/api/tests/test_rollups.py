@@ -0,0 +1,155 @@
+"""Tests for the incrementally maintained daily screening rollup."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import DailyScreeningRollup, Patient, Screening
+
+pytestmark = pytest.mark.django_db
+
+
+def rollup_totals(**filters):
+    """``{(worker_id, village, risk_level): count}`` across every day."""
+    rows = (
+        DailyScreeningRollup.objects.filter(**filters)
+        .values('health_worker_id', 'village', 'risk_level')
+        .annotate(total=Sum('screening_count'))
+    )
+    return {
+        (row['health_worker_id'], row['village'], row['risk_level']): row['total']
+        for row in rows
+        if row['total']
+    }
+
+
+def post_screening(client, patient, **fields):
+    payload = {'patient_id': patient.id, **fields}
+    response = client.post(reverse('screenings'), payload, format='json')
+    assert response.status_code == 201
+    return response
+
+
+class TestIncrementalMaintenance:
+    def test_recording_a_screening_counts_it_under_its_day_worker_village_and_band(
+        self, auth_client, health_worker, patient
+    ):
+        client = auth_client(health_worker)
+        post_screening(client, patient)
+        post_screening(client, patient)
+        post_screening(client, patient, systolic_bp=190, glucose_level=230)
+
+        row = DailyScreeningRollup.objects.get(risk_level='Low')
+        assert row.date == timezone.localdate()
+        assert row.health_worker == health_worker
+        assert row.village == patient.village
+        assert row.screening_count == 2
+        assert rollup_totals() == {
+            (health_worker.id, 'Chandpur', 'Low'): 2,
+            (health_worker.id, 'Chandpur', 'High'): 1,
+        }
+
+    def test_reassigning_a_patient_moves_their_counts(
+        self, auth_client, health_officer, health_worker, other_worker, patient
+    ):
+        post_screening(auth_client(health_worker), patient)
+
+        auth_client(health_officer).patch(
+            reverse('update_patient', args=[patient.id]),
+            {'health_worker_id': other_worker.id, 'village': 'Rampur'},
+            format='json',
+        )
+
+        assert rollup_totals() == {(other_worker.id, 'Rampur', 'Low'): 1}
+
+    def test_deleting_a_patient_removes_their_counts(self, auth_client, health_worker, patient):
+        client = auth_client(health_worker)
+        post_screening(client, patient)
+
+        client.delete(reverse('patient_detail', args=[patient.id]))
+
+        assert rollup_totals() == {}
+
+    def test_deleting_a_screening_removes_its_count(self, auth_client, health_worker, patient):
+        client = auth_client(health_worker)
+        post_screening(client, patient)
+        post_screening(client, patient, systolic_bp=190, glucose_level=230)
+
+        Screening.objects.get(risk_level='High').delete()
+        Screening.objects.filter(risk_level='Low').delete()
+        post_screening(client, patient)
+
+        assert rollup_totals() == {(health_worker.id, 'Chandpur', 'Low'): 1}
+        response = client.get(reverse('dashboard_stats'))
+        assert response.data['weekly_screenings'][-1]['screenings'] == 1
+        assert response.data['risk_distribution'] == {'Low': 1, 'Medium': 0, 'High': 0}
+
+    def test_dashboard_trend_is_scoped_to_the_workers_rollup_rows(
+        self, auth_client, health_worker, other_worker, patient, other_patient
+    ):
+        post_screening(auth_client(health_worker), patient)
+        post_screening(auth_client(other_worker), other_patient)
+
+        response = auth_client(health_worker).get(reverse('dashboard_stats'))
+
+        assert response.data['weekly_screenings'][-1]['screenings'] == 1
+        assert response.data['risk_distribution']['Low'] == 1
+
+
+class TestRebuildCommand:
+    def backdated(self, patient, days_ago, risk_level='Low'):
+        screening = Screening.objects.create(patient=patient, risk_level=risk_level)
+        Screening.objects.filter(id=screening.id).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_rebuilds_the_rollup_from_raw_screenings(self, health_worker, patient):
+        self.backdated(patient, 40)
+        self.backdated(patient, 3, risk_level='High')
+        self.backdated(patient, 3, risk_level='High')
+        DailyScreeningRollup.objects.create(
+            date=timezone.localdate(), village='Stale', risk_level='Low', screening_count=9
+        )
+
+        out = StringIO()
+        call_command('rebuild_screening_rollup', '--chunk-days', '7', stdout=out)
+
+        assert 'Rebuilt 2 rollup rows' in out.getvalue()
+        assert rollup_totals() == {
+            (health_worker.id, 'Chandpur', 'Low'): 1,
+            (health_worker.id, 'Chandpur', 'High'): 2,
+        }
+
+    def test_only_touches_the_requested_range(self, health_worker, patient):
+        self.backdated(patient, 40)
+        self.backdated(patient, 1)
+        start = (timezone.localdate() - timedelta(days=2)).isoformat()
+
+        call_command('rebuild_screening_rollup', '--start', start, stdout=StringIO())
+
+        assert DailyScreeningRollup.objects.get().date == timezone.localdate() - timedelta(days=1)
+
+    def test_reports_when_there_is_nothing_to_roll_up(self):
+        out = StringIO()
+
+        call_command('rebuild_screening_rollup', stdout=out)
+
+        assert 'No screenings' in out.getvalue()
+
+    def test_rejects_an_inverted_range(self):
+        with pytest.raises(CommandError):
+            call_command('rebuild_screening_rollup', '--start', '2026-02-01', '--end', '2026-01-01')
+
+
+def test_unassigned_patients_are_rolled_up_under_no_worker(auth_client, health_worker):
+    orphan = Patient.objects.create(full_name='Orphan', age=30, gender='Other', village='Nowhere')
+
+    post_screening(auth_client(health_worker), orphan)
+
+    assert rollup_totals() == {(None, 'Nowhere', 'Low'): 1}
@@ -1,9 +1,12 @@
-"""Tests for screening creation, validation and role scoping."""
+"""Tests for screening creation, validation, role scoping and list delivery."""
+
+import json
 
 import pytest
 from django.urls import reverse
 
-from api.models import Patient, Recommendation, Screening
+from api.models import AIEnrichmentJob, DailyScreeningRollup, Patient, Recommendation, Screening
+from api.views import screenings as screening_views
 
 pytestmark = pytest.mark.django_db
 
@@ -102,6 +105,24 @@ class TestCreateScreening:
             screening_id=response.data['id'], category='followup'
         ).exists()
 
+    def test_writes_one_insert_per_table_in_one_transaction(
+        self, auth_client, health_worker, patient, django_assert_num_queries
+    ):
+        client = auth_client(health_worker)
+        payload = screening_payload(
+            patient, systolic_bp=190, diastolic_bp=110, glucose_level=230, smoking_status='Current'
+        )
+        client.post(reverse('screenings'), payload, format='json')
+
+        # Patient lookups (2), SAVEPOINT/RELEASE (2), then screening, recommendations,
+        # rollup, patient summary and AI job: one statement each.
+        with django_assert_num_queries(9) as captured:
+            response = client.post(reverse('screenings'), payload, format='json')
+
+        assert Recommendation.objects.filter(screening_id=response.data['id']).count() > 1
+        inserts = [q['sql'] for q in captured.captured_queries if q['sql'].startswith('INSERT')]
+        assert len(inserts) == 3
+
     def test_succeeds_without_ai_insights_when_gemini_is_unconfigured(
         self, auth_client, health_worker, patient
     ):
@@ -220,8 +241,8 @@ class TestListScreenings:
         response = auth_client(health_worker).get(reverse('screenings'))
 
         assert response.status_code == 200
-        assert len(response.data) == 1
-        assert response.data[0]['patient_name'] == patient.full_name
+        assert len(response.data['results']) == 1
+        assert response.data['results'][0]['patient_name'] == patient.full_name
 
     def test_officer_sees_every_screening(
         self, auth_client, health_officer, patient, other_patient
@@ -231,7 +252,7 @@ class TestListScreenings:
 
         response = auth_client(health_officer).get(reverse('screenings'))
 
-        assert len(response.data) == 2
+        assert len(response.data['results']) == 2
 
     def test_filters_by_patient_and_risk(self, auth_client, health_officer, patient, other_patient):
         Screening.objects.create(patient=patient, risk_level='Low', risk_score=0)
@@ -242,8 +263,167 @@ class TestListScreenings:
         by_patient = client.get(reverse('screenings'), {'patient_id': patient.id})
         by_risk = client.get(reverse('screenings'), {'risk': 'High'})
 
-        assert len(by_patient.data) == 2
-        assert len(by_risk.data) == 2
+        assert len(by_patient.data['results']) == 2
+        assert len(by_risk.data['results']) == 2
+
+    def test_pages_with_a_cursor_newest_first(self, auth_client, health_officer, patient):
+        created = [
+            Screening.objects.create(patient=patient, risk_level='Low', risk_score=0)
+            for _ in range(5)
+        ]
+
+        client = auth_client(health_officer)
+        first = client.get(reverse('screenings'), {'page_size': 3}).data
+        second = client.get(
+            reverse('screenings'), {'page_size': 3, 'cursor': first['next_cursor']}
+        ).data
+
+        assert [row['id'] for row in first['results'] + second['results']] == [
+            s.id for s in reversed(created)
+        ]
+        assert second['next_cursor'] is None
+
+    def test_query_count_does_not_grow_with_the_page(
+        self, auth_client, health_officer, patient, other_patient, django_assert_max_num_queries
+    ):
+        for owner in [patient, other_patient] * 10:
+            Screening.objects.create(patient=owner, risk_level='Low', risk_score=0)
+
+        with django_assert_max_num_queries(1):
+            response = auth_client(health_officer).get(reverse('screenings'))
+
+        assert len(response.data['results']) == 20
+
+    def test_rejects_a_malformed_cursor(self, auth_client, health_officer):
+        response = auth_client(health_officer).get(reverse('screenings'), {'cursor': '%%%'})
+
+        assert response.status_code == 400
+        assert response.data == {'detail': 'Invalid cursor'}
+
+    def test_officers_can_stream_every_row_as_ndjson(
+        self, auth_client, health_officer, patient, other_patient
+    ):
+        for owner in [patient, other_patient] * 60:
+            Screening.objects.create(patient=owner, risk_level='Low', risk_score=0)
+
+        response = auth_client(health_officer).get(reverse('screenings'), {'stream': 'true'})
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert len(rows) == 120
+        assert {row['patient_name'] for row in rows} == {patient.full_name, other_patient.full_name}
+
+    def test_health_workers_cannot_stream(self, auth_client, health_worker):
+        response = auth_client(health_worker).get(reverse('screenings'), {'stream': 'true'})
+
+        assert response.status_code == 403
+
+
+class TestBulkCreateScreenings:
+    def post(self, client, items):
+        return client.post(reverse('screenings_bulk'), {'screenings': items}, format='json')
+
+    def test_creates_every_item_and_echoes_client_ids(self, auth_client, health_worker, patient):
+        items = [
+            screening_payload(patient, client_id='local-1'),
+            screening_payload(
+                patient,
+                client_id='local-2',
+                systolic_bp=190,
+                diastolic_bp=110,
+                glucose_level=230,
+                smoking_status='Current',
+            ),
+        ]
+
+        response = self.post(auth_client(health_worker), items)
+
+        assert response.status_code == 201
+        assert (response.data['created'], response.data['failed']) == (2, 0)
+        first, second = response.data['results']
+        assert (first['client_id'], first['status'], first['risk_level']) == (
+            'local-1',
+            'created',
+            'Low',
+        )
+        assert (second['client_id'], second['risk_level']) == ('local-2', 'High')
+        assert second['ai_status'] == 'pending'
+        assert Recommendation.objects.filter(screening_id=second['id']).exists()
+        assert AIEnrichmentJob.objects.count() == 2
+
+    def test_updates_the_summary_and_rollup(self, auth_client, health_worker, patient):
+        items = [screening_payload(patient), screening_payload(patient, systolic_bp=190)]
+
+        self.post(auth_client(health_worker), items)
+
+        patient.refresh_from_db()
+        assert patient.screening_count == 2
+        assert patient.latest_screening_id == Screening.objects.latest('created_at', 'id').id
+        assert sum(DailyScreeningRollup.objects.values_list('screening_count', flat=True)) == 2
+
+    def test_refreshes_the_dashboard_once_the_batch_commits(
+        self, auth_client, health_worker, patient, settings, django_capture_on_commit_callbacks
+    ):
+        settings.DASHBOARD_CACHE_TIMEOUT = 300
+        client = auth_client(health_worker)
+        assert client.get(reverse('dashboard_stats')).data['total_screenings'] == 0
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            self.post(client, [screening_payload(patient), screening_payload(patient)])
+            assert client.get(reverse('dashboard_stats')).data['total_screenings'] == 0
+
+        for callback in callbacks:
+            callback()
+        assert client.get(reverse('dashboard_stats')).data['total_screenings'] == 2
+
+    def test_query_count_does_not_grow_with_the_batch(
+        self, auth_client, health_worker, patient, django_assert_max_num_queries
+    ):
+        client = auth_client(health_worker)
+        items = [screening_payload(patient, systolic_bp=110 + index) for index in range(50)]
+
+        with django_assert_max_num_queries(12):
+            response = self.post(client, items)
+
+        assert response.data['created'] == 50
+
+    def test_reports_invalid_items_and_writes_the_rest(self, auth_client, health_worker, patient):
+        items = [
+            screening_payload(patient, client_id='ok'),
+            screening_payload(patient, client_id='bad', systolic_bp=900),
+        ]
+
+        response = self.post(auth_client(health_worker), items)
+
+        assert response.status_code == 207
+        bad = response.data['results'][1]
+        assert (bad['client_id'], bad['status']) == ('bad', 'invalid')
+        assert 'systolic_bp' in bad['errors']
+        assert Screening.objects.count() == 1
+
+    def test_workers_cannot_write_to_another_workers_patient(
+        self, auth_client, health_worker, other_patient
+    ):
+        response = self.post(auth_client(health_worker), [screening_payload(other_patient)])
+
+        assert response.status_code == 400
+        assert response.data['results'][0]['errors']['patient_id'] == ['Patient not found']
+        assert not Screening.objects.exists()
+
+    @pytest.mark.parametrize('body', [{}, {'screenings': []}, {'screenings': 'nope'}, []])
+    def test_rejects_a_malformed_body(self, auth_client, health_worker, body):
+        response = auth_client(health_worker).post(reverse('screenings_bulk'), body, format='json')
+
+        assert response.status_code == 400
+
+    def test_rejects_an_oversized_batch(self, auth_client, health_worker, patient, monkeypatch):
+        monkeypatch.setattr(screening_views, 'MAX_BULK_SCREENINGS', 2)
+
+        response = self.post(auth_client(health_worker), [screening_payload(patient)] * 3)
+
+        assert response.status_code == 400
+        assert not Screening.objects.exists()
 
 
 class TestPatientSelfScreening:
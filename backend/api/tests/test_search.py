@@ -0,0 +1,92 @@
+"""Tests for the ranked patient search backends."""
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from api import search
+from api.models import Patient
+
+pytestmark = pytest.mark.django_db
+
+
+def names(queryset):
+    return [patient.full_name for patient in queryset]
+
+
+@pytest.fixture
+def villagers(health_worker):
+    def make(full_name, village, phone=None):
+        return Patient.objects.create(
+            full_name=full_name,
+            age=40,
+            gender='Female',
+            village=village,
+            phone=phone,
+            health_worker=health_worker,
+        )
+
+    return [
+        make('Kamla Devi', 'Ramgarh'),
+        make('Ramesh Yadav', 'Sitapur', '9811100000'),
+        make('Sita Ram', 'Chandpur'),
+    ]
+
+
+class TestSqliteFullText:
+    def test_sqlite_uses_the_fts_backend(self):
+        assert search.backend_name(connection) == 'sqlite_fts'
+
+    def test_matches_substrings_case_insensitively(self, villagers):
+        assert names(search.search_patients(Patient.objects.all(), 'AMES')) == ['Ramesh Yadav']
+
+    def test_name_matches_outrank_village_matches(self, villagers):
+        ranked = names(search.search_patients(Patient.objects.order_by('id'), 'ram'))
+
+        assert ranked[-1] == 'Kamla Devi'
+        assert set(ranked) == {'Kamla Devi', 'Ramesh Yadav', 'Sita Ram'}
+
+    def test_matches_phone_numbers(self, villagers):
+        assert names(search.search_patients(Patient.objects.all(), '98111')) == ['Ramesh Yadav']
+
+    def test_edits_and_deletes_reach_the_index(self, villagers):
+        kamla, ramesh, _ = villagers
+        kamla.full_name = 'Kamla Mehta'
+        kamla.save()
+        ramesh.delete()
+
+        assert names(search.search_patients(Patient.objects.all(), 'mehta')) == ['Kamla Mehta']
+        assert names(search.search_patients(Patient.objects.all(), 'ramesh')) == []
+
+    def test_quotes_in_the_term_are_treated_as_text(self, villagers):
+        assert names(search.search_patients(Patient.objects.all(), 'Sita" OR "Ram')) == []
+
+    def test_short_terms_fall_back_to_a_substring_scan(self, villagers):
+        assert names(search.search_patients(Patient.objects.all(), 'ya')) == ['Ramesh Yadav']
+
+    def test_a_dropped_trigger_is_recreated(self, villagers):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TRIGGER {search.FTS_TABLE}_ai')
+
+        assert search.ensure_sqlite_fts(connection) is True
+        assert search.ensure_sqlite_fts(connection) is False
+        Patient.objects.create(full_name='Zoya Khan', age=30, gender='Female', village='Rampur')
+        assert names(search.search_patients(Patient.objects.all(), 'zoya')) == ['Zoya Khan']
+
+
+class TestBasicBackend:
+    def test_can_be_forced_from_settings(self, settings, villagers):
+        settings.PATIENT_SEARCH_BACKEND = 'basic'
+
+        ranked = names(search.search_patients(Patient.objects.order_by('id'), 'ram'))
+
+        assert ranked == ['Ramesh Yadav', 'Sita Ram', 'Kamla Devi']
+
+
+class TestSearchEndpoint:
+    def test_search_is_still_scoped_to_the_workers_caseload(
+        self, auth_client, health_worker, villagers, other_patient
+    ):
+        response = auth_client(health_worker).get(reverse('patients'), {'search': 'devi'})
+
+        assert [row['full_name'] for row in response.data] == ['Kamla Devi']
@@ -0,0 +1,107 @@
+"""Tests for the AI upload handler's early rejection and streaming hash."""
+
+import hashlib
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopUpload
+from django.test import RequestFactory
+
+from api.uploads import AIUploadHandler, sniff_suffix
+
+DOCUMENTS = {'.pdf', '.jpg', '.jpeg', '.png'}
+PDF = b'%PDF-1.4\n' + b'0' * 500
+
+
+def parse(files, allowed=DOCUMENTS, max_bytes=1024):
+    """Parse a multipart request carrying ``files``; return its FILES and the handler."""
+    request = RequestFactory().post('/api/ai/lab-extract', files)
+    handler = AIUploadHandler(request, allowed, max_bytes)
+    request.upload_handlers = [handler]
+    return request.FILES, handler
+
+
+@pytest.mark.parametrize(
+    ('head', 'suffix'),
+    [
+        (b'%PDF-1.7\n%\xe2\xe3', '.pdf'),
+        (b'\xff\xd8\xff\xe1\x00\x18Exif\x00\x00', '.jpg'),
+        (b'\x89PNG\r\n\x1a\n\x00\x00\x00\r', '.png'),
+        (b'RIFF\x24\x00\x00\x00WEBP', '.webp'),
+        (b'RIFF\x24\x00\x00\x00WAVE', '.wav'),
+        (b'\x00\x00\x00\x18ftypheic', '.heic'),
+        (b'\x00\x00\x00\x20ftypM4A ', '.m4a'),
+        (b'\x1aE\xdf\xa3\x9fB\x86\x81\x01B\xf7\x81', '.webm'),
+        (b'OggS\x00\x02\x00\x00\x00\x00\x00\x00', '.ogg'),
+        (b'ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00', '.mp3'),
+        (b'MZ\x90\x00\x03\x00\x00\x00\x04\x00\x00\x00', None),
+        (b'', None),
+    ],
+)
+def test_sniff_suffix(head, suffix):
+    assert sniff_suffix(head) == suffix
+
+
+class TestAIUploadHandler:
+    def test_hashes_and_sniffs_an_accepted_file(self):
+        files, handler = parse({'file': SimpleUploadedFile('report', PDF)})
+
+        uploaded = files['file']
+        assert handler.error is None
+        assert uploaded.read() == PDF
+        assert uploaded.sha256 == hashlib.sha256(PDF).hexdigest()
+        assert uploaded.sniffed_suffix == '.pdf'
+
+    def test_keeps_small_uploads_in_memory_and_spools_large_ones(self, settings):
+        settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 600
+
+        small, _ = parse({'file': SimpleUploadedFile('a.pdf', b'%PDF-1.4\n')})
+        large, _ = parse({'file': SimpleUploadedFile('b.pdf', PDF)})
+
+        assert not hasattr(small['file'], 'temporary_file_path')
+        assert large['file'].read() == PDF
+        assert large['file'].sha256 == hashlib.sha256(PDF).hexdigest()
+        assert large['file'].temporary_file_path()
+
+    def test_refuses_a_disallowed_extension(self):
+        files, handler = parse({'file': SimpleUploadedFile('payload.exe', PDF)})
+
+        assert 'file' not in files
+        assert 'Unsupported file type ".exe"' in handler.error
+
+    def test_refuses_content_that_is_not_an_allowed_type(self):
+        files, handler = parse({'file': SimpleUploadedFile('scan.png', b'MZ\x90\x00' * 10)})
+
+        assert 'file' not in files
+        assert handler.error == 'File content does not match a supported type.'
+
+    def test_refuses_an_allowed_type_the_endpoint_does_not_take(self):
+        files, handler = parse({'file': SimpleUploadedFile('scan', PDF)}, allowed={'.webm'})
+
+        assert 'file' not in files
+        assert 'does not match' in handler.error
+
+    def test_refuses_a_file_that_passes_the_cap(self):
+        files, handler = parse({'file': SimpleUploadedFile('big.pdf', PDF * 10)})
+
+        assert 'file' not in files
+        assert 'too large' in handler.error
+
+    def test_stops_reading_at_the_chunk_that_passes_the_cap(self):
+        handler = AIUploadHandler(None, DOCUMENTS, max_bytes=1024)
+        handler.new_file('file', 'big.pdf', 'application/pdf', None)
+        handler.receive_data_chunk(PDF, 0)
+
+        with pytest.raises(StopUpload) as stopped:
+            handler.receive_data_chunk(b'0' * 1024, len(PDF))
+
+        assert stopped.value.connection_reset
+
+    def test_refuses_on_the_declared_length_before_reading(self):
+        handler = AIUploadHandler(None, DOCUMENTS, max_bytes=1024)
+
+        post, files = handler.handle_raw_input(None, {}, 10 * 1024 * 1024, b'boundary', 'utf-8')
+
+        assert not post
+        assert not files
+        assert 'too large' in handler.error
@@ -0,0 +1,161 @@
+"""
+Upload handler for the AI endpoints: reject early, hash while streaming.
+
+Django's default handlers accept the whole multipart body before a view can
+look at it, so an oversized or mistyped file over a slow link used to hold a
+worker until its last byte arrived. ``AIUploadHandler`` replaces them on the
+AI upload views and stops reading the body as soon as:
+
+* the declared ``Content-Length`` or the bytes received pass the size cap;
+* the file name has an extension the endpoint does not accept; or
+* the first bytes do not identify an accepted type (``sniff_suffix``).
+
+Accepted files are stored as Django's own handlers would: in memory up to
+``FILE_UPLOAD_MAX_MEMORY_SIZE``, otherwise in a temporary file. Each carries
+a ``sha256`` hex digest computed as it streamed and the ``sniffed_suffix`` its
+content showed, so later steps need not read it again.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+# Room for the form fields and multipart boundaries around the file itself.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Bytes ``sniff_suffix`` needs to tell the supported types apart.
+SNIFF_BYTES = 12
+
+# ISO base media brands used by HEIC/HEIF images; other brands are audio.
+HEIC_BRANDS = {b'heic', b'heix', b'hevc', b'hevx', b'mif1', b'msf1'}
+
+
+def sniff_suffix(head: bytes):
+    """
+    Identify a supported upload type from its first bytes.
+
+    Returns:
+        The canonical suffix of the type (``'.jpg'`` for any JPEG), or None
+        when the bytes match none of them.
+    """
+    if head.startswith(b'%PDF-'):
+        return '.pdf'
+    if head.startswith(b'\xff\xd8\xff'):
+        return '.jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return '.png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return '.wav'
+    if head[4:8] == b'ftyp':
+        return '.heic' if head[8:12] in HEIC_BRANDS else '.m4a'
+    if head.startswith(b'\x1aE\xdf\xa3'):
+        return '.webm'
+    if head.startswith(b'OggS'):
+        return '.ogg'
+    # MP3: an ID3 tag, or straight into an MPEG audio frame header.
+    if head.startswith(b'ID3') or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return '.mp3'
+    return None
+
+
+class AIUploadHandler(FileUploadHandler):
+    """
+    Store, check and hash the files of one AI upload request.
+
+    After parsing, ``error`` holds the reason the upload was refused, if it
+    was; the view reports it instead of the missing file.
+    """
+
+    def __init__(self, request, allowed_suffixes, max_bytes):
+        super().__init__(request)
+        self.allowed_suffixes = allowed_suffixes
+        self.max_bytes = max_bytes
+        self.error = None
+        self.in_memory = True
+
+    def reject(self, error):
+        """Record ``error`` and stop reading the request body."""
+        self.error = error
+        raise StopUpload(connection_reset=True)
+
+    def too_large_error(self):
+        limit_mb = self.max_bytes // (1024 * 1024)
+        return f'File is too large. Maximum size is {limit_mb} MB.'
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_bytes + FORM_OVERHEAD_BYTES:
+            # Refused on the declared length, before a byte of the body is read.
+            self.error = self.too_large_error()
+            return QueryDict(encoding=encoding), MultiValueDict()
+        self.in_memory = content_length <= settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        return None
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        suffix = os.path.splitext(self.file_name or '')[1].lower()
+        if suffix and suffix not in self.allowed_suffixes:
+            supported = ', '.join(sorted(self.allowed_suffixes))
+            self.reject(f'Unsupported file type "{suffix}". Supported types: {supported}.')
+
+        self.digest = hashlib.sha256()
+        self.head = b''
+        self.sniffed = None
+        if self.in_memory:
+            self.file = BytesIO()
+        else:
+            self.file = TemporaryUploadedFile(
+                self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+            )
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self.reject(self.too_large_error())
+
+        if self.sniffed is None:
+            self.head += raw_data[:SNIFF_BYTES]
+            if len(self.head) >= SNIFF_BYTES:
+                self.check_type()
+
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def check_type(self):
+        self.sniffed = sniff_suffix(self.head)
+        if self.sniffed not in self.allowed_suffixes:
+            self.reject('File content does not match a supported type.')
+
+    def file_complete(self, file_size):
+        if self.sniffed is None:
+            # Shorter than SNIFF_BYTES: judge what there is.
+            self.check_type()
+
+        self.file.seek(0)
+        if self.in_memory:
+            uploaded = InMemoryUploadedFile(
+                file=self.file,
+                field_name=self.field_name,
+                name=self.file_name,
+                content_type=self.content_type,
+                size=file_size,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        else:
+            uploaded = self.file
+            uploaded.size = file_size
+        uploaded.sha256 = self.digest.hexdigest()
+        uploaded.sniffed_suffix = self.sniffed
+        return uploaded
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()
@@ -1,10 +1,7 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
-    AIAnalysisView,
-    AILabExtractionView,
-    AITextVitalsView,
-    AIVoiceVitalsView,
     AllPatientsView,
     AnalyticsView,
     AppointmentDetailView,
@@ -28,14 +25,21 @@ from .views import (
     RecommendationDetailView,
     RecommendationListView,
     RegisterView,
+    ScreeningBulkCreateView,
+    ScreeningDetailView,
     ScreeningListCreateView,
     SystemAnalyticsView,
     UpdatePatientView,
     # Settings views
     UpdateProfileView,
     UpdateWorkerStatusView,
+    ai,
+    ai_async,
 )
 
+# Under ASGI the AI endpoints can run as async views; see api/views/ai_async.py.
+ai_views = ai_async if settings.AI_ASYNC_VIEWS else ai
+
 urlpatterns = [
     # Auth endpoints
     path('auth/register', RegisterView.as_view(), name='register'),
@@ -51,6 +55,8 @@ urlpatterns = [
     ),
     # Screening endpoints
     path('screening/screenings', ScreeningListCreateView.as_view(), name='screenings'),
+    path('screening/screenings/bulk', ScreeningBulkCreateView.as_view(), name='screenings_bulk'),
+    path('screening/screenings/<int:pk>', ScreeningDetailView.as_view(), name='screening_detail'),
     # Appointment endpoints
     path('appointments', AppointmentListCreateView.as_view(), name='appointments'),
     path('appointments/<int:pk>', AppointmentDetailView.as_view(), name='appointment_detail'),
@@ -63,10 +69,10 @@ urlpatterns = [
     path('stats/dashboard', DashboardStatsView.as_view(), name='dashboard_stats'),
     path('stats/analytics', AnalyticsView.as_view(), name='analytics'),
     # AI endpoints
-    path('ai/analyze', AIAnalysisView.as_view(), name='ai_analyze'),
-    path('ai/voice-vitals', AIVoiceVitalsView.as_view(), name='voice_vitals'),
-    path('ai/lab-extract', AILabExtractionView.as_view(), name='lab_extract'),
-    path('ai/text-vitals', AITextVitalsView.as_view(), name='text_vitals'),
+    path('ai/analyze', ai_views.AIAnalysisView.as_view(), name='ai_analyze'),
+    path('ai/voice-vitals', ai_views.AIVoiceVitalsView.as_view(), name='voice_vitals'),
+    path('ai/lab-extract', ai_views.AILabExtractionView.as_view(), name='lab_extract'),
+    path('ai/text-vitals', ai_views.AITextVitalsView.as_view(), name='text_vitals'),
     # Health Officer endpoints
     path('officer/workers', HealthWorkerListView.as_view(), name='health_workers'),
     path('officer/workers/<int:pk>', HealthWorkerDetailView.as_view(), name='health_worker_detail'),
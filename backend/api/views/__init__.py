@@ -41,7 +41,7 @@ from .patient_portal import (
     PatientSelfScreeningView,
 )
 from .patients import PatientDetailView, PatientHistoryView, PatientListCreateView
-from .screenings import ScreeningListCreateView
+from .screenings import ScreeningBulkCreateView, ScreeningDetailView, ScreeningListCreateView
 
 __all__ = [
     # Auth
@@ -56,6 +56,8 @@ __all__ = [
     'PatientHistoryView',
     # Screenings
     'ScreeningListCreateView',
+    'ScreeningDetailView',
+    'ScreeningBulkCreateView',
     # Appointments and recommendations
     'AppointmentListCreateView',
     'AppointmentDetailView',
@@ -5,12 +5,15 @@ import logging
 import os
 import tempfile
 
+from django.core.files.uploadedfile import InMemoryUploadedFile
 from rest_framework import status
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from ..uploads import AIUploadHandler
+
 logger = logging.getLogger(__name__)
 
 # Uploads are streamed straight to Gemini, so cap them before spending an API
@@ -20,11 +23,29 @@ MAX_UPLOAD_BYTES = 20 * 1024 * 1024
 ALLOWED_AUDIO_SUFFIXES = {'.webm', '.mp3', '.wav', '.m4a', '.ogg'}
 ALLOWED_DOCUMENT_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.heic', '.pdf'}
 
+# Sent with each upload, so Gemini never has to guess from a temp file's name.
+MIME_TYPES = {
+    '.webm': 'audio/webm',
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.m4a': 'audio/mp4',
+    '.ogg': 'audio/ogg',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.heic': 'image/heic',
+    '.pdf': 'application/pdf',
+}
+
 
 def validate_upload(uploaded_file, allowed_suffixes, default_suffix):
     """
     Check an upload's size and extension.
 
+    Uploads parsed by ``AIUploadHandler`` were checked while streaming; this
+    also covers files that reached a view some other way.
+
     Returns:
         ``(suffix, None)`` when the file is acceptable, otherwise
         ``(None, error_message)``.
@@ -38,7 +59,8 @@ def validate_upload(uploaded_file, allowed_suffixes, default_suffix):
         supported = ', '.join(sorted(allowed_suffixes))
         return None, f'Unsupported file type "{suffix}". Supported types: {supported}.'
 
-    return suffix, None
+    # What the content showed, where AIUploadHandler looked, beats the name.
+    return getattr(uploaded_file, 'sniffed_suffix', None) or suffix, None
 
 
 @contextlib.contextmanager
@@ -59,42 +81,103 @@ def spooled_upload(uploaded_file, suffix):
                 logger.warning('Could not remove temp file %s', temp_file_path)
 
 
+def shed_response(body, retry_after):
+    """A 503 telling the client when to retry a call that was shed to protect the server."""
+    return Response(
+        body,
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={'Retry-After': str(retry_after)},
+    )
+
+
+@contextlib.contextmanager
+def upload_source(uploaded_file, suffix):
+    """
+    Yield ``(source, mime_type)`` to hand an upload to Gemini without copying it.
+
+    Django has already stored the upload: large ones in a temporary file, whose
+    path is passed on, and small ones in memory, whose file object is. Only an
+    upload that is neither is copied to disk, through ``spooled_upload``.
+    """
+    mime_type = MIME_TYPES[suffix]
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        yield uploaded_file.temporary_file_path(), mime_type
+    elif isinstance(uploaded_file, InMemoryUploadedFile):
+        uploaded_file.seek(0)
+        yield uploaded_file.file, mime_type
+    else:
+        with spooled_upload(uploaded_file, suffix) as path:
+            yield path, mime_type
+
+
 def ai_result_response(result):
     """Translate an ai_service result dict into a DRF response."""
     if result.get('success'):
         return Response(result.get('data', {}))
+    if 'retry_after' in result:
+        return shed_response({'detail': result['error']}, result['retry_after'])
     return Response(
         {'detail': result.get('error', 'AI processing failed')},
         status=status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
 
 
+class AIUploadMixin:
+    """
+    Parse a view's uploads with ``AIUploadHandler``, which refuses bad ones early.
+
+    Views read ``request.FILES`` first, then report ``upload_handler.error``
+    if the handler stopped the upload.
+    """
+
+    allowed_suffixes = frozenset()
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.upload_handler = AIUploadHandler(request, self.allowed_suffixes, MAX_UPLOAD_BYTES)
+        request.upload_handlers = [self.upload_handler]
+
+
 class AIAnalysisView(APIView):
-    """Get AI-powered health analysis for screening data."""
+    """
+    Get AI-powered health analysis for screening data.
+
+    Repeat analyses are answered from the result cache; ``?refresh=true``
+    forces a fresh Gemini call.
+    """
 
     permission_classes = [AllowAny]
 
     def post(self, request):
         from ..ai_service import analyze_health_data
 
+        use_cache = request.query_params.get('refresh') != 'true'
         try:
-            return Response(analyze_health_data(request.data))
+            result = analyze_health_data(request.data, use_cache=use_cache)
         except Exception as exc:  # noqa: BLE001 - surfaced to the client
             logger.exception('AI analysis endpoint failed')
             return Response(
                 {'success': False, 'error': str(exc)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+        if 'retry_after' in result:
+            return shed_response(result, result['retry_after'])
+        return Response(result)
 
 
-class AIVoiceVitalsView(APIView):
+class AIVoiceVitalsView(AIUploadMixin, APIView):
     """Process a voice recording to extract vitals using AI."""
 
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
+    allowed_suffixes = ALLOWED_AUDIO_SUFFIXES
 
     def post(self, request):
         audio_file = request.FILES.get('audio')
+        if self.upload_handler.error:
+            return Response(
+                {'detail': self.upload_handler.error}, status=status.HTTP_400_BAD_REQUEST
+            )
         if not audio_file:
             return Response(
                 {'detail': 'No audio file provided'},
@@ -107,20 +190,25 @@ class AIVoiceVitalsView(APIView):
 
         from ..ai_service import extract_vitals_from_audio
 
-        with spooled_upload(audio_file, suffix) as path:
-            return ai_result_response(extract_vitals_from_audio(path))
+        with upload_source(audio_file, suffix) as (source, mime_type):
+            return ai_result_response(extract_vitals_from_audio(source, mime_type=mime_type))
 
 
-class AILabExtractionView(APIView):
+class AILabExtractionView(AIUploadMixin, APIView):
     """Process a lab report image or PDF to extract values using AI."""
 
     permission_classes = [AllowAny]
     authentication_classes = []
     parser_classes = [MultiPartParser, FormParser]
+    allowed_suffixes = ALLOWED_DOCUMENT_SUFFIXES
 
     def post(self, request):
         # The wizard posts under 'image'; the offline sync path uses 'file'.
         file_obj = request.FILES.get('image') or request.FILES.get('file')
+        if self.upload_handler.error:
+            return Response(
+                {'detail': self.upload_handler.error}, status=status.HTTP_400_BAD_REQUEST
+            )
         if not file_obj:
             return Response({'detail': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -130,8 +218,12 @@ class AILabExtractionView(APIView):
 
         from ..ai_service import extract_screening_data_from_file
 
-        with spooled_upload(file_obj, suffix) as path:
-            return ai_result_response(extract_screening_data_from_file(path))
+        with upload_source(file_obj, suffix) as (source, mime_type):
+            return ai_result_response(
+                extract_screening_data_from_file(
+                    source, mime_type=mime_type, sha256=getattr(file_obj, 'sha256', None)
+                )
+            )
 
 
 class AITextVitalsView(APIView):
@@ -0,0 +1,163 @@
+"""
+Async versions of the Gemini-backed endpoints, for ASGI deployments.
+
+The sync views in ``ai.py`` hold a worker for the whole Gemini round trip. These
+await the SDK's async client instead, so one ASGI process can keep hundreds of
+AI requests in flight. ``urls.py`` routes the AI endpoints here when
+``AI_ASYNC_VIEWS`` is set; serve the project with ``ruralhealth.asgi`` then
+(see the README). Under WSGI every async view would get its own event loop,
+which the SDK's async client cannot be shared across.
+
+Requests, validation and responses match the sync views. These are plain
+Django views, as DRF views cannot be async, and all four endpoints are public.
+"""
+
+import asyncio
+import json
+import logging
+
+from django.http import JsonResponse
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .. import ai_service
+from .ai import (
+    ALLOWED_AUDIO_SUFFIXES,
+    ALLOWED_DOCUMENT_SUFFIXES,
+    AIUploadMixin,
+    upload_source,
+    validate_upload,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def error_response(detail, status=400):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def shed_response(body, retry_after):
+    """A 503 telling the client when to retry a call that was shed to protect the server."""
+    response = JsonResponse(body, status=503)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ai_result_response(result):
+    """Translate an ai_service result dict into a JSON response."""
+    if result.get('success'):
+        return JsonResponse(result.get('data', {}), safe=False)
+    if 'retry_after' in result:
+        return shed_response({'detail': result['error']}, result['retry_after'])
+    return error_response(result.get('error', 'AI processing failed'), status=500)
+
+
+def request_payload(request):
+    """The JSON or form body of ``request``, or None when it is not valid JSON."""
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return payload if isinstance(payload, dict) else None
+    return request.POST.dict()
+
+
+async def extract_upload(uploaded_file, suffix, extract, **kwargs):
+    """Run ``extract`` on the upload, with any copy to disk kept off the event loop."""
+    source = upload_source(uploaded_file, suffix)
+    path, mime_type = await asyncio.to_thread(source.__enter__)
+    try:
+        return await extract(path, mime_type=mime_type, **kwargs)
+    finally:
+        await asyncio.to_thread(source.__exit__, None, None, None)
+
+
+class AsyncAIView(View):
+    """Base for the async AI views: POST only, and exempt from CSRF like their DRF twins."""
+
+    http_method_names = ['post', 'options']
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+
+class AIAnalysisView(AsyncAIView):
+    """Async AI health analysis; ``?refresh=true`` bypasses the result cache."""
+
+    async def post(self, request):
+        payload = request_payload(request)
+        if payload is None:
+            return error_response('Request body must be a JSON object')
+
+        use_cache = request.GET.get('refresh') != 'true'
+        try:
+            result = await ai_service.analyze_health_data_async(payload, use_cache=use_cache)
+        except Exception as exc:  # noqa: BLE001 - surfaced to the client
+            logger.exception('AI analysis endpoint failed')
+            return JsonResponse({'success': False, 'error': str(exc)}, status=500)
+        if 'retry_after' in result:
+            return shed_response(result, result['retry_after'])
+        return JsonResponse(result)
+
+
+class AIVoiceVitalsView(AIUploadMixin, AsyncAIView):
+    """Async vitals extraction from a voice recording."""
+
+    allowed_suffixes = ALLOWED_AUDIO_SUFFIXES
+
+    async def post(self, request):
+        audio_file = request.FILES.get('audio')
+        if self.upload_handler.error:
+            return error_response(self.upload_handler.error)
+        if not audio_file:
+            return error_response('No audio file provided')
+
+        suffix, error = validate_upload(audio_file, ALLOWED_AUDIO_SUFFIXES, default_suffix='.webm')
+        if error:
+            return error_response(error)
+
+        return ai_result_response(
+            await extract_upload(audio_file, suffix, ai_service.extract_vitals_from_audio_async)
+        )
+
+
+class AILabExtractionView(AIUploadMixin, AsyncAIView):
+    """Async value extraction from a lab report image or PDF."""
+
+    allowed_suffixes = ALLOWED_DOCUMENT_SUFFIXES
+
+    async def post(self, request):
+        # The wizard posts under 'image'; the offline sync path uses 'file'.
+        file_obj = request.FILES.get('image') or request.FILES.get('file')
+        if self.upload_handler.error:
+            return error_response(self.upload_handler.error)
+        if not file_obj:
+            return error_response('No file provided')
+
+        suffix, error = validate_upload(file_obj, ALLOWED_DOCUMENT_SUFFIXES, default_suffix='.jpg')
+        if error:
+            return error_response(error)
+
+        return ai_result_response(
+            await extract_upload(
+                file_obj,
+                suffix,
+                ai_service.extract_screening_data_from_file_async,
+                sha256=getattr(file_obj, 'sha256', None),
+            )
+        )
+
+
+class AITextVitalsView(AsyncAIView):
+    """Async vitals extraction from transcribed text."""
+
+    async def post(self, request):
+        payload = request_payload(request)
+        text = payload.get('text') if payload else None
+        if not text:
+            return error_response('No transcription text provided')
+
+        return ai_result_response(await ai_service.extract_vitals_from_text_async(text))
@@ -1,47 +1,124 @@
 """Shared analytics helpers plus the health-worker dashboard endpoints."""
 
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 
-from django.db.models import Count
+from django.db.models import Count, DateField, DateTimeField, Q, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncQuarter, TruncWeek
 from django.utils import timezone
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Appointment, Patient, Screening
+from .. import dashboard_cache
+from ..models import Appointment, DailyScreeningRollup, Patient, Screening
 from ..serializers import ScreeningSerializer
 
 EMPTY_RISK_DISTRIBUTION = {'Low': 0, 'Medium': 0, 'High': 0}
 
 
-def risk_distribution(screenings) -> dict:
-    """Count screenings per risk band, always returning all three keys."""
+def risk_distribution(screenings, count=None) -> dict:
+    """
+    Count screenings per risk band, always returning all three keys.
+
+    ``count`` overrides the per-band aggregate, so rollup rows can be summed
+    rather than counted.
+    """
     distribution = dict(EMPTY_RISK_DISTRIBUTION)
-    for row in screenings.values('risk_level').annotate(count=Count('id')):
+    for row in screenings.values('risk_level').annotate(count=count or Count('id')).order_by():
         if row['risk_level'] in distribution:
             distribution[row['risk_level']] = row['count']
     return distribution
 
 
-def age_distribution(patients) -> dict:
-    """Bucket patients into the reporting age bands."""
-    return {
-        '0-18': patients.filter(age__lte=18).count(),
-        '19-35': patients.filter(age__gte=19, age__lte=35).count(),
-        '36-50': patients.filter(age__gte=36, age__lte=50).count(),
-        '51-65': patients.filter(age__gte=51, age__lte=65).count(),
-        '65+': patients.filter(age__gt=65).count(),
-    }
+# Reporting age bands as (label, lowest age, highest age); ``None`` leaves a
+# side open. Bands are data so callers can swap in a different set without
+# adding queries.
+AGE_BANDS = (
+    ('0-18', None, 18),
+    ('19-35', 19, 35),
+    ('36-50', 36, 50),
+    ('51-65', 51, 65),
+    ('65+', 66, None),
+)
+
+FIVE_YEAR_AGE_BANDS = tuple(
+    (f'{lower}-{lower + 4}', lower, lower + 4) for lower in range(0, 85, 5)
+) + (('85+', 85, None),)
+
+AGE_BAND_SETS = {
+    'standard': AGE_BANDS,
+    'five_year': FIVE_YEAR_AGE_BANDS,
+}
+
+MAX_CUSTOM_AGE_BANDS = 30
+
+
+def age_band_filter(lower, upper) -> Q:
+    """Build the ``Q`` matching ages within an inclusive, possibly open band."""
+    condition = Q()
+    if lower is not None:
+        condition &= Q(age__gte=lower)
+    if upper is not None:
+        condition &= Q(age__lte=upper)
+    return condition
+
+
+def parse_age_bands(value):
+    """
+    Resolve an ``age_bands`` query parameter into a band tuple.
+
+    Accepts a preset name from ``AGE_BAND_SETS`` or a comma-separated list of
+    inclusive ranges such as ``0-17,18-59,60+``.
+
+    Raises:
+        ValueError: when the value is neither a preset nor a valid band list.
+    """
+    if not value:
+        return AGE_BANDS
+    if value in AGE_BAND_SETS:
+        return AGE_BAND_SETS[value]
+
+    bands = []
+    for token in (part.strip() for part in value.split(',')):
+        if token.endswith('+') and token[:-1].isdigit():
+            bands.append((token, int(token[:-1]), None))
+            continue
+        lower, separator, upper = token.partition('-')
+        if not (separator and lower.isdigit() and upper.isdigit()) or int(lower) > int(upper):
+            raise ValueError(f'Invalid age band "{token}"')
+        bands.append((token, int(lower), int(upper)))
+
+    if not bands or len(bands) > MAX_CUSTOM_AGE_BANDS:
+        raise ValueError(f'Provide between 1 and {MAX_CUSTOM_AGE_BANDS} age bands')
+    return tuple(bands)
+
+
+def age_distribution(patients, bands=AGE_BANDS) -> dict:
+    """
+    Bucket patients into age bands with a single conditional-aggregation query.
+
+    Every band becomes one filtered ``COUNT`` in the same ``SELECT``, so the
+    cost is one scan regardless of how many bands are requested.
+    """
+    counts = patients.aggregate(
+        **{
+            f'band_{index}': Count('id', filter=age_band_filter(lower, upper))
+            for index, (_, lower, upper) in enumerate(bands)
+        }
+    )
+    return {label: counts[f'band_{index}'] for index, (label, _, _) in enumerate(bands)}
 
 
-def month_starts(count: int):
+def month_starts(count: int, end=None):
     """
     Yield the first day of each of the last ``count`` months, oldest first.
 
     Walking back one month at a time avoids the drift that fixed 30-day
-    arithmetic introduces across months of different lengths.
+    arithmetic introduces across months of different lengths. ``end`` anchors
+    the window on a date other than today.
     """
-    cursor = timezone.now().date().replace(day=1)
+    cursor = (end or timezone.localdate()).replace(day=1)
     months = []
     for _ in range(count):
         months.append(cursor)
@@ -55,37 +132,181 @@ def month_bounds(month_start):
     return month_start, next_month - timedelta(days=1)
 
 
-def monthly_screening_trend(screenings, months: int = 6) -> list:
+# Database truncation per bucket granularity. Weeks start on Monday, matching
+# both ``TruncWeek`` and ``date.weekday()``.
+TRUNC_FUNCTIONS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+}
+
+GRANULARITIES = tuple(TRUNC_FUNCTIONS)
+
+MAX_TREND_PERIODS = 366
+
+
+def bucket_starts(granularity: str, periods: int, end=None) -> list:
+    """
+    Return the first day of each of the last ``periods`` buckets, oldest first.
+
+    Args:
+        granularity: One of ``GRANULARITIES``.
+        periods: How many buckets to cover, including the one holding ``end``.
+        end: Date anchoring the window; defaults to today.
+    """
+    end = end or timezone.localdate()
+    if granularity == 'day':
+        return [end - timedelta(days=offset) for offset in range(periods - 1, -1, -1)]
+    if granularity == 'week':
+        monday = end - timedelta(days=end.weekday())
+        return [monday - timedelta(weeks=offset) for offset in range(periods - 1, -1, -1)]
+    if granularity == 'month':
+        return month_starts(periods, end)
+    if granularity == 'quarter':
+        # The last 3n months always contain exactly n quarter starts.
+        return [month for month in month_starts(periods * 3, end) if month.month % 3 == 1]
+    raise ValueError(f'Unknown granularity "{granularity}"')
+
+
+def bucket_bounds(bucket_start, granularity: str):
+    """Return the inclusive (start, end) dates of the bucket beginning ``bucket_start``."""
+    if granularity == 'day':
+        return bucket_start, bucket_start
+    if granularity == 'week':
+        return bucket_start, bucket_start + timedelta(days=6)
+    if granularity == 'month':
+        return month_bounds(bucket_start)
+    if granularity == 'quarter':
+        next_quarter = (bucket_start + timedelta(days=95)).replace(day=1)
+        return bucket_start, next_quarter - timedelta(days=1)
+    raise ValueError(f'Unknown granularity "{granularity}"')
+
+
+def day_start(day):
+    """Midnight at the start of ``day`` in the current timezone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def bucketed_counts(queryset, granularity: str, starts, metrics: dict, field='created_at'):
+    """
+    Count ``queryset`` rows per bucket with one ``GROUP BY`` query.
+
+    The window is applied as a half-open range on ``field`` so it can use an
+    index, and buckets with no rows are filled with zeros in Python.
+
+    Args:
+        queryset: Rows to count.
+        granularity: One of ``GRANULARITIES``.
+        starts: Bucket start dates, as returned by :func:`bucket_starts`.
+        metrics: Output name -> aggregate, e.g. ``{'count': Count('id')}``.
+        field: The date or datetime field to bucket on.
+
+    Returns:
+        One ``{metric: count}`` dict per entry in ``starts``.
+    """
+    window_start = starts[0]
+    window_end = bucket_bounds(starts[-1], granularity)[1] + timedelta(days=1)
+    if isinstance(queryset.model._meta.get_field(field), DateTimeField):
+        window_start, window_end = day_start(window_start), day_start(window_end)
+    rows = (
+        queryset.filter(**{f'{field}__gte': window_start, f'{field}__lt': window_end})
+        .annotate(bucket=TRUNC_FUNCTIONS[granularity](field, output_field=DateField()))
+        .values('bucket')
+        .annotate(**metrics)
+        .order_by()
+    )
+    by_bucket = {row['bucket']: row for row in rows}
+    empty = dict.fromkeys(metrics, 0)
+    return [{name: by_bucket.get(start, empty)[name] for name in metrics} for start in starts]
+
+
+def time_series(granularity: str, periods: int, series, end=None, field='created_at') -> list:
+    """
+    Build a zero-filled time series from one grouped query per series.
+
+    Args:
+        granularity: One of ``GRANULARITIES``.
+        periods: Number of buckets, ending with the one that holds ``end``.
+        series: Iterable of ``(queryset, metrics)`` or
+            ``(queryset, metrics, field)`` tuples; every metric name becomes a
+            key on each bucket.
+        end: Date anchoring the window; defaults to today.
+        field: The field to bucket on when a series does not name its own.
+
+    Returns:
+        A list of dicts, oldest first, each carrying ``start`` (a date) plus
+        one count per metric.
+    """
+    starts = bucket_starts(granularity, periods, end)
+    buckets = [{'start': start} for start in starts]
+    for queryset, metrics, *series_field in series:
+        counts_per_bucket = bucketed_counts(
+            queryset, granularity, starts, metrics, field=series_field[0] if series_field else field
+        )
+        for bucket, counts in zip(buckets, counts_per_bucket, strict=True):
+            bucket.update(counts)
+    return buckets
+
+
+def rollup_total():
+    """Screenings summed across rollup rows, zero rather than NULL when none match."""
+    return Coalesce(Sum('screening_count'), 0)
+
+
+def rollup_metrics() -> dict:
+    """Screening and high-risk totals from rollup rows, for the trend charts."""
+    return {
+        'screenings': rollup_total(),
+        'highRisk': Coalesce(Sum('screening_count', filter=Q(risk_level='High')), 0),
+    }
+
+
+def monthly_screening_trend(rollups, months: int = 6) -> list:
     """Screening counts per month over the trailing ``months`` window."""
-    trend = []
-    for month_start in month_starts(months):
-        start, end = month_bounds(month_start)
-        trend.append(
-            {
-                'month': month_start.strftime('%b'),
-                'count': screenings.filter(
-                    created_at__date__gte=start, created_at__date__lte=end
-                ).count(),
-            }
+    return [
+        {'month': bucket['start'].strftime('%b'), 'count': bucket['count']}
+        for bucket in time_series(
+            'month', months, [(rollups, {'count': rollup_total()})], field='date'
         )
-    return trend
+    ]
 
 
-def weekly_screening_trend(screenings, days: int = 7) -> list:
+def weekly_screening_trend(rollups, days: int = 7) -> list:
     """Screening and high-risk counts for each of the last ``days`` days."""
-    today = timezone.now().date()
-    trend = []
-    for offset in range(days - 1, -1, -1):
-        day = today - timedelta(days=offset)
-        trend.append(
-            {
-                'name': day.strftime('%a'),
-                'date': day.isoformat(),
-                'screenings': screenings.filter(created_at__date=day).count(),
-                'highRisk': screenings.filter(created_at__date=day, risk_level='High').count(),
-            }
-        )
-    return trend
+    return [
+        {
+            'name': bucket['start'].strftime('%a'),
+            'date': bucket['start'].isoformat(),
+            'screenings': bucket['screenings'],
+            'highRisk': bucket['highRisk'],
+        }
+        for bucket in time_series('day', days, [(rollups, rollup_metrics())], field='date')
+    ]
+
+
+def parse_trend_window(query_params):
+    """
+    Read an optional ``granularity``/``periods`` trend request.
+
+    Returns:
+        ``(granularity, periods)``, or ``None`` when no trend was requested.
+
+    Raises:
+        ValueError: when either parameter is invalid.
+    """
+    granularity = query_params.get('granularity')
+    if not granularity:
+        return None
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity must be one of: {", ".join(GRANULARITIES)}')
+    try:
+        periods = int(query_params.get('periods', 12))
+    except (TypeError, ValueError) as exc:
+        raise ValueError('periods must be an integer') from exc
+    if not 1 <= periods <= MAX_TREND_PERIODS:
+        raise ValueError(f'periods must be between 1 and {MAX_TREND_PERIODS}')
+    return granularity, periods
 
 
 def scope_for(user):
@@ -106,13 +327,38 @@ def scope_for(user):
     return patients, screenings, appointments
 
 
+def rollups_for(user):
+    """Return the ``DailyScreeningRollup`` rows visible to ``user``, matching ``scope_for``."""
+    if user.role == 'health_worker':
+        return DailyScreeningRollup.objects.filter(health_worker=user)
+    return DailyScreeningRollup.objects.all()
+
+
+def cache_scope(user) -> str:
+    """Return the dashboard-cache scope holding what ``scope_for(user)`` shows."""
+    if user.role == 'health_worker':
+        return dashboard_cache.worker_scope(user.id)
+    return dashboard_cache.GLOBAL_SCOPE
+
+
 class DashboardStatsView(APIView):
     """Get dashboard statistics for the signed-in user's scope."""
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        patients, screenings, appointments = scope_for(request.user)
+        return Response(
+            dashboard_cache.get_or_compute(
+                cache_scope(request.user),
+                'dashboard_stats',
+                request.query_params,
+                lambda: self.build(request.user),
+            )
+        )
+
+    def build(self, user):
+        patients, screenings, appointments = scope_for(user)
+        rollups = rollups_for(user)
 
         pending_appointments = appointments.filter(
             status='scheduled', scheduled_date__gte=timezone.now()
@@ -120,20 +366,18 @@ class DashboardStatsView(APIView):
 
         recent_screenings = screenings.select_related('patient').order_by('-created_at')[:10]
 
-        return Response(
-            {
-                'total_patients': patients.count(),
-                'total_screenings': screenings.count(),
-                'high_risk_count': screenings.filter(risk_level='High')
-                .values('patient')
-                .distinct()
-                .count(),
-                'pending_appointments': pending_appointments,
-                'risk_distribution': risk_distribution(screenings),
-                'weekly_screenings': weekly_screening_trend(screenings),
-                'recent_screenings': ScreeningSerializer(recent_screenings, many=True).data,
-            }
-        )
+        return {
+            'total_patients': patients.count(),
+            'total_screenings': screenings.count(),
+            'high_risk_count': screenings.filter(risk_level='High')
+            .values('patient')
+            .distinct()
+            .count(),
+            'pending_appointments': pending_appointments,
+            'risk_distribution': risk_distribution(rollups, rollup_total()),
+            'weekly_screenings': weekly_screening_trend(rollups),
+            'recent_screenings': ScreeningSerializer(recent_screenings, many=True).data,
+        }
 
 
 class AnalyticsView(APIView):
@@ -142,7 +386,24 @@ class AnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        patients, screenings, _ = scope_for(request.user)
+        try:
+            bands = parse_age_bands(request.query_params.get('age_bands'))
+            trend_window = parse_trend_window(request.query_params)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            dashboard_cache.get_or_compute(
+                cache_scope(request.user),
+                'analytics',
+                request.query_params,
+                lambda: self.build(request.user, bands, trend_window),
+            )
+        )
+
+    def build(self, user, bands, trend_window):
+        patients, screenings, _ = scope_for(user)
+        rollups = rollups_for(user)
 
         village_stats = (
             patients.values('village')
@@ -150,17 +411,32 @@ class AnalyticsView(APIView):
             .order_by('-patient_count')[:10]
         )
 
-        return Response(
-            {
-                'village_stats': list(village_stats),
-                'age_distribution': age_distribution(patients),
-                'gender_distribution': list(patients.values('gender').annotate(count=Count('id'))),
-                'monthly_trend': monthly_screening_trend(screenings),
-                'risk_factor_counts': {
-                    'High BP': screenings.filter(systolic_bp__gt=140).count(),
-                    'High Glucose': screenings.filter(glucose_level__gt=140).count(),
-                    'High Cholesterol': screenings.filter(cholesterol_level__gt=200).count(),
-                    'Smoking': screenings.filter(smoking_status='Current').count(),
-                },
-            }
-        )
+        data = {
+            'village_stats': list(village_stats),
+            'age_distribution': age_distribution(patients, bands),
+            'gender_distribution': list(patients.values('gender').annotate(count=Count('id'))),
+            'monthly_trend': monthly_screening_trend(rollups),
+            'risk_factor_counts': {
+                'High BP': screenings.filter(systolic_bp__gt=140).count(),
+                'High Glucose': screenings.filter(glucose_level__gt=140).count(),
+                'High Cholesterol': screenings.filter(cholesterol_level__gt=200).count(),
+                'Smoking': screenings.filter(smoking_status='Current').count(),
+            },
+        }
+
+        # Opt-in chart at any granularity: ?granularity=week&periods=12.
+        if trend_window:
+            granularity, periods = trend_window
+            data['trend'] = [
+                {**bucket, 'start': bucket['start'].isoformat()}
+                for bucket in time_series(
+                    granularity,
+                    periods,
+                    [
+                        (rollups, rollup_metrics(), 'date'),
+                        (patients, {'patients': Count('id')}),
+                    ],
+                )
+            ]
+
+        return data
@@ -11,12 +11,14 @@ from ..serializers import (
     AppointmentSerializer,
     RecommendationSerializer,
 )
+from .listing import KeysetListMixin
 
 
-class AppointmentListCreateView(generics.ListCreateAPIView):
-    """List and create appointments."""
+class AppointmentListCreateView(KeysetListMixin, generics.ListCreateAPIView):
+    """List (cursor-paginated, latest scheduled first) and create appointments."""
 
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ('-scheduled_date', '-id')
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -24,7 +26,7 @@ class AppointmentListCreateView(generics.ListCreateAPIView):
         return AppointmentSerializer
 
     def get_queryset(self):
-        queryset = Appointment.objects.all()
+        queryset = Appointment.objects.select_related('patient', 'health_worker')
 
         # Health workers only see appointments they own.
         if self.request.user.role == 'health_worker':
@@ -59,14 +61,15 @@ class AppointmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = AppointmentSerializer
 
 
-class RecommendationListView(generics.ListAPIView):
-    """List recommendations."""
+class RecommendationListView(KeysetListMixin, generics.ListAPIView):
+    """List recommendations, cursor-paginated in priority order."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = RecommendationSerializer
+    keyset_ordering = ('-priority', '-created_at', '-id')
 
     def get_queryset(self):
-        queryset = Recommendation.objects.all()
+        queryset = Recommendation.objects.select_related('patient')
 
         # Health workers only see recommendations for their own patients.
         if self.request.user.role == 'health_worker':
@@ -0,0 +1,48 @@
+"""Shared delivery for the list endpoints: keyset pages, or an NDJSON stream for officers."""
+
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from ..pagination import ORDERING, KeysetPagination
+
+STREAM_CHUNK_SIZE = 500
+
+
+def ndjson_rows(queryset, serializer_class, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield ``queryset`` as newline-delimited JSON, one serialized row per line."""
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield json.dumps(serializer_class(row).data, cls=JSONEncoder) + '\n'
+
+
+class KeysetListMixin:
+    """
+    Page a list view with :class:`KeysetPagination`.
+
+    Health officers may pass ``stream=true`` to receive the whole filtered
+    list as ``application/x-ndjson`` instead. Rows are read through
+    ``.iterator()`` and serialized one at a time, so memory stays flat however
+    many rows match.
+    """
+
+    pagination_class = KeysetPagination
+    keyset_ordering = ORDERING
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('stream') != 'true':
+            return super().list(request, *args, **kwargs)
+
+        if not request.user.is_health_officer():
+            return Response(
+                {'detail': 'Only health officers can stream full lists'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*self.keyset_ordering)
+        return StreamingHttpResponse(
+            ndjson_rows(queryset, self.get_serializer_class()),
+            content_type='application/x-ndjson',
+        )
@@ -9,7 +9,15 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from ..models import Appointment, Patient, Screening
+from .. import dashboard_cache
+from ..models import Appointment, DailyScreeningRollup, Patient, Screening
+from ..pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ORDERING,
+    estimated_count,
+    keyset_page,
+)
 from ..permissions import IsHealthOfficer
 from ..responses import first_error_message
 from ..serializers import (
@@ -18,25 +26,63 @@ from ..serializers import (
     ScreeningSerializer,
     WorkerStatusUpdateSerializer,
 )
-from .analytics import age_distribution, month_bounds, month_starts, risk_distribution
+from .analytics import (
+    age_distribution,
+    parse_age_bands,
+    risk_distribution,
+    rollup_total,
+    time_series,
+)
 from .patients import filter_patients
 
 User = get_user_model()
 
-DEFAULT_PAGE_SIZE = 20
-MAX_PAGE_SIZE = 100
+DEFAULT_TOP_WORKERS = 10
+MAX_TOP_WORKERS = 100
+
+
+def with_caseload_stats(workers):
+    """
+    Annotate ``workers`` with their caseload counters in a single query.
+
+    Patients and screenings are joined and counted per worker in one grouped
+    ``SELECT``, so listing any number of workers is one round trip rather than
+    three queries per worker.
+    """
+    return workers.annotate(
+        total_patients=Count('patients', distinct=True),
+        total_screenings=Count('patients__screenings', distinct=True),
+        high_risk_patients=Count(
+            'patients__screenings',
+            filter=Q(patients__screenings__risk_level='High'),
+            distinct=True,
+        ),
+    )
 
 
 def worker_stats(worker) -> dict:
-    """Caseload counters for a single health worker."""
-    screenings = Screening.objects.filter(patient__health_worker=worker)
+    """Caseload counters for a worker annotated by :func:`with_caseload_stats`."""
     return {
-        'total_patients': Patient.objects.filter(health_worker=worker).count(),
-        'total_screenings': screenings.count(),
-        'high_risk_patients': screenings.filter(risk_level='High').count(),
+        'total_patients': worker.total_patients,
+        'total_screenings': worker.total_screenings,
+        'high_risk_patients': worker.high_risk_patients,
     }
 
 
+def completion_rate(worker) -> float:
+    """Screenings per registered patient, as a percentage."""
+    return round((worker.total_screenings / worker.total_patients) * 100, 1)
+
+
+def top_workers_limit(query_params) -> int:
+    """Read the ``top_workers`` limit, falling back to the default when unusable."""
+    try:
+        limit = int(query_params.get('top_workers', DEFAULT_TOP_WORKERS))
+    except (TypeError, ValueError):
+        return DEFAULT_TOP_WORKERS
+    return min(max(1, limit), MAX_TOP_WORKERS)
+
+
 def serialize_worker(worker) -> dict:
     """Public representation of a health worker account."""
     return {
@@ -54,7 +100,9 @@ class HealthWorkerListView(APIView):
     permission_classes = [IsHealthOfficer]
 
     def get(self, request):
-        workers = User.objects.filter(role='health_worker').order_by('-date_joined')
+        workers = with_caseload_stats(User.objects.filter(role='health_worker')).order_by(
+            '-date_joined'
+        )
 
         return Response(
             [{**serialize_worker(worker), 'stats': worker_stats(worker)} for worker in workers]
@@ -102,25 +150,41 @@ class OfficerDashboardStatsView(APIView):
     permission_classes = [IsHealthOfficer]
 
     def get(self, request):
+        return Response(
+            dashboard_cache.get_or_compute(
+                dashboard_cache.GLOBAL_SCOPE,
+                'officer_dashboard_stats',
+                request.query_params,
+                lambda: self.build(top_workers_limit(request.query_params)),
+            )
+        )
+
+    def build(self, top_workers_count):
         screenings = Screening.objects.all()
 
-        def distinct_patients_at(level):
-            return screenings.filter(risk_level=level).values('patient').distinct().count()
-
-        monthly_trend = []
-        for month_start in month_starts(6):
-            start, end = month_bounds(month_start)
-            monthly_trend.append(
-                {
-                    'month': month_start.strftime('%b %Y'),
-                    'screenings': screenings.filter(
-                        created_at__date__gte=start, created_at__date__lte=end
-                    ).count(),
-                    'patients': Patient.objects.filter(
-                        created_at__date__gte=start, created_at__date__lte=end
-                    ).count(),
-                }
+        # Each patient counts once, in the band of their latest screening.
+        risk_distribution = Patient.objects.aggregate(
+            **{
+                level: Count('id', filter=Q(latest_risk_level=level))
+                for level in ('Low', 'Medium', 'High')
+            }
+        )
+
+        monthly_trend = [
+            {
+                'month': bucket['start'].strftime('%b %Y'),
+                'screenings': bucket['screenings'],
+                'patients': bucket['patients'],
+            }
+            for bucket in time_series(
+                'month',
+                6,
+                [
+                    (DailyScreeningRollup.objects.all(), {'screenings': rollup_total()}, 'date'),
+                    (Patient.objects.all(), {'patients': Count('id')}),
+                ],
             )
+        ]
 
         village_stats = (
             Patient.objects.values('village')
@@ -128,26 +192,20 @@ class OfficerDashboardStatsView(APIView):
             .order_by('-patient_count')[:10]
         )
 
-        # Rank active workers by screening volume, dropping those with none.
-        top_workers = sorted(
-            (
-                {
-                    'id': worker.id,
-                    'name': worker.full_name or worker.email,
-                    'screenings': count,
-                }
-                for worker, count in (
-                    (
-                        worker,
-                        Screening.objects.filter(patient__health_worker=worker).count(),
-                    )
-                    for worker in User.objects.filter(role='health_worker', is_active=True)
-                )
-                if count > 0
-            ),
-            key=lambda row: row['screenings'],
-            reverse=True,
-        )[:10]
+        # Rank active workers by screening volume in SQL, dropping those with none.
+        ranked_workers = (
+            with_caseload_stats(User.objects.filter(role='health_worker', is_active=True))
+            .filter(total_screenings__gt=0)
+            .order_by('-total_screenings', 'id')[:top_workers_count]
+        )
+        top_workers = [
+            {
+                'id': worker.id,
+                'name': worker.full_name or worker.email,
+                'screenings': worker.total_screenings,
+            }
+            for worker in ranked_workers
+        ]
 
         high_risk_cases = (
             screenings.filter(risk_level='High')
@@ -155,42 +213,40 @@ class OfficerDashboardStatsView(APIView):
             .order_by('-created_at')[:10]
         )
 
-        return Response(
-            {
-                'overview': {
-                    'total_patients': Patient.objects.count(),
-                    'total_screenings': screenings.count(),
-                    'total_workers': User.objects.filter(role='health_worker').count(),
-                    'active_workers': User.objects.filter(
-                        role='health_worker', is_active=True
-                    ).count(),
-                    'high_risk_count': distinct_patients_at('High'),
-                    'pending_appointments': Appointment.objects.filter(
-                        status='scheduled', scheduled_date__gte=timezone.now()
-                    ).count(),
-                },
-                'risk_distribution': {
-                    'Low': distinct_patients_at('Low'),
-                    'Medium': distinct_patients_at('Medium'),
-                    'High': distinct_patients_at('High'),
-                },
-                'monthly_trend': monthly_trend,
-                'village_stats': list(village_stats),
-                'top_workers': top_workers,
-                'recent_high_risk': ScreeningSerializer(high_risk_cases, many=True).data,
-            }
-        )
+        return {
+            'overview': {
+                'total_patients': Patient.objects.count(),
+                'total_screenings': screenings.count(),
+                'total_workers': User.objects.filter(role='health_worker').count(),
+                'active_workers': User.objects.filter(role='health_worker', is_active=True).count(),
+                'high_risk_count': risk_distribution['High'],
+                'pending_appointments': Appointment.objects.filter(
+                    status='scheduled', scheduled_date__gte=timezone.now()
+                ).count(),
+            },
+            'risk_distribution': risk_distribution,
+            'monthly_trend': monthly_trend,
+            'village_stats': list(village_stats),
+            'top_workers': top_workers,
+            'recent_high_risk': ScreeningSerializer(high_risk_cases, many=True).data,
+        }
 
 
 class AllPatientsView(APIView):
-    """Get all patients across all health workers, paginated."""
+    """
+    Get all patients across all health workers, paginated.
+
+    Passing ``cursor`` (empty for the first page) switches from ``page``
+    numbers to keyset pagination: each response carries the ``next_cursor``
+    to send back, and ``total`` is an estimate unless ``include_total=true``.
+    A ``search`` is ranked by relevance, which a cursor cannot resume, so it
+    is paged by number only.
+    """
 
     permission_classes = [IsHealthOfficer]
 
     def get(self, request):
-        patients = filter_patients(
-            Patient.objects.all().order_by('-created_at'), request.query_params
-        )
+        patients = filter_patients(Patient.objects.order_by(*ORDERING), request.query_params)
 
         try:
             page = max(1, int(request.query_params.get('page', 1)))
@@ -202,6 +258,10 @@ class AllPatientsView(APIView):
             )
 
         page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+
+        if 'cursor' in request.query_params:
+            return self.cursor_page(request, patients, page_size)
+
         start = (page - 1) * page_size
 
         return Response(
@@ -213,6 +273,31 @@ class AllPatientsView(APIView):
             }
         )
 
+    def cursor_page(self, request, patients, page_size):
+        if request.query_params.get('search'):
+            return Response(
+                {'detail': 'Search results are ranked; page through them with page, not cursor'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            rows, next_cursor = keyset_page(patients, request.query_params['cursor'], page_size)
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get('include_total') == 'true':
+            total, is_estimate = patients.count(), False
+        else:
+            total, is_estimate = estimated_count(patients)
+        return Response(
+            {
+                'total': total,
+                'total_is_estimate': is_estimate,
+                'page_size': page_size,
+                'next_cursor': next_cursor,
+                'results': PatientSerializer(rows, many=True).data,
+            }
+        )
+
 
 class SystemAnalyticsView(APIView):
     """Get system-wide analytics."""
@@ -220,6 +305,21 @@ class SystemAnalyticsView(APIView):
     permission_classes = [IsHealthOfficer]
 
     def get(self, request):
+        try:
+            bands = parse_age_bands(request.query_params.get('age_bands'))
+        except ValueError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            dashboard_cache.get_or_compute(
+                dashboard_cache.GLOBAL_SCOPE,
+                'system_analytics',
+                request.query_params,
+                lambda: self.build(bands),
+            )
+        )
+
+    def build(self, bands):
         screenings = Screening.objects.all()
         total_screenings = screenings.count()
 
@@ -239,20 +339,17 @@ class SystemAnalyticsView(APIView):
             else {}
         )
 
-        worker_completion = []
-        for worker in User.objects.filter(role='health_worker'):
-            patient_count = Patient.objects.filter(health_worker=worker).count()
-            if not patient_count:
-                continue
-            screening_count = Screening.objects.filter(patient__health_worker=worker).count()
-            worker_completion.append(
-                {
-                    'worker_name': worker.full_name or worker.email,
-                    'patients': patient_count,
-                    'screenings': screening_count,
-                    'completion_rate': round((screening_count / patient_count) * 100, 1),
-                }
-            )
+        worker_completion = [
+            {
+                'worker_name': worker.full_name or worker.email,
+                'patients': worker.total_patients,
+                'screenings': worker.total_screenings,
+                'completion_rate': completion_rate(worker),
+            }
+            for worker in with_caseload_stats(User.objects.filter(role='health_worker'))
+            .filter(total_patients__gt=0)
+            .order_by('id')
+        ]
 
         geographic_data = (
             Patient.objects.values('village')
@@ -263,17 +360,15 @@ class SystemAnalyticsView(APIView):
             .order_by('-total')
         )
 
-        return Response(
-            {
-                'age_distribution': age_distribution(Patient.objects.all()),
-                'gender_distribution': list(
-                    Patient.objects.values('gender').annotate(count=Count('id'))
-                ),
-                'risk_factor_prevalence': risk_factor_percentages,
-                'worker_performance': worker_completion,
-                'geographic_distribution': list(geographic_data),
-            }
-        )
+        return {
+            'age_distribution': age_distribution(Patient.objects.all(), bands),
+            'gender_distribution': list(
+                Patient.objects.values('gender').annotate(count=Count('id'))
+            ),
+            'risk_factor_prevalence': risk_factor_percentages,
+            'worker_performance': worker_completion,
+            'geographic_distribution': list(geographic_data),
+        }
 
 
 class UpdateWorkerStatusView(APIView):
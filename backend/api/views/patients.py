@@ -1,12 +1,12 @@
 """Patient CRUD and history endpoints."""
 
-from django.db.models import Q
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from ..models import Appointment, Patient, Recommendation, Screening
+from ..search import search_patients
 from ..serializers import (
     AppointmentSerializer,
     PatientCreateSerializer,
@@ -24,21 +24,19 @@ def filter_patients(queryset, query_params, user=None):
     Used by both the health-worker patient list and the officer-wide list so the
     two stay in step.
     """
+    # Ranked by relevance, with the incoming ordering breaking ties.
     search = query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(full_name__icontains=search)
-            | Q(village__icontains=search)
-            | Q(phone__icontains=search)
-        )
+        queryset = search_patients(queryset, search)
 
     village = query_params.get('village')
     if village:
         queryset = queryset.filter(village__icontains=village)
 
+    # A patient's band is that of their latest screening, not any they ever had.
     risk = query_params.get('risk')
     if risk:
-        queryset = queryset.filter(screenings__risk_level=risk).distinct()
+        queryset = queryset.filter(latest_risk_level=risk)
 
     worker_id = query_params.get('health_worker_id')
     # Only officers may slice the list by an arbitrary health worker.
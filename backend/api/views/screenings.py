@@ -1,14 +1,18 @@
-"""Screening creation with risk scoring and AI enrichment."""
+"""Screening creation, single and in bulk, with risk scoring and queued AI enrichment."""
 
 import logging
 
+from django.db import transaction
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from .. import dashboard_cache, enrichment, patient_summary, rollups
 from ..models import Patient, Recommendation, Screening
 from ..risk import build_recommendations, calculate_risk
 from ..serializers import ScreeningCreateSerializer, ScreeningSerializer
+from .listing import KeysetListMixin
 
 logger = logging.getLogger(__name__)
 
@@ -40,50 +44,20 @@ SCREENING_FIELDS = (
     'total_bilirubin',
 )
 
-
-def attach_ai_insights(screening, patient, data, assessment):
-    """
-    Ask Gemini to interpret the screening and store the markdown insight.
-
-    Failures are logged and swallowed: a missing AI narrative must never block
-    the health worker from recording a screening.
-    """
-    from ..ai_service import analyze_health_data
-
-    ai_data = {field: data.get(field) for field in SCREENING_FIELDS}
-    ai_data.update(
-        {
-            'age': patient.age,
-            'gender': patient.gender,
-            'risk_level': assessment.level,
-            'risk_score': assessment.score,
-        }
-    )
-
-    try:
-        result = analyze_health_data(ai_data)
-    except Exception:  # noqa: BLE001 - screening creation must still succeed
-        logger.exception('AI analysis raised during screening creation')
-        return
-
-    if not result.get('success'):
-        logger.info(
-            'AI analysis unavailable for screening %s: %s',
-            screening.id,
-            result.get('error'),
-        )
-        return
-
-    screening.ai_insights = result['analysis'].get('formatted_insights')
-    screening.save(update_fields=['ai_insights'])
+# Most screenings one bulk request may carry, bounding its transaction and response.
+MAX_BULK_SCREENINGS = 500
 
 
 def record_screening(patient, data):
     """
-    Score, persist and enrich one screening for ``patient``.
+    Score and persist one screening for ``patient``, queueing its AI enrichment.
 
     Shared by the health-worker endpoint and the patient self-screening portal
-    so both paths produce identically scored records.
+    so both paths produce identically scored records, and written through
+    ``record_screenings`` so a single screening takes the same one insert per
+    table, in one transaction, as a batch does. Gemini is not called
+    here: the screening is returned with ``ai_status='pending'`` and
+    ``run_ai_worker`` fills in ``ai_insights`` later (see api/enrichment.py).
 
     Args:
         patient: The Patient the screening belongs to.
@@ -92,26 +66,58 @@ def record_screening(patient, data):
     Returns:
         The saved Screening instance.
     """
-    assessment = calculate_risk(data)
+    (screening,) = record_screenings([(patient, data)])
+    return screening
 
-    screening = Screening.objects.create(
-        patient=patient,
-        risk_score=assessment.score,
-        risk_level=assessment.level,
-        risk_notes=assessment.notes_text,
-        **{field: data.get(field) for field in SCREENING_FIELDS},
-    )
 
-    for recommendation in build_recommendations(assessment.notes, assessment.level):
-        Recommendation.objects.create(patient=patient, screening=screening, **recommendation)
+def record_screenings(entries):
+    """
+    Score and persist a batch of screenings in one transaction.
 
-    attach_ai_insights(screening, patient, data, assessment)
+    Screenings and their recommendations are written with ``bulk_create``, the
+    rollup and patient summaries take one statement per key and patient, and AI
+    enrichment is queued with a single insert, so the round trips per request
+    do not grow with the batch. ``bulk_create`` sends no signals, so the
+    affected dashboards are invalidated here, once the batch has committed.
 
-    return screening
+    Args:
+        entries: ``(patient, data)`` pairs, ``data`` validated by
+            ``ScreeningCreateSerializer``.
 
+    Returns:
+        The saved Screening instances, in ``entries`` order.
+    """
+    assessments = [calculate_risk(data) for _, data in entries]
+
+    with transaction.atomic():
+        screenings = Screening.objects.bulk_create(
+            Screening(
+                patient=patient,
+                risk_score=assessment.score,
+                risk_level=assessment.level,
+                risk_notes=assessment.notes_text,
+                **{field: data.get(field) for field in SCREENING_FIELDS},
+            )
+            for (patient, data), assessment in zip(entries, assessments, strict=True)
+        )
+        Recommendation.objects.bulk_create(
+            Recommendation(patient=screening.patient, screening=screening, **recommendation)
+            for screening, assessment in zip(screenings, assessments, strict=True)
+            for recommendation in build_recommendations(assessment.notes, assessment.level)
+        )
 
-class ScreeningListCreateView(generics.ListCreateAPIView):
-    """List and create screenings with risk calculation."""
+        rollups.add_screenings(screenings)
+        patient_summary.note_screenings(screenings)
+        enrichment.enqueue_many(screenings)
+        dashboard_cache.invalidate_workers_on_commit(
+            *{screening.patient.health_worker_id for screening in screenings}
+        )
+
+    return screenings
+
+
+class ScreeningListCreateView(KeysetListMixin, generics.ListCreateAPIView):
+    """List (newest first, cursor-paginated) and create screenings with risk calculation."""
 
     permission_classes = [IsAuthenticated]
 
@@ -121,7 +127,7 @@ class ScreeningListCreateView(generics.ListCreateAPIView):
         return ScreeningSerializer
 
     def get_queryset(self):
-        queryset = Screening.objects.all().order_by('-created_at')
+        queryset = Screening.objects.select_related('patient')
 
         # Health workers only see screenings belonging to their own patients.
         if self.request.user.role == 'health_worker':
@@ -146,3 +152,113 @@ class ScreeningListCreateView(generics.ListCreateAPIView):
         screening = record_screening(patient, data)
 
         return Response(ScreeningSerializer(screening).data, status=status.HTTP_201_CREATED)
+
+
+class ScreeningDetailView(generics.RetrieveAPIView):
+    """
+    Get one screening; clients poll this until ``ai_status`` leaves ``pending``.
+
+    Health workers see their own patients' screenings and patients their own.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ScreeningSerializer
+
+    def get_queryset(self):
+        queryset = Screening.objects.select_related('patient')
+        user = self.request.user
+        if user.role == 'health_worker':
+            queryset = queryset.filter(patient__health_worker=user)
+        elif user.role == 'patient':
+            queryset = queryset.filter(patient__user=user)
+        return queryset
+
+
+class ScreeningBulkCreateView(APIView):
+    """
+    Create many screenings in one request, for the offline sync queue.
+
+    The body is ``{"screenings": [...]}``; each item is the single-create
+    payload plus an optional ``client_id`` echoed back in its result. Items are
+    validated together against patients resolved in one query, every valid item
+    is written in one transaction, and invalid items are reported per index
+    without blocking the rest. Health workers may only write to their own
+    patients and patients to their own record.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('screenings') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'screenings must be a non-empty list'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(items) > MAX_BULK_SCREENINGS:
+            return Response(
+                {'detail': f'At most {MAX_BULK_SCREENINGS} screenings per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        patients = self.writable_patients().in_bulk(requested_patient_ids(items))
+        context = {'patient_ids': patients.keys()}
+
+        results = []
+        entries = []
+        for index, item in enumerate(items):
+            result = {'index': index, 'client_id': None}
+            if isinstance(item, dict):
+                result['client_id'] = item.get('client_id')
+            serializer = ScreeningCreateSerializer(data=item, context=context)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                entries.append((patients[data['patient_id']], data))
+                result['status'] = 'created'
+            else:
+                result.update(status='invalid', errors=serializer.errors)
+            results.append(result)
+
+        created = iter(record_screenings(entries) if entries else [])
+        for result in results:
+            if result['status'] == 'created':
+                screening = next(created)
+                result.update(
+                    id=screening.id,
+                    risk_level=screening.risk_level,
+                    risk_score=screening.risk_score,
+                    ai_status=screening.ai_status,
+                )
+
+        failed = len(items) - len(entries)
+        if not entries:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_201_CREATED
+        return Response(
+            {'created': len(entries), 'failed': failed, 'results': results},
+            status=response_status,
+        )
+
+    def writable_patients(self):
+        user = self.request.user
+        if user.role == 'health_worker':
+            return Patient.objects.filter(health_worker=user)
+        if user.role == 'patient':
+            return Patient.objects.filter(user=user)
+        return Patient.objects.all()
+
+
+def requested_patient_ids(items) -> set:
+    """The well-formed ``patient_id`` values in ``items``; the serializer reports the rest."""
+    ids = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            ids.add(int(item.get('patient_id')))
+        except (TypeError, ValueError):
+            continue
+    return ids
@@ -0,0 +1,7 @@
+"""
+Standalone performance benchmarks.
+
+Each module runs against its own throwaway database and prints a report; run
+them from ``backend/`` with ``python -m benchmarks.<name>``. They are not part
+of the test suite.
+"""
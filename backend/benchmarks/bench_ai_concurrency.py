@@ -0,0 +1,157 @@
+"""
+AI endpoint concurrency benchmark: sync workers vs one async process.
+
+Fires the same burst of ``/api/ai/text-vitals`` requests at:
+
+* ``sync``: the DRF view on ``--workers`` threads, standing in for the
+  gunicorn sync workers in the Dockerfile (one request per worker at a time);
+* ``async``: the ASGI view from ``api/views/ai_async.py`` on one event loop,
+  with up to ``--concurrency`` requests in flight.
+
+Gemini is replaced by a stub that answers after ``--latency`` seconds, sleeping
+the worker for the sync view and awaiting for the async one, so the numbers
+show how each model copes with waiting on the network rather than with
+Gemini itself. Every request arrives at once, so response times include the
+wait for a free worker. Views are called directly; middleware is left out of
+both. The rule-based dictation parser is turned off, since it would answer
+the transcript without calling Gemini at all.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_ai_concurrency [--requests 150] [--latency 0.5]
+        [--workers 3] [--concurrency 150]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .common import print_table, setup_django
+
+RESPONSE = '{"systolic_bp": 120, "diastolic_bp": 80, "heart_rate": 72}'
+
+
+class StubResponse:
+    text = RESPONSE
+
+
+class StubModel:
+    """Answers like Gemini after a fixed delay, counting the requests it serves."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = []
+
+    def generate_content(self, contents, request_options=None, generation_config=None):
+        self.calls.append(contents)
+        time.sleep(self.latency)
+        return StubResponse()
+
+    async def generate_content_async(self, contents, request_options=None, generation_config=None):
+        self.calls.append(contents)
+        await asyncio.sleep(self.latency)
+        return StubResponse()
+
+
+def text_request():
+    from django.test import RequestFactory
+
+    return RequestFactory().post(
+        '/api/ai/text-vitals',
+        json.dumps({'text': 'BP 120 over 80, pulse 72'}),
+        content_type='application/json',
+    )
+
+
+def run_sync(count, workers):
+    """Response times (s) and wall time (s) for the sync view on ``workers`` threads."""
+    from api.views import ai
+
+    view = ai.AITextVitalsView.as_view()
+
+    def one(_):
+        response = view(text_request())
+        response.render()
+        assert response.status_code == 200, response.content
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(one, range(count)))
+    return latencies, time.perf_counter() - start
+
+
+def run_async(count, concurrency):
+    """Response times (s) and wall time (s) for the async view on one event loop."""
+    from api.views import ai_async
+
+    view = ai_async.AITextVitalsView.as_view()
+
+    async def burst():
+        slots = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with slots:
+                response = await view(text_request())
+                assert response.status_code == 200, response.content
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(one() for _ in range(count)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(burst())
+    return latencies, time.perf_counter() - start
+
+
+def summarize(name, latencies, wall):
+    ordered = sorted(latencies)
+    return (
+        name,
+        f'{len(latencies) / wall:.1f}',
+        f'{statistics.median(ordered) * 1000:.0f}',
+        f'{ordered[int(len(ordered) * 0.95) - 1] * 1000:.0f}',
+        f'{wall:.2f}',
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=150)
+    parser.add_argument('--latency', type=float, default=0.5, help='Stub Gemini seconds.')
+    parser.add_argument(
+        '--workers', type=int, default=3, help='Sync workers, as in the Dockerfile.'
+    )
+    parser.add_argument('--concurrency', type=int, default=150, help='Async in-flight cap.')
+    args = parser.parse_args(argv)
+
+    os.environ['GEMINI_API_KEY'] = 'benchmark-placeholder-key'
+    # Let the burst through: the bulkhead would otherwise shed it at 4 in flight.
+    os.environ['AI_MAX_CONCURRENCY'] = str(max(args.workers, args.concurrency))
+    # Every request must wait on the stub, not be read locally.
+    os.environ['AI_DICTATION_PARSER'] = 'False'
+    setup_django()
+
+    from api import ai_service
+
+    stub = StubModel(args.latency)
+    ai_service.get_model = lambda model_name=ai_service.DEFAULT_MODEL: stub
+
+    rows = [
+        summarize(f'sync, {args.workers} workers', *run_sync(args.requests, args.workers)),
+        summarize(
+            f'async, 1 process (<= {args.concurrency} in flight)',
+            *run_async(args.requests, args.concurrency),
+        ),
+    ]
+    assert len(stub.calls) == 2 * args.requests, 'some requests never reached the Gemini stub'
+
+    print(f'\n{args.requests} text-vitals requests, Gemini stubbed at {args.latency}s each\n')
+    print_table(['deployment', 'req/s', 'p50 ms', 'p95 ms', 'wall s'], rows)
+
+
+if __name__ == '__main__':
+    main()
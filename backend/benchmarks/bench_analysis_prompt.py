@@ -0,0 +1,208 @@
+"""
+Health-analysis prompt benchmark: tokens in and out and latency per screening.
+
+Runs ``analyze_health_data`` over a corpus of screenings, from a bare blood
+pressure reading to a full lab workup, once with the previous prompt and
+once with the compact one in ``api/analysis_prompt.py``. The previous
+prompt listed every field, ``None`` included, and had Gemini write the two
+markdown documents as well; the compact one lists what was measured and the
+documents are rendered from the answer instead.
+
+Tokens are estimated with ``analysis_prompt.estimate_tokens``. Gemini is
+replaced by a stub that answers with the same assessment each time, adding
+the markdown documents when the prompt asks for them, and that takes
+``--prefill-ms`` per prompt token plus ``--decode-ms`` per answer token.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_analysis_prompt [--prefill-ms 0.1] [--decode-ms 4]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from .common import print_table, setup_django
+
+VITALS = {'age': 52, 'gender': 'Male', 'systolic_bp': 150, 'diastolic_bp': 95, 'heart_rate': 84}
+BMI = {'height_cm': 168, 'weight_kg': 82}
+LAB = {'glucose_level': 182, 'cholesterol_level': 236}
+HEMATOLOGY = {'hemoglobin': 10.4, 'wbc_count': 7800, 'platelet_count': 210000}
+METABOLIC = {'blood_urea_nitrogen': 22, 'creatinine': 1.3, 'sodium': 138, 'potassium': 4.6}
+LIVER = {'alt_sgpt': 48, 'ast_sgot': 41, 'albumin': 3.9, 'total_bilirubin': 0.9}
+LIFESTYLE = {'smoking_status': 'Current', 'physical_activity': 'Sedentary'}
+RISK = {'risk_level': 'High', 'risk_score': 7}
+
+CORPUS = [
+    ('BP only', {'systolic_bp': 150, 'diastolic_bp': 95}),
+    ('vitals', VITALS),
+    ('vitals + BMI', {**VITALS, **BMI}),
+    ('vitals + sugar', {**VITALS, **BMI, **LAB, **RISK}),
+    ('lifestyle', {**VITALS, **LIFESTYLE, **RISK}),
+    ('blood count', {**VITALS, **HEMATOLOGY, **RISK}),
+    ('full workup', {**VITALS, **BMI, **LAB, **HEMATOLOGY, **METABOLIC, **LIVER, **LIFESTYLE}),
+    (
+        'full + risk',
+        {**VITALS, **BMI, **LAB, **HEMATOLOGY, **METABOLIC, **LIVER, **LIFESTYLE, **RISK},
+    ),
+]
+
+ANSWER = {
+    'summary': (
+        'Stage 2 hypertension with raised fasting glucose and cholesterol. '
+        'Mild anaemia and borderline creatinine need follow-up.'
+    ),
+    'summary_hi': (
+        'स्टेज 2 उच्च रक्तचाप के साथ शुगर और कोलेस्ट्रॉल बढ़ा हुआ है। '
+        'हल्की खून की कमी और सीमा पर क्रिएटिनिन की जांच आगे करानी है।'
+    ),
+    'concerns': [
+        'Uncontrolled hypertension',
+        'Possible diabetes',
+        'High cholesterol',
+        'Mild anaemia',
+        'Early kidney strain',
+    ],
+    'concerns_hi': [
+        'अनियंत्रित उच्च रक्तचाप',
+        'संभावित मधुमेह',
+        'उच्च कोलेस्ट्रॉल',
+        'हल्की खून की कमी',
+        'गुर्दे पर शुरुआती दबाव',
+    ],
+    'recommendations': [
+        'Refer to the PHC doctor this week',
+        'Repeat fasting sugar and HbA1c',
+        'Cut salt and fried food',
+        'Iron and folic acid tablets',
+        'Walk 30 minutes daily',
+    ],
+    'recommendations_hi': [
+        'इस सप्ताह पीएचसी डॉक्टर को दिखाएं',
+        'खाली पेट शुगर और HbA1c दोबारा जांचें',
+        'नमक और तला भोजन कम करें',
+        'आयरन और फोलिक एसिड की गोलियां',
+        'रोज़ 30 मिनट पैदल चलें',
+    ],
+}
+
+
+def previous_prompt(data):
+    """The analysis prompt before it was compacted, kept for comparison."""
+    return f"""
+        You are an expert medical AI assistant for rural health workers.
+        Analyze this patient's screening data and provide a clinical assessment.
+
+        Patient Data:
+        - Age: {data.get('age')} | Gender: {data.get('gender')}
+        - Vitals: BP {data.get('systolic_bp')}/{data.get('diastolic_bp')}, HR {data.get('heart_rate')}
+        - BMI Data: Height {data.get('height_cm')}cm, Weight {data.get('weight_kg')}kg
+        - Lab: Glucose {data.get('glucose_level')} mg/dL, Chol {data.get('cholesterol_level')} mg/dL
+        - Hematology: Hb {data.get('hemoglobin')}, WBC {data.get('wbc_count')}, Plt {data.get('platelet_count')}
+        - Metabolic: BUN {data.get('blood_urea_nitrogen')}, Cr {data.get('creatinine')}, Na {data.get('sodium')}, K {data.get('potassium')}
+        - Liver: ALT {data.get('alt_sgpt')}, AST {data.get('ast_sgot')}, Alb {data.get('albumin')}, Bilirubin {data.get('total_bilirubin')}
+        - Lifestyle: Smoking: {data.get('smoking_status')}, Activity: {data.get('physical_activity')}
+        - Computed Risk: {data.get('risk_level')} (Score: {data.get('risk_score')})
+
+        Output valid JSON with these fields:
+        1. "summary": A professional clinical summary focusing on any abnormalities.
+        2. "summary_hi": Same as summary but in Hindi.
+        3. "concerns": List of strings for key health risks.
+        4. "concerns_hi": Same as concerns but in Hindi.
+        5. "recommendations": List of strings for actionable advice.
+        6. "recommendations_hi": Same as recommendations but in Hindi.
+        7. "formatted_insights": A markdown string exactly matching this structure:
+           "**Medical Diagnostic Overview**\\n\\nThe screening reveals a **[Risk Level]** clinical status. Significant findings include [Findings].\\n\\n**Diagnostic Details:**\\n- [Detail 1]\\n- [Detail 2]\\n\\n**Clinical Guidance:**\\n1. [Guidance 1]\\n2. [Guidance 2]"
+        8. "formatted_insights_hi": Same formatted insights but in Hindi.
+        """  # noqa: E501
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+def install_stub(prefill_ms, decode_ms, usage):
+    """Replace Gemini with a stub whose latency follows the tokens in and out."""
+    from api import ai_service
+    from api import analysis_prompt as builder
+
+    def try_generate_content(prompt, model_name=None, **options):
+        answer = dict(ANSWER)
+        if 'formatted_insights' in prompt:
+            for key, language in (('formatted_insights', 'en'), ('formatted_insights_hi', 'hi')):
+                answer[key] = builder.insights(ANSWER, 'High', language)
+        text = json.dumps(answer, ensure_ascii=False)
+        tokens_in, tokens_out = builder.estimate_tokens(prompt), builder.estimate_tokens(text)
+        usage.append((tokens_in, tokens_out))
+        time.sleep((prefill_ms * tokens_in + decode_ms * tokens_out) / 1000)
+        return StubResponse(text)
+
+    ai_service.try_generate_content = try_generate_content
+
+
+def run(screenings, usage):
+    """``[(tokens in, tokens out, ms)]`` for analysing each screening once."""
+    from api import ai_service
+
+    measured = []
+    for data in screenings:
+        usage.clear()
+        start = time.perf_counter()
+        result = ai_service.analyze_health_data(data, use_cache=False)
+        elapsed = (time.perf_counter() - start) * 1000
+        assert result['success'], result
+        assert result['analysis']['formatted_insights_hi'], result
+        (tokens,) = usage
+        measured.append((*tokens, elapsed))
+    return measured
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--prefill-ms', type=float, default=0.1, help='Stub ms per prompt token.')
+    parser.add_argument('--decode-ms', type=float, default=4, help='Stub ms per answer token.')
+    args = parser.parse_args(argv)
+
+    os.environ['GEMINI_API_KEY'] = 'benchmark-placeholder-key'
+    os.environ['AI_CACHE_TTL'] = '0'
+    setup_django()
+
+    from api import ai_service
+
+    usage = []
+    install_stub(args.prefill_ms, args.decode_ms, usage)
+    screenings = [data for _, data in CORPUS]
+    compact_prompt = ai_service.analysis_prompt
+    ai_service.analysis_prompt = previous_prompt
+    before = run(screenings, usage)
+    ai_service.analysis_prompt = compact_prompt
+    after = run(screenings, usage)
+
+    rows = []
+    for (label, _), old, new in zip(CORPUS, before, after, strict=True):
+        rows.append(
+            (
+                label,
+                f'{old[0]} -> {new[0]}',
+                f'{old[1]} -> {new[1]}',
+                f'{old[2]:,.0f} -> {new[2]:,.0f}',
+            )
+        )
+
+    print(
+        f'\nHealth analysis, {len(CORPUS)} screenings, Gemini stubbed at '
+        f'{args.prefill_ms} ms/token in and {args.decode_ms} ms/token out\n'
+    )
+    print_table(['screening', 'tokens in', 'tokens out', 'ms'], rows)
+    for column, name in [(0, 'tokens in'), (1, 'tokens out'), (2, 'latency')]:
+        old = statistics.mean(sample[column] for sample in before)
+        new = statistics.mean(sample[column] for sample in after)
+        print(f'\nMean {name}: {old:,.0f} -> {new:,.0f} ({1 - new / old:.0%} less)', end='')
+    print()
+
+
+if __name__ == '__main__':
+    main()
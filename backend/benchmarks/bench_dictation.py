@@ -0,0 +1,137 @@
+"""
+Dictated-vitals benchmark: Gemini calls avoided and latency per transcript.
+
+Runs ``extract_vitals_from_text`` over a corpus of transcripts twice, with
+the rule-based parser in ``api/dictation.py`` off and on. For each run it
+reports how many transcripts reached Gemini and the p50 and p95 time per
+transcript. Gemini is replaced by a stub that answers after ``--latency``
+seconds.
+
+The built-in corpus mixes what health workers dictate: plain vitals in
+English and Hindi, number words, and entries with a name, a village or
+habits that only Gemini can read. Pass ``--corpus`` a file with one
+transcript per line to measure real ones instead.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_dictation [--corpus FILE] [--latency 0.5]
+"""
+
+import argparse
+import os
+import statistics
+import time
+from pathlib import Path
+
+from .common import print_table, setup_django
+
+CORPUS = [
+    'BP 130 over 85, pulse 72, weight 64',
+    'bp one twenty over eighty',
+    'blood pressure 140/90 heart rate 88 bpm',
+    'pulse seventy two',
+    'weight sixty four kilo, height one sixty two centimeters',
+    'height 5 feet 4 inches weight 58 kg',
+    'BP is one thirty five over eighty five and pulse is seventy eight',
+    'sugar one hundred and forty',
+    'random blood sugar 210 mg/dl',
+    'hemoglobin nine point eight',
+    'hb 11.2, platelets 180',
+    'cholesterol 230',
+    'age 52, male, bp 150 by 95',
+    '45 years old female',
+    'weight 150 pounds',
+    'बीपी 130 बटा 85, नाड़ी 72, वजन 64 किलो',
+    'बीपी १४० बटा ९०',
+    'उम्र 60 साल, महिला, शुगर 180',
+    'वजन 55 किलो, लंबाई 150 सेंटीमीटर',
+    'umar 38 saal, vajan 70 kilo, bp 120 bata 80',
+    'nadi 90, bp 110 bata 70',
+    '64 kilo vajan hai',
+    'pressure 160 over 100, pulse 96',
+    'heart rate one hundred and four',
+    'bp 118/76',
+    'Ramesh Kumar from Rampur, age 45, BP 130 over 85',
+    'patient Sunita Devi, village Bhadohi, weight 52',
+    'smokes about ten bidis a day, bp 150 over 95',
+    'drinks alcohol on weekends, pulse 80',
+    'she walks every morning, sugar 126 fasting',
+    'temperature ninety nine point four, bp 120 over 80',
+    'BP was 130 over 85 earlier and now 140 over 90',
+    'complains of headache since two days, bp 160 over 100',
+    'phone number 98765 43210, age 30',
+    'मरीज़ का नाम सीता, गांव रामपुर, बीपी 120 बटा 80',
+    'धूम्रपान नहीं करते, वजन 60 किलो',
+    'pulse 72 over 80',
+    'weight unknown, height 165 cm',
+    'gender other, age 28',
+    'bp 400 over 200',
+]
+
+
+class StubResponse:
+    text = '{"systolic_bp": 130, "diastolic_bp": 85, "heart_rate": 72}'
+
+
+def install_stub(latency, calls):
+    """Replace Gemini with a stub that answers after ``latency`` seconds."""
+    from api import ai_service
+
+    def try_generate_content(prompt, model_name=None):
+        calls.append(prompt)
+        time.sleep(latency)
+        return StubResponse()
+
+    ai_service.try_generate_content = try_generate_content
+
+
+def run(transcripts, calls):
+    """``(Gemini calls, p50 ms, p95 ms)`` for extracting each transcript once."""
+    from api import ai_service
+
+    calls.clear()
+    samples = []
+    for text in transcripts:
+        start = time.perf_counter()
+        result = ai_service.extract_vitals_from_text(text)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert result['success'], result
+    quantiles = statistics.quantiles(samples, n=20, method='inclusive')
+    return len(calls), statistics.median(samples), quantiles[18]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--corpus', help='File of transcripts, one per line; built-in if omitted.')
+    parser.add_argument('--latency', type=float, default=0.5, help='Stub Gemini seconds.')
+    args = parser.parse_args(argv)
+
+    os.environ['GEMINI_API_KEY'] = 'benchmark-placeholder-key'
+    setup_django()
+
+    from django.conf import settings
+
+    if args.corpus:
+        lines = Path(args.corpus).read_text(encoding='utf-8').splitlines()
+        transcripts = [line.strip() for line in lines if line.strip()]
+    else:
+        transcripts = CORPUS
+
+    calls = []
+    install_stub(args.latency, calls)
+    rows = []
+    measured = {}
+    for label, enabled in [('off', False), ('on', True)]:
+        settings.AI_DICTATION_PARSER = enabled
+        measured[label] = run(transcripts, calls)
+        gemini_calls, p50, p95 = measured[label]
+        rows.append((label, len(transcripts), gemini_calls, f'{p50:,.1f}', f'{p95:,.1f}'))
+
+    print(f'\nDictated vitals, {len(transcripts)} transcripts, Gemini stubbed at {args.latency}s\n')
+    print_table(['parser', 'transcripts', 'Gemini calls', 'p50 ms', 'p95 ms'], rows)
+    avoided = len(transcripts) - measured['on'][0]
+    print(f'\nGemini calls avoided: {avoided / len(transcripts):.0%}')
+
+
+if __name__ == '__main__':
+    main()
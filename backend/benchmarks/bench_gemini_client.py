@@ -0,0 +1,106 @@
+"""
+Gemini client setup benchmark: what an AI call pays before its network round trip.
+
+Compares, per call:
+
+* ``new model per call``: the previous ``get_model``, a fresh
+  ``GenerativeModel`` that looks up its client on first use, reproduced here;
+* ``registry``: the current ``get_model``, reusing the process's instance;
+* ``first call, cold``: the first call in a new worker, which also configures
+  the SDK and creates the API client;
+* ``first call after warm_up``: the same, once ``warm_up`` has run at boot.
+
+Nothing is sent to Gemini: a placeholder key is used unless one is set, and
+every case stops where ``generate_content`` would start the request.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_gemini_client [--calls 2000] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from google.generativeai import client
+
+from .common import print_table, setup_django
+
+
+def ensure_client(model):
+    """What ``generate_content`` does before its request: attach the API client."""
+    if model._client is None:
+        model._client = client.get_default_generative_client()
+    return model
+
+
+def per_call(setup, calls):
+    """Mean microseconds ``setup`` takes over ``calls`` calls."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        setup()
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def first_call(setup, warm_up=None, repeat=20):
+    """
+    Median microseconds of the first ``setup`` in a freshly booted worker.
+
+    The registry is cleared before each sample, so the SDK is configured again
+    and its clients rebuilt, then ``warm_up`` runs untimed if given.
+    """
+    from api import ai_service
+
+    samples = []
+    for _ in range(repeat):
+        ai_service.clear_models()
+        if warm_up:
+            warm_up()
+        start = time.perf_counter()
+        setup()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('GEMINI_API_KEY', 'benchmark-placeholder-key')
+    setup_django()
+
+    import google.generativeai as genai
+
+    from api import ai_service
+
+    model_name = ai_service.DEFAULT_MODEL
+
+    def previous():
+        ensure_client(genai.GenerativeModel(model_name))
+
+    def registry():
+        ensure_client(ai_service.get_model(model_name))
+
+    def warm_up():
+        ai_service.warm_up([model_name], ping=False)
+
+    # Steady state: the registry's model already holds its client.
+    registry()
+    steady = per_call(registry, args.calls)
+    rows = [
+        ('new model per call (previous)', per_call(previous, args.calls)),
+        ('registry', steady),
+        ('first call, cold', first_call(registry, repeat=args.repeat)),
+        ('first call after warm_up', first_call(registry, warm_up, args.repeat)),
+    ]
+    rows = [(name, f'{us:.1f}', f'{us / steady:.1f}x') for name, us in rows]
+
+    print(f'\nModel {model_name}; setup cost per AI call, excluding the network round trip\n')
+    print_table(['case', 'us/call', 'vs registry'], rows)
+
+
+if __name__ == '__main__':
+    main()
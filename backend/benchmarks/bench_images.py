@@ -0,0 +1,190 @@
+"""
+Lab-report photo benchmark: bytes sent to Gemini and extraction latency.
+
+Runs ``extract_screening_data_from_file`` over a set of report photos twice,
+with the preprocessing in ``api/images.py`` off and on, and reports for each
+photo the bytes uploaded and the end-to-end time.
+
+Gemini is replaced by a stub: the upload sleeps for the time the bytes would
+take over a ``--uplink-mbps`` link, and the model answers after
+``--latency`` seconds. Preprocessing runs in the real worker pool.
+
+Without ``--fixtures`` the photos are synthetic: a printed report page shot
+at phone-camera resolution, with sensor noise, in JPEG and PNG. Point
+``--fixtures`` at a directory of real ``.jpg``/``.png``/``.webp`` photos to
+measure those instead.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_images [--fixtures DIR] [--uplink-mbps 4]
+        [--latency 1.5] [--repeat 3]
+"""
+
+import argparse
+import io
+import mimetypes
+import os
+import time
+from functools import partial
+from pathlib import Path
+
+from .common import print_table, setup_django, timed
+
+RESPONSE = '{"hemoglobin": 13.2, "glucose_level": 104, "creatinine": 0.9}'
+
+REPORT_LINES = [
+    'DISTRICT HOSPITAL LABORATORY - BIOCHEMISTRY REPORT',
+    'Patient: Ramesh Kumar   Age/Sex: 42/M   Ref: PHC Rampur',
+    'Test                      Result     Units      Reference range',
+    'Haemoglobin               13.2       g/dL       13.0 - 17.0',
+    'Fasting blood glucose     104        mg/dL      70 - 100',
+    'Blood urea nitrogen       14         mg/dL      7 - 20',
+    'Serum creatinine          0.9        mg/dL      0.7 - 1.3',
+    'Sodium                    139        mmol/L     135 - 145',
+    'Potassium                 4.2        mmol/L     3.5 - 5.1',
+    'SGPT (ALT)                32         U/L        7 - 56',
+    'Total cholesterol         212        mg/dL      < 200',
+]
+
+
+def synthetic_photo(size, format):
+    """A report page photographed at ``size``: tinted paper, text and sensor noise."""
+    from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+    width, height = size
+    page = Image.new('RGB', size, (236, 230, 214))
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=height // 45)
+    for row, line in enumerate(REPORT_LINES * 3):
+        draw.text(
+            (width // 12, height // 12 + row * height // 40), line, fill=(30, 30, 40), font=font
+        )
+    noise = Image.effect_noise(size, 24).convert('RGB')
+    photo = ImageChops.overlay(page, noise)
+
+    output = io.BytesIO()
+    photo.save(output, format=format, **({'quality': 92} if format == 'JPEG' else {}))
+    return output.getvalue()
+
+
+def fixtures(directory):
+    """``(name, bytes, mime_type)`` for each photo to measure."""
+    if directory is None:
+        return [
+            ('12 MP JPEG (synthetic)', synthetic_photo((4032, 3024), 'JPEG'), 'image/jpeg'),
+            ('8 MP JPEG (synthetic)', synthetic_photo((3264, 2448), 'JPEG'), 'image/jpeg'),
+            ('5 MP PNG screenshot (synthetic)', synthetic_photo((2592, 1944), 'PNG'), 'image/png'),
+        ]
+    found = []
+    for path in sorted(Path(directory).iterdir()):
+        mime_type = mimetypes.guess_type(path.name)[0]
+        if mime_type in {'image/jpeg', 'image/png', 'image/webp'}:
+            found.append((path.name, path.read_bytes(), mime_type))
+    return found
+
+
+class StubResponse:
+    text = RESPONSE
+
+
+class StubModel:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def generate_content(self, contents, request_options=None):
+        time.sleep(self.latency)
+        return StubResponse()
+
+
+def install_stubs(uplink_mbps, latency, sent):
+    """Replace the Gemini upload and model; record the bytes each upload sends."""
+    from api import ai_service
+
+    def upload_file(path, mime_type=None):
+        size = os.path.getsize(path) if isinstance(path, str) else len(path.getvalue())
+        sent.append(size)
+        time.sleep(size * 8 / (uplink_mbps * 1_000_000))
+        return 'uploaded-file'
+
+    model = StubModel(latency)
+    ai_service.genai.upload_file = upload_file
+    ai_service.get_model = lambda model_name=ai_service.DEFAULT_MODEL: model
+
+
+def measure(content, mime_type, repeat, sent):
+    """``(ms, bytes uploaded)`` for extracting from one photo."""
+    from api import ai_service, images
+
+    def extract():
+        result = ai_service.extract_screening_data_from_file(io.BytesIO(content), mime_type)
+        assert result['success'], result
+
+    images.prepare(io.BytesIO(content), mime_type)  # Starts the pool outside the timing.
+    sent.clear()
+    return timed(extract, repeat), sent[-1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--fixtures', help='Directory of report photos; synthetic if omitted.')
+    parser.add_argument('--uplink-mbps', type=float, default=4, help='Backhaul to Gemini.')
+    parser.add_argument('--latency', type=float, default=1.5, help='Stub model seconds.')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    os.environ['GEMINI_API_KEY'] = 'benchmark-placeholder-key'
+    os.environ['AI_EXTRACTION_CACHE_TTL'] = '0'
+    # A full-size photo over a slow uplink can outlast the production deadline,
+    # and would trip the breaker's latency limit; measure it regardless.
+    os.environ['AI_TIMEOUT_SECONDS'] = '3600'
+    os.environ['AI_BREAKER_P95_SECONDS'] = '3600'
+    setup_django()
+
+    from django.conf import settings
+
+    from api import images
+
+    sent = []
+    install_stubs(args.uplink_mbps, args.latency, sent)
+    max_side = settings.AI_IMAGE_MAX_SIDE
+
+    rows = []
+    saved_total = original_total = 0
+    try:
+        for name, content, mime_type in fixtures(args.fixtures):
+            measured = {}
+            for label, side in [('off', 0), ('on', max_side)]:
+                settings.AI_IMAGE_MAX_SIDE = side
+                measured[label] = measure(content, mime_type, args.repeat, sent)
+
+            prep_ms = timed(partial(images.prepare, io.BytesIO(content), mime_type), args.repeat)
+            (off_ms, off_bytes), (on_ms, on_bytes) = measured['off'], measured['on']
+            original_total += off_bytes
+            saved_total += off_bytes - on_bytes
+            rows.append(
+                (
+                    name,
+                    f'{off_bytes / 1024:,.0f}',
+                    f'{on_bytes / 1024:,.0f}',
+                    f'{(off_bytes - on_bytes) / off_bytes:.0%}',
+                    f'{prep_ms:.0f}',
+                    f'{off_ms:,.0f}',
+                    f'{on_ms:,.0f}',
+                )
+            )
+    finally:
+        images.shutdown_pool()
+
+    print(
+        f'\nLab-report extraction, {args.uplink_mbps:g} Mbit/s uplink, model stubbed at '
+        f'{args.latency}s, AI_IMAGE_MAX_SIDE={max_side}\n'
+    )
+    print_table(
+        ['photo', 'KiB before', 'KiB sent', 'saved', 'prep ms', 'e2e ms off', 'e2e ms on'], rows
+    )
+    if original_total:
+        print(f'\nBytes saved overall: {saved_total / original_total:.0%}')
+
+
+if __name__ == '__main__':
+    main()
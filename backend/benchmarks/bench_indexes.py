@@ -0,0 +1,260 @@
+"""
+Before/after benchmark for the hot-path indexes added in migration 0010.
+
+Seeds a synthetic district, then runs the querysets the list views and
+dashboards actually build, first with the schema migrated back to 0009 and
+again after 0010, printing each query plan and the median timings.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_indexes [--patients 20000] [--database-url URL]
+
+Without ``--database-url`` a temporary SQLite database is used. A URL must
+point at a scratch database: the benchmark migrates it backwards and fills it
+with synthetic rows.
+"""
+
+import argparse
+import random
+from datetime import timedelta
+
+from .common import explicit_timestamps, print_table, setup_django, timed
+
+BEFORE = '0009_patient_created_id_index'
+AFTER = '0010_hot_path_indexes'
+
+VILLAGES = ['Chandpur', 'Rampur', 'Sitapur', 'Bhagwanpur', 'Kishanganj', 'Madhopur']
+RISK_WEIGHTS = {'Low': 70, 'Medium': 22, 'High': 8}
+STATUS_WEIGHTS = {'scheduled': 30, 'completed': 55, 'cancelled': 10, 'missed': 5}
+
+
+def weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def seed(patients, workers, screenings_per_patient, seed_value):
+    """Fill the database with a reproducible synthetic district."""
+    from django.utils import timezone
+
+    from api.models import Appointment, Patient, Recommendation, Screening, User
+
+    rng = random.Random(seed_value)
+    now = timezone.now()
+
+    staff = User.objects.bulk_create(
+        User(
+            username=f'bench-worker-{index}@example.com',
+            email=f'bench-worker-{index}@example.com',
+            role='health_worker',
+        )
+        for index in range(workers)
+    )
+    officer = User.objects.create(
+        username='bench-officer@example.com',
+        email='bench-officer@example.com',
+        role='health_officer',
+    )
+
+    with explicit_timestamps(Patient, Screening, Appointment, Recommendation):
+        people = Patient.objects.bulk_create(
+            (
+                Patient(
+                    full_name=f'Patient {index}',
+                    age=rng.randint(1, 90),
+                    gender=rng.choice(['Male', 'Female']),
+                    village=rng.choice(VILLAGES),
+                    health_worker=rng.choice(staff),
+                    created_at=now - timedelta(days=rng.randint(0, 730)),
+                )
+                for index in range(patients)
+            ),
+            batch_size=2000,
+        )
+
+        screenings = Screening.objects.bulk_create(
+            (
+                Screening(
+                    patient=person,
+                    risk_level=weighted(rng, RISK_WEIGHTS),
+                    risk_score=rng.uniform(0, 100),
+                    systolic_bp=rng.randint(95, 190),
+                    created_at=person.created_at
+                    + timedelta(days=rng.randint(0, max(0, (now - person.created_at).days))),
+                )
+                for person in people
+                for _ in range(screenings_per_patient)
+            ),
+            batch_size=2000,
+        )
+
+        Appointment.objects.bulk_create(
+            (
+                Appointment(
+                    patient=person,
+                    health_worker=person.health_worker,
+                    scheduled_date=now + timedelta(days=rng.randint(-365, 60)),
+                    reason='Follow-up',
+                    status=weighted(rng, STATUS_WEIGHTS),
+                    created_at=person.created_at,
+                )
+                for person in people
+            ),
+            batch_size=2000,
+        )
+
+        Recommendation.objects.bulk_create(
+            (
+                Recommendation(
+                    patient=screening.patient,
+                    screening=screening,
+                    category='lifestyle',
+                    title='Walk daily',
+                    description='30 minutes of brisk walking.',
+                    is_completed=rng.random() < 0.6,
+                    created_at=screening.created_at,
+                )
+                for screening in screenings
+            ),
+            batch_size=2000,
+        )
+
+    return staff[0], officer, people[0]
+
+
+def view_queryset(view_class, user, params=None):
+    """Build ``view_class``'s queryset for ``user`` exactly as a GET request would."""
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    request = Request(APIRequestFactory().get('/', params or {}))
+    request.user = user
+    view = view_class()
+    view.setup(request)
+    view.request = request
+    view.format_kwarg = None
+    return view.get_queryset()
+
+
+def build_cases(worker, officer, patient):
+    """``(name, queryset, run)`` for each hot path: the plan is taken from ``queryset``."""
+    from django.db.models import Count
+    from django.utils import timezone
+
+    from api.models import Appointment, Screening
+    from api.pagination import ORDERING, keyset_page
+    from api.views import AppointmentListCreateView, RecommendationListView, ScreeningListCreateView
+    from api.views.analytics import bucket_starts, bucketed_counts, scope_for
+
+    now = timezone.now()
+    patients, _, appointments = scope_for(worker)
+    worker_screenings = view_queryset(ScreeningListCreateView, worker)
+    high_risk = view_queryset(ScreeningListCreateView, officer, {'risk': 'High'})
+    recent_high_risk = Screening.objects.filter(risk_level='High').order_by('-created_at')[:10]
+    history = Screening.objects.filter(patient=patient).order_by('-created_at')
+    pending = appointments.filter(status='scheduled', scheduled_date__gte=now)
+    all_pending = Appointment.objects.filter(status='scheduled', scheduled_date__gte=now)
+    scheduled = view_queryset(AppointmentListCreateView, worker, {'status': 'scheduled'})
+    open_recommendations = view_queryset(
+        RecommendationListView, officer, {'patient_id': patient.id, 'incomplete': 'true'}
+    )
+    recommendation_order = RecommendationListView.keyset_ordering
+    months = bucket_starts('month', 12)
+    registrations = patients.filter(created_at__gte=now - timedelta(days=366))
+
+    return [
+        (
+            'worker screening list, first page',
+            worker_screenings.order_by(*ORDERING)[:21],
+            lambda: keyset_page(worker_screenings, '', 20),
+        ),
+        (
+            'screening list ?risk=High',
+            high_risk.order_by(*ORDERING)[:21],
+            lambda: keyset_page(high_risk, '', 20),
+        ),
+        (
+            'officer recent high-risk cases',
+            recent_high_risk,
+            lambda: list(recent_high_risk.all()),
+        ),
+        ("patient's screening history", history, lambda: list(history.all())),
+        ('worker pending appointments', pending, pending.count),
+        ('system-wide pending appointments', all_pending, all_pending.count),
+        (
+            'worker appointments ?status=scheduled',
+            scheduled.order_by(*AppointmentListCreateView.keyset_ordering)[:21],
+            lambda: keyset_page(scheduled, '', 20, AppointmentListCreateView.keyset_ordering),
+        ),
+        (
+            "patient's open recommendations",
+            open_recommendations.order_by(*recommendation_order)[:21],
+            lambda: keyset_page(open_recommendations, '', 20, recommendation_order),
+        ),
+        (
+            'worker monthly registrations',
+            registrations,
+            lambda: bucketed_counts(patients, 'month', months, {'patients': Count('id')}),
+        ),
+    ]
+
+
+def measure(label, cases, repeat):
+    print(f'\n=== {label} ===')
+    timings = {}
+    for name, queryset, run in cases:
+        print(f'\n-- {name}\n{queryset.explain()}')
+        timings[name] = timed(run, repeat)
+    return timings
+
+
+def analyze():
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--patients', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=40)
+    parser.add_argument('--screenings-per-patient', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=7, help='Timed runs per query.')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--database-url', help='A scratch database; defaults to temporary SQLite.')
+    args = parser.parse_args(argv)
+
+    database_url = setup_django(args.database_url)
+
+    from django.core.management import call_command
+
+    print(f'Database: {database_url}')
+    call_command('migrate', verbosity=0)
+    call_command('migrate', 'api', BEFORE, verbosity=0)
+    worker, officer, patient = seed(
+        args.patients, args.workers, args.screenings_per_patient, args.seed
+    )
+    analyze()
+    before = measure(f'before ({BEFORE})', build_cases(worker, officer, patient), args.repeat)
+
+    call_command('migrate', 'api', AFTER, verbosity=0)
+    analyze()
+    after = measure(f'after ({AFTER})', build_cases(worker, officer, patient), args.repeat)
+
+    print()
+    print_table(
+        ['query', 'before ms', 'after ms', 'speed-up'],
+        [
+            (
+                name,
+                f'{before[name]:.2f}',
+                f'{after[name]:.2f}',
+                f'{before[name] / after[name]:.1f}x',
+            )
+            for name in before
+        ],
+    )
+
+
+if __name__ == '__main__':
+    main()
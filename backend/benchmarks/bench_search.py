@@ -0,0 +1,88 @@
+"""
+Patient search benchmark: the plain substring scan against the indexed backend.
+
+Seeds synthetic patients, then times ``search_patients`` for a set of typical
+partial-name, village and phone terms with the backend the database selects
+and with ``PATIENT_SEARCH_BACKEND = 'basic'``.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_search [--patients 200000] [--database-url URL]
+"""
+
+import argparse
+import random
+
+from .common import print_table, setup_django, timed
+
+FIRST_NAMES = ['Ramesh', 'Sunita', 'Kamla', 'Arjun', 'Pooja', 'Mohan', 'Anita', 'Suresh', 'Geeta']
+LAST_NAMES = ['Kumar', 'Devi', 'Yadav', 'Singh', 'Sharma', 'Verma', 'Gupta', 'Mehta', 'Khan']
+VILLAGES = ['Chandpur', 'Rampur', 'Sitapur', 'Bhagwanpur', 'Kishanganj', 'Madhopur']
+
+TERMS = ['ames', 'sunita dev', 'kishan', '98765', 'zzzz']
+
+
+def seed(count, seed_value):
+    from api.models import Patient
+
+    rng = random.Random(seed_value)
+    Patient.objects.bulk_create(
+        (
+            Patient(
+                full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index}',
+                age=rng.randint(1, 90),
+                gender=rng.choice(['Male', 'Female']),
+                village=rng.choice(VILLAGES),
+                phone=f'9{rng.randint(0, 999_999_999):09d}',
+            )
+            for index in range(count)
+        ),
+        batch_size=5000,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--patients', type=int, default=200_000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--database-url', help='A scratch database; defaults to temporary SQLite.')
+    args = parser.parse_args(argv)
+
+    database_url = setup_django(args.database_url)
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+
+    from api import search
+    from api.models import Patient
+
+    print(f'Database: {database_url}')
+    call_command('migrate', verbosity=0)
+    seed(args.patients, args.seed)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+    indexed = search.backend_name(connection)
+    patients = Patient.objects.order_by('-created_at', '-id')
+
+    def first_page(term):
+        return lambda: list(search.search_patients(patients, term)[: args.page_size])
+
+    rows = []
+    for term in TERMS:
+        settings.PATIENT_SEARCH_BACKEND = 'basic'
+        basic = timed(first_page(term), args.repeat)
+        settings.PATIENT_SEARCH_BACKEND = 'auto'
+        fast = timed(first_page(term), args.repeat)
+        matches = search.search_patients(patients, term).count()
+        rows.append((repr(term), matches, f'{basic:.1f}', f'{fast:.1f}', f'{basic / fast:.1f}x'))
+
+    print(f'\n{args.patients} patients, first page of {args.page_size}\n')
+    print_table(['term', 'matches', 'basic ms', f'{indexed} ms', 'speed-up'], rows)
+
+
+if __name__ == '__main__':
+    main()
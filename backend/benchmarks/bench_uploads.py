@@ -0,0 +1,106 @@
+"""
+AI upload hand-off benchmark: disk writes and latency before Gemini sees a file.
+
+Compares, for the two ways Django stores an upload (a temporary file above
+``FILE_UPLOAD_MAX_MEMORY_SIZE``, memory below it):
+
+* ``spooled_upload``: the previous path, which copied every upload into a
+  second temporary file;
+* ``upload_source``: the current path, which passes on Django's temporary
+  file or the in-memory file object.
+
+Bytes written come from ``/proc/self/io`` where the platform has it.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_uploads [--large-mb 20] [--small-kb 512] [--repeat 10]
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+from .common import print_table, setup_django, timed
+
+PROC_IO = Path('/proc/self/io')
+
+
+def bytes_written():
+    """Bytes this process has passed to write() so far, or None off Linux."""
+    if not PROC_IO.exists():
+        return None
+    for line in PROC_IO.read_text().splitlines():
+        if line.startswith('wchar:'):
+            return int(line.split()[1])
+    return None
+
+
+def temporary_upload(content):
+    """An upload as Django's ``TemporaryFileUploadHandler`` leaves it."""
+    from django.core.files.uploadedfile import TemporaryUploadedFile
+
+    uploaded = TemporaryUploadedFile('report.pdf', 'application/pdf', len(content), None)
+    uploaded.write(content)
+    uploaded.flush()
+    return uploaded
+
+
+def memory_upload(content):
+    """An upload as Django's ``MemoryFileUploadHandler`` leaves it."""
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    return SimpleUploadedFile('report.pdf', content, 'application/pdf')
+
+
+def hand_off_previous(uploaded):
+    from api.views.ai import spooled_upload
+
+    with spooled_upload(uploaded, '.pdf') as path:
+        return path
+
+
+def hand_off_current(uploaded):
+    from api.views.ai import upload_source
+
+    with upload_source(uploaded, '.pdf') as (source, _):
+        return source
+
+
+def measure(hand_off, uploaded, repeat):
+    """``(KiB written, ms)`` for one hand-off of ``uploaded``."""
+    before = bytes_written()
+    hand_off(uploaded)
+    after = bytes_written()
+    written = f'{(after - before) / 1024:.0f}' if before is not None else 'n/a'
+    return written, f'{timed(lambda: hand_off(uploaded), repeat=repeat):.2f}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--large-mb', type=float, default=20)
+    parser.add_argument('--small-kb', type=float, default=512)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    setup_django()
+
+    uploads = [
+        (f'{args.large_mb:g} MB, temporary file', temporary_upload, args.large_mb * 1024 * 1024),
+        (f'{args.small_kb:g} KB, in memory', memory_upload, args.small_kb * 1024),
+    ]
+    rows = []
+    for label, make, size in uploads:
+        uploaded = make(os.urandom(int(size)))
+        for name, hand_off in [
+            ('spooled_upload (previous)', hand_off_previous),
+            ('upload_source', hand_off_current),
+        ]:
+            rows.append((label, name, *measure(hand_off, uploaded, args.repeat)))
+        uploaded.close()
+
+    print('\nPer upload, from the parsed request to a source Gemini can read\n')
+    print_table(['upload', 'hand-off', 'KiB written', 'ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
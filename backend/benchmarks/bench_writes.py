@@ -0,0 +1,133 @@
+"""
+Screening write-path benchmark: round trips and latency per screening.
+
+Compares three ways of writing the same high-risk screenings:
+
+* ``per-row``: the previous ``record_screening``, one ``INSERT`` per
+  recommendation, reproduced here for comparison;
+* ``record_screening``: the current single-screening path, one insert per table;
+* ``record_screenings``: the bulk path behind ``/screening/screenings/bulk``.
+
+Usage, from ``backend/``::
+
+    python -m benchmarks.bench_writes [--screenings 500] [--batch-size 100] [--database-url URL]
+"""
+
+import argparse
+import time
+
+from .common import print_table, setup_django
+
+# Trips every risk rule, so each screening carries the most recommendations.
+HIGH_RISK = {
+    'height_cm': 160,
+    'weight_kg': 95,
+    'systolic_bp': 190,
+    'diastolic_bp': 110,
+    'heart_rate': 110,
+    'glucose_level': 230,
+    'cholesterol_level': 280,
+    'smoking_status': 'Current',
+    'physical_activity': 'Sedentary',
+}
+
+
+def per_row_record_screening(patient, data):
+    """The write path before recommendations were bulk-inserted."""
+    from django.db import transaction
+    from django.utils import timezone
+
+    from api import patient_summary, rollups
+    from api.models import AIEnrichmentJob, Recommendation, Screening
+    from api.risk import build_recommendations, calculate_risk
+    from api.views.screenings import SCREENING_FIELDS
+
+    assessment = calculate_risk(data)
+    with transaction.atomic():
+        screening = Screening.objects.create(
+            patient=patient,
+            risk_score=assessment.score,
+            risk_level=assessment.level,
+            risk_notes=assessment.notes_text,
+            **{field: data.get(field) for field in SCREENING_FIELDS},
+        )
+        for recommendation in build_recommendations(assessment.notes, assessment.level):
+            Recommendation.objects.create(patient=patient, screening=screening, **recommendation)
+        rollups.add_screening(screening, patient)
+        patient_summary.note_screening(patient, screening)
+        AIEnrichmentJob.objects.create(screening=screening, run_after=timezone.now())
+    return screening
+
+
+def measure(write, count):
+    """Run ``write(count)``; return ``(queries, ms)`` per screening."""
+    from django.db import connection
+
+    # Counted with a wrapper: the debug query log is capped and would saturate.
+    queries = 0
+
+    def count_query(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        write(count)
+        elapsed = (time.perf_counter() - start) * 1000
+    return queries / count, elapsed / count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--screenings', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--database-url', help='A scratch database; defaults to temporary SQLite.')
+    args = parser.parse_args(argv)
+
+    database_url = setup_django(args.database_url)
+
+    from django.core.management import call_command
+
+    from api.models import Patient, Recommendation, User
+    from api.views.screenings import record_screening, record_screenings
+
+    print(f'Database: {database_url}')
+    call_command('migrate', verbosity=0)
+    worker = User.objects.create(
+        username='bench-worker@example.com', email='bench-worker@example.com', role='health_worker'
+    )
+    patient = Patient.objects.create(
+        full_name='Bench Patient', age=60, gender='Male', village='Chandpur', health_worker=worker
+    )
+
+    def one_at_a_time(record):
+        return lambda count: [record(patient, HIGH_RISK) for _ in range(count)]
+
+    def batched(count):
+        for start in range(0, count, args.batch_size):
+            size = min(args.batch_size, count - start)
+            record_screenings([(patient, HIGH_RISK)] * size)
+
+    # Warm the rollup row and the connection so no case pays first-write costs.
+    record_screening(patient, HIGH_RISK)
+    recommendations = Recommendation.objects.count()
+
+    cases = [
+        ('per-row (previous)', one_at_a_time(per_row_record_screening)),
+        ('record_screening', one_at_a_time(record_screening)),
+        (f'record_screenings x{args.batch_size}', batched),
+    ]
+    rows = []
+    for name, write in cases:
+        queries, ms = measure(write, args.screenings)
+        rows.append((name, f'{queries:.2f}', f'{ms:.2f}'))
+
+    print(
+        f'\n{args.screenings} high-risk screenings per case, {recommendations} recommendations each\n'
+    )
+    print_table(['write path', 'queries/screening', 'ms/screening'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Shared setup and measurement helpers for the benchmarks."""
+
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def setup_django(database_url=None):
+    """
+    Point Django at a benchmark database and initialise it.
+
+    Without ``database_url`` a fresh SQLite file in a temporary directory is
+    used, so a benchmark can never touch the development or production
+    database named in ``.env``. Must run before any model import.
+    """
+    if database_url is None:
+        scratch = Path(tempfile.mkdtemp(prefix='ruralhealth-bench-'))
+        database_url = f'sqlite:///{scratch / "bench.sqlite3"}'
+    os.environ['DATABASE_URL'] = database_url
+    # DEBUG keeps every executed query in memory, which skews long runs.
+    os.environ['DEBUG'] = 'False'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ruralhealth.settings')
+
+    import django
+
+    django.setup()
+    return database_url
+
+
+def timed(func, repeat=5):
+    """Run ``func`` ``repeat`` times and return the median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let ``bulk_create`` keep the ``created_at`` values a seeder assigns.
+
+    ``auto_now_add`` would otherwise stamp every synthetic row with the same
+    instant, which flattens exactly the date distribution the benchmarks need.
+    """
+    fields = [model._meta.get_field('created_at') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def print_table(headers, rows):
+    """Print ``rows`` as a fixed-width table."""
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows, strict=True)]
+    line = '  '.join(f'{{:<{width}}}' for width in widths)
+    print(line.format(*headers))
+    print(line.format(*('-' * width for width in widths)))
+    for row in rows:
+        print(line.format(*row))
@@ -0,0 +1,13 @@
+"""
+gunicorn settings, read from the working directory when the server starts.
+
+Command-line flags (the Dockerfile's ``--workers``, the entrypoint's ``--bind``)
+still take precedence over anything set here.
+"""
+
+
+def post_worker_init(worker):
+    """Warm the Gemini client in each worker once the application is loaded."""
+    from api import ai_service
+
+    ai_service.warm_up_if_enabled()
@@ -86,6 +86,93 @@ DATABASES = {
     )
 }
 
+# Cache
+# Dashboard responses are cached per scope (see api/dashboard_cache.py). Each
+# gunicorn worker has its own local-memory cache unless REDIS_URL points them
+# at a shared one, as docker-compose.yml does.
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'ruralhealth',
+        }
+    }
+
+# Seconds a cached dashboard response may be served; 0 disables the cache.
+# Off by default without REDIS_URL: writes handled by another gunicorn worker
+# or by run_ai_worker cannot invalidate a per-process cache.
+DASHBOARD_CACHE_TIMEOUT = int(
+    os.environ.get('DASHBOARD_CACHE_TIMEOUT', '300' if REDIS_URL else '0')
+)
+
+# Patient search backend (see api/search.py): 'auto' picks pg_trgm on
+# PostgreSQL and FTS5 on SQLite; 'basic' forces the plain substring scan.
+PATIENT_SEARCH_BACKEND = os.environ.get('PATIENT_SEARCH_BACKEND', 'auto')
+
+# AI enrichment of screenings runs in `manage.py run_ai_worker`. Set this to run
+# it in the web process after each commit instead, for single-process dev.
+AI_ENRICHMENT_EAGER = os.environ.get('AI_ENRICHMENT_EAGER', 'False').lower() == 'true'
+
+# Gemini result cache (see api/ai_cache.py): seconds an analysis, and a lab
+# report extraction, is served (0 disables it), rows kept in the shared table,
+# and entries per process LRU.
+AI_CACHE_TTL = int(os.environ.get('AI_CACHE_TTL', str(7 * 24 * 3600)))
+AI_EXTRACTION_CACHE_TTL = int(os.environ.get('AI_EXTRACTION_CACHE_TTL', str(24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.environ.get('AI_CACHE_MAX_ENTRIES', '10000'))
+AI_CACHE_MEMORY_ENTRIES = int(os.environ.get('AI_CACHE_MEMORY_ENTRIES', '256'))
+
+# Lab-report photo preprocessing before upload (see api/images.py): longest
+# side in pixels (0 disables it), JPEG quality, and worker processes per web
+# process (0 runs it in the request thread).
+AI_IMAGE_MAX_SIDE = int(os.environ.get('AI_IMAGE_MAX_SIDE', '2000'))
+AI_IMAGE_QUALITY = int(os.environ.get('AI_IMAGE_QUALITY', '75'))
+AI_IMAGE_WORKERS = int(os.environ.get('AI_IMAGE_WORKERS', '2'))
+
+# Read digitally generated PDF lab reports from their text layer (see
+# api/lab_text.py) and ask Gemini only for what that leaves unread.
+AI_PDF_TEXT_LAYER = os.environ.get('AI_PDF_TEXT_LAYER', 'True').lower() == 'true'
+
+# Pages of a multi-page PDF lab report extracted in parallel (see
+# api/pdf_pages.py), capped at AI_MAX_CONCURRENCY; 0 sends the report whole.
+AI_PDF_PAGE_WORKERS = int(os.environ.get('AI_PDF_PAGE_WORKERS', '3'))
+
+# Read plain dictated vitals with rules (see api/dictation.py) and send only
+# the transcripts they cannot account for to Gemini.
+AI_DICTATION_PARSER = os.environ.get('AI_DICTATION_PARSER', 'True').lower() == 'true'
+
+# Output tokens Gemini may spend on a health analysis (see api/analysis_prompt.py).
+# The prompt sizes its lists to fit; 2.5 models count their thinking against it.
+AI_ANALYSIS_MAX_OUTPUT_TOKENS = int(os.environ.get('AI_ANALYSIS_MAX_OUTPUT_TOKENS', '2048'))
+
+# Build the Gemini client and ping the API when a gunicorn worker or
+# `run_ai_worker` boots, so the first AI request does not pay for the setup.
+AI_WARMUP = os.environ.get('AI_WARMUP', 'False').lower() == 'true'
+
+# Gemini call protection (see api/ai_guard.py): the deadline per call, the
+# calls each process may have in flight, and when the circuit breaker opens
+# (error rate or p95 latency over recent calls) and for how long. The
+# concurrency cap only binds for async views and threaded page extraction; a
+# sync gunicorn worker has one call in flight at most.
+AI_TIMEOUT_SECONDS = float(os.environ.get('AI_TIMEOUT_SECONDS', '30'))
+AI_MAX_CONCURRENCY = int(os.environ.get('AI_MAX_CONCURRENCY', '4'))
+AI_BREAKER_ERROR_RATE = float(os.environ.get('AI_BREAKER_ERROR_RATE', '0.5'))
+AI_BREAKER_P95_SECONDS = float(os.environ.get('AI_BREAKER_P95_SECONDS', '20'))
+AI_BREAKER_COOLDOWN_SECONDS = float(os.environ.get('AI_BREAKER_COOLDOWN_SECONDS', '30'))
+
+# Route the AI endpoints to async views (api/views/ai_async.py). Only for
+# ASGI deployments (`uvicorn ruralhealth.asgi:application`); keep it off
+# under gunicorn's sync workers.
+AI_ASYNC_VIEWS = os.environ.get('AI_ASYNC_VIEWS', 'False').lower() == 'true'
+
 # Custom user model
 AUTH_USER_MODEL = 'api.User'
 
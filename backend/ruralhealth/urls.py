@@ -15,8 +15,15 @@ from drf_spectacular.views import (
 
 
 def health_check(request):
-    """Health check endpoint."""
-    return JsonResponse({"status": "healthy"})
+    """
+    Health check endpoint.
+
+    Also reports this process's Gemini circuit breaker. An open circuit leaves
+    the service healthy: AI features degrade, everything else keeps working.
+    """
+    from api import ai_guard
+
+    return JsonResponse({"status": "healthy", "ai": ai_guard.snapshot()})
 
 
 def serve_frontend(request, path=''):
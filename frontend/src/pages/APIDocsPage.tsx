@@ -291,6 +291,13 @@ export function APIDocsPage() {
 }`}
                         />
                     </div>
+
+                    <Endpoint
+                        method="POST"
+                        path="/screening/screenings/bulk"
+                        title="Submit Screenings in Bulk"
+                        description="Records up to 500 screenings in one request for offline sync, with a per-item result."
+                    />
                 </section>
 
                 {/* Errors */}
@@ -75,6 +75,8 @@ export interface Screening {
     risk_level: RiskLevel;
     risk_notes?: string;
     ai_insights?: string | AiInsights;
+    /** Background enrichment progress; Django-created screenings only. */
+    ai_status?: "pending" | "complete" | "unavailable" | "failed";
     created_at: string | Timestamp;
 }
 